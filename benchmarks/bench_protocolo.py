@@ -0,0 +1,118 @@
+# Benchmark de decodificación: JSON por línea vs tramas binarias.
+#
+# Uso (desde la raíz del repo):
+#   python -m benchmarks.bench_protocolo
+#   python -m benchmarks.bench_protocolo --captura captura.jsonl --repeticiones 5
+#
+# La captura es el volcado crudo del puerto serial en modo JSON (una línea por
+# lectura) o un archivo de ESP32Serial.iniciar_captura (.cap / .cap.gz). Sin
+# captura se generan lecturas sintéticas de varios nodos.
+import argparse
+import json
+import math
+import random
+import time
+
+from core.sensores.captura import es_captura, leer_captura
+from core.sensores.esp32_serial import ESP32Serial
+from core.sensores.protocolo_binario import codificar_trama, decodificar_buffer
+
+CLAVES_JSON = {"ID": "id", "T_Amb": "ta", "T_Sonda": "ts", "Hum": "h",
+               "Luz": "lz", "Rocío": "roc", "Bat": "bat", "Acc": "a"}
+
+
+def generar_lineas(n: int, nodos: int = 50) -> list:
+    lineas = []
+    for i in range(n):
+        fase = i * 0.01
+        datos = {
+            "id": i % nodos,
+            "ta": round(22 + 3 * math.sin(fase), 2),
+            "ts": round(24 + 0.5 * math.sin(fase + 1.5), 2),
+            "h": round(45 + 10 * math.sin(fase - 1), 2),
+            "lz": round(300 + 150 * math.sin(fase + 0.5), 2),
+            "roc": round(12 + math.sin(fase), 2),
+            "bat": round(80 + 10 * math.sin(fase / 2), 2),
+            "a": round(0.3 + random.uniform(-0.05, 0.05), 3),
+        }
+        lineas.append(json.dumps(datos).encode() + b"\n")
+    return lineas
+
+
+def cargar_captura(path: str) -> list:
+    if es_captura(path):
+        _, registros = leer_captura(path)
+        crudo = b"".join(datos for _, datos in registros)
+        lineas = [linea + b"\n" for linea in crudo.split(b"\n")]
+    else:
+        with open(path, "rb") as f:
+            lineas = list(f)
+    # las líneas inválidas (cortadas, ruido) se descartan igual que en ESP32Serial
+    return [linea for linea in lineas if _es_json(linea)]
+
+
+def _es_json(linea: bytes) -> bool:
+    try:
+        return isinstance(json.loads(linea), dict)
+    except ValueError:
+        return False
+
+
+def bench_json(lineas: list) -> int:
+    # mismo camino que ESP32Serial.recibir_datos, sin el puerto
+    receptor = ESP32Serial()
+    n = 0
+    for linea in lineas:
+        datos = receptor._normalizar_datos(json.loads(linea.decode().strip()))
+        n += 1 if datos else 0
+    return n
+
+
+def bench_binario(buffer: bytes, bloque: int = 4096) -> int:
+    # simula lecturas del puerto en bloques, conservando la cola parcial
+    pendiente = bytearray()
+    n = 0
+    for i in range(0, len(buffer), bloque):
+        pendiente += buffer[i:i + bloque]
+        lecturas, consumidos, _ = decodificar_buffer(pendiente)
+        del pendiente[:consumidos]
+        n += len(lecturas)
+    return n
+
+
+def medir(nombre: str, fn, arg, repeticiones: int, nbytes: int) -> float:
+    mejor = float("inf")
+    n = 0
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        n = fn(arg)
+        mejor = min(mejor, time.perf_counter() - t0)
+    print(f"{nombre:<8} {n:>9} lecturas  {mejor * 1e3:9.1f} ms  "
+          f"{n / mejor:>12,.0f} lect/s  {nbytes / mejor / 1e6:7.1f} MB/s")
+    return n / mejor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON vs tramas binarias")
+    parser.add_argument("--captura", help="captura JSON por líneas del puerto serial")
+    parser.add_argument("--lecturas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    lineas = cargar_captura(args.captura) if args.captura else generar_lineas(args.lecturas)
+
+    # la misma captura re-codificada como tramas binarias
+    receptor = ESP32Serial()
+    tramas = b"".join(
+        codificar_trama(receptor._normalizar_datos(json.loads(linea)), seq)
+        for seq, linea in enumerate(lineas)
+    )
+
+    print(f"{len(lineas)} lecturas  JSON: {sum(map(len, lineas)):,} B  binario: {len(tramas):,} B")
+    json_ps = medir("json", bench_json, lineas, args.repeticiones, sum(map(len, lineas)))
+    bin_ps = medir("binario", bench_binario, tramas, args.repeticiones, len(tramas))
+    print(f"aceleración binario/json: {bin_ps / json_ps:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
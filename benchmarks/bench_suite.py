@@ -0,0 +1,337 @@
+# Suite de benchmarks de ingesta y UI, sin ventana (Qt offscreen).
+#
+# Uso (desde la raíz del repo):
+#   python -m benchmarks.bench_suite
+#   python -m benchmarks.bench_suite --solo decodificacion filtros
+#   python -m benchmarks.bench_suite --salida base.json
+#   python -m benchmarks.bench_suite --comparar base.json --tolerancia 0.15
+#
+# Cada corrida guarda un JSON (por defecto en benchmarks/resultados/) con una
+# métrica por entrada: valor, unidad y si es mejor "menor" o "mayor". Con
+# --comparar se contrasta contra otra corrida y el proceso termina con código
+# 1 si alguna métrica empeoró más que la tolerancia.
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.bench_protocolo import bench_json, generar_lineas
+from core.sensores.captura import GrabadorCaptura
+from core.sensores.esp32_serial import ESP32Serial
+from core.sensores.esp32_worker import ESP32Worker
+
+TAMANOS = (10, 100, 1000, 10000)
+
+
+class Resultados:
+    def __init__(self):
+        self.metricas = {}
+
+    def agregar(self, nombre: str, valor: float, unidad: str, mejor: str = "menor"):
+        self.metricas[nombre] = {"valor": valor, "unidad": unidad, "mejor": mejor}
+        print(f"  {nombre:<42} {valor:>14,.3f} {unidad}")
+
+
+def cronometrar(fn, repeticiones: int = 5) -> float:
+    """Mediana en ms de varias ejecuciones."""
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(tiempos)
+
+
+def procesar_eventos(app: QApplication, segundos: float):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def lecturas_sinteticas(n: int) -> list:
+    return [{"ID": i, "T_Amb": 22.5, "T_Sonda": 24.1, "Hum": 45.0, "Luz": 300.0,
+             "Rocío": 12.3, "Bat": 80.0, "Acc": 0.31} for i in range(n)]
+
+
+# decodificación
+
+def bench_decodificacion(app, r: Resultados, args):
+    lineas = generar_lineas(args.lecturas)
+    crudos = [json.loads(linea) for linea in lineas]
+    receptor = ESP32Serial()
+
+    ms = cronometrar(lambda: [receptor._normalizar_datos(d) for d in crudos], args.repeticiones)
+    r.agregar("normalizar_datos", len(crudos) / ms * 1000, "lect/s", "mayor")
+
+    ms = cronometrar(lambda: bench_json(lineas), args.repeticiones)
+    r.agregar("json_por_linea", len(lineas) / ms * 1000, "lect/s", "mayor")
+
+    # recibir_lote completo (buffer, split y normalización) sobre una captura
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "lineas.cap")
+        grabador = GrabadorCaptura(ruta)
+        for i in range(0, len(lineas), 100):
+            grabador.escribir(b"".join(lineas[i:i + 100]))
+        grabador.cerrar()
+
+        def recibir_todo():
+            receptor = ESP32Serial()
+            receptor.timeout = 0
+            receptor.configurar_conexion(f"replay://{ruta}?velocidad=0", 0)
+            n = 0
+            while not receptor.ser.terminada or receptor.ser._salida:
+                n += len(receptor.recibir_lote())
+            receptor.cerrar_conexion()
+            return n
+
+        ms = cronometrar(recibir_todo, args.repeticiones)
+        r.agregar("recibir_lote_json", len(lineas) / ms * 1000, "lect/s", "mayor")
+
+
+# latencia de punta a punta
+
+def bench_latencia(app, r: Resultados, args):
+    if not hasattr(os, "openpty"):
+        print("  (sin pty en esta plataforma: se omite)")
+        return
+    from ui.widgets.sensor_card import SensorCard
+
+    for max_hz in (0, 10):
+        maestro, esclavo = os.openpty()
+        worker = ESP32Worker(os.ttyname(esclavo), 115200, max_hz=max_hz)
+        card = SensorCard("T_Amb", "°C")
+        enviado = {}
+        latencias = []
+
+        def aplicar(lote):
+            for datos in lote:
+                card.update_value(datos["T_Amb"])
+                t = enviado.pop(datos["ID"], None)
+                if t is not None:
+                    latencias.append((time.perf_counter() - t) * 1000)
+
+        worker.data_received.connect(lambda datos: aplicar([datos]))
+        worker.batch_received.connect(aplicar)
+        worker.start()
+        procesar_eventos(app, 0.5)
+
+        for i in range(args.muestras_latencia):
+            enviado[i] = time.perf_counter()
+            os.write(maestro, json.dumps({"id": i, "ta": 20.0 + i % 10}).encode() + b"\n")
+            procesar_eventos(app, 0.02)
+        procesar_eventos(app, 0.5)
+        worker.stop()
+        os.close(maestro)
+        os.close(esclavo)
+
+        if not latencias:
+            print(f"  (max_hz={max_hz}: no llegaron lecturas)")
+            continue
+        latencias.sort()
+        for p in (50, 95, 99):
+            valor = latencias[min(len(latencias) - 1, len(latencias) * p // 100)]
+            r.agregar(f"latencia_serial_a_card_hz{max_hz}_p{p}", valor, "ms")
+
+
+# DevicesPage
+
+def _pagina_dispositivos():
+    from ui.devices.devices_window import DevicesPage
+    # worker sin arrancar: la página no lee ningún puerto
+    pagina = DevicesPage(esp32_worker=ESP32Worker("sin-puerto", 9600))
+    pagina.timer.stop()
+    pagina.resize(1280, 800)
+    pagina.show()
+    return pagina
+
+
+def bench_dispositivos(app, r: Resultados, args):
+    for n in args.tamanos:
+        pagina = _pagina_dispositivos()
+        lote = lecturas_sinteticas(n)
+        pagina._handle_esp32_batch(lote)
+        app.processEvents()
+
+        r.agregar(f"devices_actualizar_vistas_{n}", cronometrar(pagina.actualizar_vistas, args.repeticiones), "ms")
+        r.agregar(f"devices_lote_lecturas_{n}",
+                  cronometrar(lambda: pagina._handle_esp32_batch(lote), args.repeticiones), "ms")
+        pagina.close()
+        pagina.deleteLater()
+        app.processEvents()
+
+
+# filtros
+
+def _usuarios(n: int) -> list:
+    return [{"id": f"USR-{i:05d}", "nombre": f"Nombre{i}", "apellido": f"Apellido{i}",
+             "usuario": f"usuario{i}", "telefono": f"55{i:08d}", "email": f"u{i}@correo.mx",
+             "rol": "Operador", "rfc": f"RFC{i:010d}", "ine": i % 2 == 0, "licencia": i % 3 == 0,
+             "estado_documentos": "Pendiente"} for i in range(n)]
+
+
+def _insumos(n: int, tipo: str = "Medicamento") -> list:
+    return [{"id": f"MED-{i:05d}", "tipo": tipo, "nombre": f"Insumo {i}", "lote": f"L{i:06d}",
+             "caducidad": "2027-01-01", "registro_sanitario": f"RS-{i:07d}"} for i in range(n)]
+
+
+def bench_filtros(app, r: Resultados, args):
+    from ui.users.users_page import UsersPage
+    from ui.insumos.insumos_page import InsumosPage
+    n = args.filas_filtro
+    textos = ("1", "99", "zzz", "")
+
+    def filtrar(fn):
+        return lambda: [fn(t) for t in textos]
+
+    pagina = _pagina_dispositivos()
+    pagina._handle_esp32_batch(lecturas_sinteticas(n))
+    r.agregar(f"filter_devices_{n}", cronometrar(filtrar(pagina.filter_devices), args.repeticiones) / len(textos), "ms")
+    pagina.close()
+
+    usuarios = UsersPage()
+    usuarios.users.extend(_usuarios(n))
+    usuarios.actualizar_vistas()
+    r.agregar(f"filter_users_{n}", cronometrar(filtrar(usuarios.filter_users), args.repeticiones) / len(textos), "ms")
+    usuarios.close()
+
+    insumos = InsumosPage()
+    insumos.data["Medicamento"].extend(_insumos(n))
+    insumos._refresh_tab("Medicamento")
+    r.agregar(f"insumos_search_{n}",
+              cronometrar(filtrar(insumos._on_search_changed), args.repeticiones) / len(textos), "ms")
+    insumos.close()
+
+
+# exportación CSV
+
+def bench_csv(app, r: Resultados, args):
+    from ui.devices import devices_window
+    from ui.users import users_page
+    from ui.insumos import insumos_page
+    n = args.filas_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "export.csv")
+        dialogo = mock.Mock(return_value=(ruta, "CSV (*.csv)"))
+
+        pagina = _pagina_dispositivos()
+        pagina._handle_esp32_batch(lecturas_sinteticas(n))
+        with mock.patch.object(devices_window.QFileDialog, "getSaveFileName", dialogo):
+            ms = cronometrar(pagina.exportar_csv, args.repeticiones)
+        r.agregar(f"csv_dispositivos_{n}", n / ms * 1000, "filas/s", "mayor")
+        pagina.close()
+
+        usuarios = users_page.UsersPage()
+        usuarios.users.extend(_usuarios(n))
+        with mock.patch.object(users_page.QFileDialog, "getSaveFileName", dialogo), \
+                mock.patch.object(users_page.QMessageBox, "information"):
+            ms = cronometrar(usuarios.export_csv, args.repeticiones)
+        r.agregar(f"csv_usuarios_{n}", n / ms * 1000, "filas/s", "mayor")
+
+        insumos = insumos_page.InsumosPage()
+        insumos.data["Medicamento"].extend(_insumos(n))
+        with mock.patch.object(insumos_page.QFileDialog, "getSaveFileName", dialogo), \
+                mock.patch.object(insumos_page.QMessageBox, "information"):
+            ms = cronometrar(insumos._export_csv_current, args.repeticiones)
+        r.agregar(f"csv_insumos_{n}", n / ms * 1000, "filas/s", "mayor")
+
+
+BENCHMARKS = {
+    "decodificacion": bench_decodificacion,
+    "latencia": bench_latencia,
+    "dispositivos": bench_dispositivos,
+    "filtros": bench_filtros,
+    "csv": bench_csv,
+}
+
+
+# resultados
+
+def _commit() -> str:
+    try:
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=raiz).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def comparar(base: dict, actual: dict, tolerancia: float) -> int:
+    """Imprime el cambio de cada métrica y devuelve cuántas empeoraron."""
+    print(f"\nComparación contra {base['meta'].get('commit')} (tolerancia {tolerancia:.0%}):")
+    peores = 0
+    for nombre, m in actual["metricas"].items():
+        previa = base["metricas"].get(nombre)
+        if previa is None or not previa["valor"]:
+            continue
+        cambio = (m["valor"] - previa["valor"]) / previa["valor"]
+        empeoro = cambio > tolerancia if m["mejor"] == "menor" else cambio < -tolerancia
+        peores += empeoro
+        marca = "  REGRESIÓN" if empeoro else ""
+        print(f"  {nombre:<42} {previa['valor']:>12,.3f} -> {m['valor']:>12,.3f} {m['unidad']:<7} "
+              f"{cambio:+7.1%}{marca}")
+    return peores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de ingesta y UI (headless)")
+    parser.add_argument("--solo", nargs="+", choices=list(BENCHMARKS), help="correr sólo estos grupos")
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    parser.add_argument("--comparar", help="resultados previos contra los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="empeoramiento relativo aceptado (0.10 = 10%%)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--lecturas", type=int, default=50_000)
+    parser.add_argument("--muestras-latencia", type=int, default=200)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(TAMANOS))
+    parser.add_argument("--filas-filtro", type=int, default=1000)
+    parser.add_argument("--filas-csv", type=int, default=10000)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    r = Resultados()
+    for nombre in args.solo or BENCHMARKS:
+        print(f"[{nombre}]")
+        BENCHMARKS[nombre](app, r, args)
+
+    actual = {
+        "meta": {
+            "commit": _commit(),
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        },
+        "metricas": r.metricas,
+    }
+
+    salida = args.salida
+    if not salida:
+        carpeta = os.path.join(os.path.dirname(__file__), "resultados")
+        os.makedirs(carpeta, exist_ok=True)
+        salida = os.path.join(carpeta, f"{datetime.now():%Y%m%d-%H%M%S}_{actual['meta']['commit']}.json")
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(actual, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        if comparar(base, actual, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
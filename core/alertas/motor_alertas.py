@@ -0,0 +1,359 @@
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from core.sensores.protocolo_binario import CAMPOS_VALOR
+from core.diagnostico.metricas import ALERTAS
+from core.alertas.prediccion import RegresionExponencial
+
+CAMPOS = CAMPOS_VALOR
+_INDICE_CAMPO = {campo: i for i, campo in enumerate(CAMPOS)}
+SENTINELA = -255
+
+ACTIVA = "activa"
+RESUELTA = "resuelta"
+
+
+class Regla:
+    """
+    Condición sobre una serie por nodo (un valor por fila del motor).
+
+    Se activa cuando 'serie operador umbral' se cumple sin cortes durante
+    'duracion' segundos y se resuelve recién cuando la serie vuelve
+    'histeresis' unidades por detrás del umbral, para no oscilar alrededor
+    de él. mensaje se formatea con {nodo} y {valor}.
+
+    Las reglas deshabilitadas no se evalúan (ver MotorAlertas.habilitar).
+    """
+
+    def __init__(self, nombre: str, operador: str, umbral: float, duracion: float = 0,
+                 histeresis: float = 0, severidad: str = "advertencia", mensaje: str = "",
+                 habilitada: bool = True):
+        if operador not in (">", "<"):
+            raise ValueError(f"Operador no soportado: {operador}")
+        self.nombre = nombre
+        self.operador = operador
+        self.umbral = umbral
+        self.duracion = duracion
+        self.histeresis = histeresis
+        self.severidad = severidad
+        self.mensaje = mensaje or nombre + " ({valor:.2f})"
+        self.habilitada = habilitada
+
+    def serie(self, motor: "MotorAlertas") -> np.ndarray:
+        raise NotImplementedError
+
+    def agregar(self, motor: "MotorAlertas", filas: np.ndarray, ahora: float):
+        """Lecturas nuevas en 'filas' (sin repetir); para reglas con estado propio."""
+
+    def cumple(self, v: np.ndarray) -> np.ndarray:
+        # NaN (sin dato o sentinela) nunca cumple ni libera
+        with np.errstate(invalid="ignore"):
+            return v > self.umbral if self.operador == ">" else v < self.umbral
+
+    def libera(self, v: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            if self.operador == ">":
+                return v <= self.umbral - self.histeresis
+            return v >= self.umbral + self.histeresis
+
+
+class ReglaUmbral(Regla):
+    """campo > umbral (o <) durante 'duracion' segundos."""
+
+    def __init__(self, campo: str, operador: str, umbral: float, **opciones):
+        opciones.setdefault("nombre", f"{campo} {operador} {umbral:g}")
+        super().__init__(opciones.pop("nombre"), operador, umbral, **opciones)
+        self.campo = campo
+
+    def serie(self, motor):
+        return motor.valores[:, _INDICE_CAMPO[self.campo]]
+
+
+class ReglaVariacion(Regla):
+    """Variación de campo por minuto (en valor absoluto) entre las dos últimas lecturas."""
+
+    def __init__(self, campo: str, umbral: float, **opciones):
+        opciones.setdefault("nombre", f"Δ{campo}/min > {umbral:g}")
+        super().__init__(opciones.pop("nombre"), ">", umbral, **opciones)
+        self.campo = campo
+
+    def serie(self, motor):
+        i = _INDICE_CAMPO[self.campo]
+        dt = motor.t - motor.t_previo
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tasa = np.abs(motor.valores[:, i] - motor.previos[:, i]) / dt * 60
+        tasa[~(dt > 0)] = np.nan
+        return tasa
+
+
+class ReglaProximidad(Regla):
+    """campo_a - campo_b < margen (p. ej. Rocío a menos de 1 °C de T_Amb)."""
+
+    def __init__(self, campo_a: str, campo_b: str, margen: float, **opciones):
+        opciones.setdefault("nombre", f"{campo_a} - {campo_b} < {margen:g}")
+        super().__init__(opciones.pop("nombre"), "<", margen, **opciones)
+        self.campo_a = campo_a
+        self.campo_b = campo_b
+
+    def serie(self, motor):
+        return motor.valores[:, _INDICE_CAMPO[self.campo_a]] - motor.valores[:, _INDICE_CAMPO[self.campo_b]]
+
+
+class ReglaCondensacion(Regla):
+    """
+    Aviso anticipado: la sonda va a bajar al punto de rocío dentro de
+    'horizonte' segundos.
+
+    Ajusta por nodo la tendencia del margen T_Sonda - Rocío con una
+    RegresionExponencial (ventana de ~tau segundos, O(1) por lectura) y
+    extrapola la recta hasta 0. La serie son los minutos que faltan (0 si
+    ya no hay margen, inf si el margen no baja).
+    """
+
+    def __init__(self, horizonte: float = 1800, tau: float = 600, peso_minimo: float = 5,
+                 **opciones):
+        opciones.setdefault("nombre", "Condensación prevista")
+        opciones.setdefault("histeresis", horizonte / 60 / 3)
+        super().__init__(opciones.pop("nombre"), "<", horizonte / 60, **opciones)
+        self.peso_minimo = peso_minimo
+        self.tendencia = RegresionExponencial(tau)
+
+    def agregar(self, motor, filas, ahora):
+        margen = (motor._valores[filas, _INDICE_CAMPO["T_Sonda"]]
+                  - motor._valores[filas, _INDICE_CAMPO["Rocío"]])
+        self.tendencia.agregar(filas, ahora, margen)
+
+    def serie(self, motor):
+        return self.tendencia.tiempo_hasta_bajar(len(motor.t), 0.0, self.peso_minimo) / 60
+
+
+def reglas_cadena_frio() -> List[Regla]:
+    """Reglas de cadena de frío por defecto (instancias nuevas: algunas guardan estado por nodo)."""
+    return [
+        ReglaUmbral("T_Sonda", ">", 8, duracion=300, histeresis=0.5, severidad="critica",
+                    nombre="Sonda sobre 8 °C",
+                    mensaje="Nodo {nodo}: sonda a {valor:.1f} °C (más de 8 °C por 5 min)"),
+        ReglaUmbral("T_Sonda", "<", 2, duracion=300, histeresis=0.5, severidad="critica",
+                    nombre="Sonda bajo 2 °C",
+                    mensaje="Nodo {nodo}: sonda a {valor:.1f} °C (menos de 2 °C por 5 min)"),
+        ReglaProximidad("T_Amb", "Rocío", 1, duracion=60, histeresis=0.5,
+                        nombre="Riesgo de condensación",
+                        mensaje="Nodo {nodo}: punto de rocío a {valor:.1f} °C de la temperatura ambiente"),
+        ReglaVariacion("T_Sonda", 2, histeresis=1,
+                       nombre="Cambio brusco de temperatura",
+                       mensaje="Nodo {nodo}: la sonda varía {valor:.1f} °C/min"),
+        ReglaUmbral("Bat", "<", 15, duracion=60, histeresis=5,
+                    nombre="Batería baja",
+                    mensaje="Nodo {nodo}: batería al {valor:.0f} %"),
+        ReglaCondensacion(horizonte=1800, habilitada=False,
+                          mensaje="Nodo {nodo}: la sonda llegaría al punto de rocío en {valor:.0f} min"),
+    ]
+
+
+class MotorAlertas:
+    """
+    Evalúa reglas sobre todos los nodos a la vez con arreglos NumPy.
+
+    agregar_lote() guarda el último valor (y el anterior, para las tasas)
+    de cada nodo en una fila; evaluar() recorre las reglas una vez por tick
+    y sólo itera en Python sobre las transiciones. Cada alerta se informa
+    una vez al activarse y otra al resolverse (sin duplicados mientras
+    sigue activa). Los eventos quedan en un feed que la UI vacía con
+    nuevas() cuando le conviene, sin bloquear a quien los produce.
+
+    Evento: {"ts", "nodo", "regla", "severidad", "estado", "valor", "mensaje"}
+    """
+
+    def __init__(self, reglas: Optional[Sequence[Regla]] = None, capacidad: int = 256,
+                 max_feed: int = 1000):
+        self.reglas = list(reglas) if reglas is not None else reglas_cadena_frio()
+        self._filas: Dict[Union[int, str], int] = {}
+        self._nodos: List[Union[int, str]] = []
+        self._reservar(capacidad)
+        self._feed = deque(maxlen=max_feed)
+        # alertas publicadas desde afuera (ver publicar), por (nodo, regla)
+        self._externas: Dict[tuple, dict] = {}
+
+    def _reservar(self, capacidad: int):
+        n_reglas = len(self.reglas)
+        viejos = getattr(self, "_valores", None)
+        nuevos = {
+            "_valores": np.full((capacidad, len(CAMPOS)), np.nan),
+            "_previos": np.full((capacidad, len(CAMPOS)), np.nan),
+            "_t": np.full(capacidad, np.nan),
+            "_t_previo": np.full(capacidad, np.nan),
+            "_desde": np.full((n_reglas, capacidad), np.nan),
+            "_activa": np.zeros((n_reglas, capacidad), dtype=bool),
+        }
+        if viejos is not None:
+            n = len(viejos)
+            for nombre in ("_valores", "_previos", "_t", "_t_previo"):
+                nuevos[nombre][:n] = getattr(self, nombre)
+            for nombre in ("_desde", "_activa"):
+                nuevos[nombre][:, :n] = getattr(self, nombre)
+        for nombre, arreglo in nuevos.items():
+            setattr(self, nombre, arreglo)
+
+    # vistas sobre las filas en uso
+    @property
+    def valores(self) -> np.ndarray:
+        return self._valores[:len(self._nodos)]
+
+    @property
+    def previos(self) -> np.ndarray:
+        return self._previos[:len(self._nodos)]
+
+    @property
+    def t(self) -> np.ndarray:
+        return self._t[:len(self._nodos)]
+
+    @property
+    def t_previo(self) -> np.ndarray:
+        return self._t_previo[:len(self._nodos)]
+
+    def _fila(self, nodo) -> int:
+        fila = self._filas.get(nodo)
+        if fila is None:
+            fila = self._filas[nodo] = len(self._nodos)
+            self._nodos.append(nodo)
+            if fila >= len(self._valores):
+                self._reservar(2 * len(self._valores))
+        return fila
+
+    def agregar_lote(self, lote: List[dict], ahora: Optional[float] = None):
+        if not lote:
+            return
+        ahora = time.time() if ahora is None else ahora
+        filas = np.fromiter((self._fila(d.get("ID", SENTINELA)) for d in lote), dtype=np.int64,
+                            count=len(lote))
+        nuevos = np.array([[d.get(c, np.nan) for c in CAMPOS] for d in lote], dtype=np.float64)
+        nuevos[nuevos == SENTINELA] = np.nan
+        # valores marcados por DetectorAnomalias: queda el último bueno
+        for i, d in enumerate(lote):
+            for campo in d.get("sospechosos", ()):
+                j = _INDICE_CAMPO[campo]
+                nuevos[i, j] = self._valores[filas[i], j]
+        # si un nodo viene varias veces en el lote queda la última lectura (con
+        # índices repetidos gana la última asignación) y 'previos' es lo de antes del lote
+        self._previos[filas] = self._valores[filas]
+        self._t_previo[filas] = self._t[filas]
+        self._valores[filas] = nuevos
+        self._t[filas] = ahora
+
+        unicas = np.unique(filas)
+        for regla in self.reglas:
+            if regla.habilitada:
+                regla.agregar(self, unicas, ahora)
+
+    def evaluar(self, ahora: Optional[float] = None) -> List[dict]:
+        """Evalúa todas las reglas; devuelve (y agrega al feed) las transiciones."""
+        ahora = time.time() if ahora is None else ahora
+        n = len(self._nodos)
+        eventos = []
+        if not n:
+            return eventos
+        for r, regla in enumerate(self.reglas):
+            if not regla.habilitada:
+                continue
+            v = regla.serie(self)
+            cumple = regla.cumple(v)
+            desde = self._desde[r, :n]
+            activa = self._activa[r, :n]
+
+            # el plazo corre mientras se cumple sin cortes
+            desde[~cumple & ~activa] = np.nan
+            desde[cumple & np.isnan(desde)] = ahora
+            dispara = cumple & ~activa & (ahora - desde >= regla.duracion)
+            resuelve = activa & regla.libera(v)
+
+            activa[dispara] = True
+            activa[resuelve] = False
+            desde[resuelve] = np.nan
+
+            for i in np.flatnonzero(dispara | resuelve).tolist():
+                eventos.append(self._evento(regla, self._nodos[i], float(v[i]),
+                                            ACTIVA if dispara[i] else RESUELTA, ahora))
+        self._publicar(eventos)
+        return eventos
+
+    def habilitar(self, nombre: str, habilitada: bool = True):
+        """Habilita o deshabilita una regla; al deshabilitarla se resuelven sus alertas activas."""
+        for r, regla in enumerate(self.reglas):
+            if regla.nombre != nombre or regla.habilitada == habilitada:
+                continue
+            regla.habilitada = habilitada
+            if habilitada:
+                continue
+            n = len(self._nodos)
+            ahora = time.time()
+            self._publicar([self._evento(regla, self._nodos[i], float("nan"), RESUELTA, ahora)
+                            for i in np.flatnonzero(self._activa[r, :n]).tolist()])
+            self._activa[r] = False
+            self._desde[r] = np.nan
+
+    def _evento(self, regla: Regla, nodo, valor: float, estado: str, ahora: float) -> dict:
+        return {
+            "ts": ahora,
+            "nodo": nodo,
+            "regla": regla.nombre,
+            "severidad": regla.severidad,
+            "estado": estado,
+            "valor": valor,
+            "mensaje": regla.mensaje.format(nodo=nodo, valor=valor),
+        }
+
+    def _publicar(self, eventos: List[dict]):
+        for evento in eventos:
+            if evento["estado"] == ACTIVA:
+                ALERTAS.inc(1, (evento["regla"],))
+        self._feed.extend(eventos)
+
+    def publicar(self, nodo, regla: str, mensaje: str, severidad: str = "critica",
+                 valor: float = float("nan")) -> bool:
+        """
+        Alerta detectada fuera del motor (p. ej. por la UI). Se ignora si ya
+        hay una activa para el mismo nodo y regla; devuelve si se publicó.
+        """
+        if (nodo, regla) in self._externas:
+            return False
+        evento = {"ts": time.time(), "nodo": nodo, "regla": regla, "severidad": severidad,
+                  "estado": ACTIVA, "valor": valor, "mensaje": mensaje}
+        self._externas[(nodo, regla)] = evento
+        self._publicar([evento])
+        return True
+
+    def notificar(self, nodo, regla: str, mensaje: str, severidad: str = "advertencia",
+                  valor: float = float("nan"), ts: Optional[float] = None):
+        """Evento puntual (p. ej. un golpe): va al feed como activa, sin nada que resolver."""
+        self._publicar([{"ts": time.time() if ts is None else ts, "nodo": nodo, "regla": regla,
+                         "severidad": severidad, "estado": ACTIVA, "valor": valor,
+                         "mensaje": mensaje}])
+
+    def resolver(self, nodo, regla: str):
+        evento = self._externas.pop((nodo, regla), None)
+        if evento is not None:
+            self._publicar([dict(evento, ts=time.time(), estado=RESUELTA)])
+
+    def nuevas(self) -> List[dict]:
+        """Vacía el feed: eventos desde la llamada anterior, en orden."""
+        eventos = []
+        while self._feed:
+            eventos.append(self._feed.popleft())
+        return eventos
+
+    def activas(self) -> List[dict]:
+        """Alertas activas ahora (una por nodo y regla)."""
+        alertas = list(self._externas.values())
+        n = len(self._nodos)
+        for r, regla in enumerate(self.reglas):
+            filas = np.flatnonzero(self._activa[r, :n])
+            if not len(filas):
+                continue
+            v = regla.serie(self)
+            for i in filas.tolist():
+                alertas.append(self._evento(regla, self._nodos[i], float(v[i]), ACTIVA,
+                                            float(self._t[i])))
+        return alertas
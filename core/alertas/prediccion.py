@@ -0,0 +1,190 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.sensores.golpes import vueltas
+
+
+class RegresionExponencial:
+    """
+    Una recta y = a + b·t por fila, ajustada por mínimos cuadrados con pesos
+    exp(-antigüedad / tau): los puntos viejos se olvidan solos, como una
+    ventana deslizante de ~tau segundos pero sin guardar los puntos.
+
+    Cada fila guarda sólo cinco sumas (peso, Σt, Σy, Σt², Σty) con el origen
+    de tiempo en su último punto. agregar() las decae, corre el origen al
+    punto nuevo y lo suma: O(1) por punto, vectorizado sobre las filas del
+    lote. Con el origen ahí, 'a' es directamente el valor estimado actual.
+    """
+
+    def __init__(self, tau: float = 600, capacidad: int = 256):
+        self.tau = tau
+        self._sumas = np.zeros((5, 0))
+        self._t = np.zeros(0)
+        self._reservar(capacidad)
+
+    def _reservar(self, capacidad: int):
+        n = len(self._t)
+        if capacidad <= n:
+            return
+        sumas = np.zeros((5, capacidad))
+        sumas[:, :n] = self._sumas
+        t = np.full(capacidad, np.nan)
+        t[:n] = self._t
+        self._sumas, self._t = sumas, t
+
+    def agregar(self, filas: np.ndarray, t: Union[float, np.ndarray], y: np.ndarray):
+        """Un punto (t, y) por fila; las filas no deben repetirse en la llamada. y NaN se ignora."""
+        filas = np.asarray(filas, dtype=np.int64)
+        y = np.asarray(y, dtype=np.float64)
+        t = np.broadcast_to(np.asarray(t, dtype=np.float64), y.shape)
+        validos = ~np.isnan(y)
+        filas, t, y = filas[validos], t[validos], y[validos]
+        if not len(filas):
+            return
+        if filas.max() >= len(self._t):
+            self._reservar(max(2 * len(self._t), filas.max() + 1))
+
+        peso, st, sy, stt, sty = self._sumas[:, filas]
+        # d: cuánto se corre el origen (del punto anterior al nuevo)
+        d = t - self._t[filas]
+        d[np.isnan(d)] = 0.0
+        w = np.exp(-np.maximum(d, 0.0) / self.tau)
+
+        # con x' = x - d:  Σx'² = Σx² - 2dΣx + d²·peso,  Σx'y = Σxy - dΣy,  Σx' = Σx - d·peso
+        nuevas = np.stack((
+            w * peso + 1.0,
+            w * (st - d * peso),
+            w * sy + y,
+            w * (stt - 2 * d * st + d * d * peso),
+            w * (sty - d * sy),
+        ))
+        self._sumas[:, filas] = nuevas
+        self._t[filas] = t
+
+    def ajuste(self, filas: Union[int, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (a, b, peso) de las filas pedidas (un int n: las primeras n); a en el
+        último punto de cada una, b por segundo.
+        """
+        if isinstance(filas, (int, np.integer)):
+            self._reservar(filas)
+            filas = slice(None, filas)
+        else:
+            filas = np.asarray(filas, dtype=np.int64)
+            if len(filas):
+                self._reservar(filas.max() + 1)
+        peso, st, sy, stt, sty = self._sumas[:, filas]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            den = peso * stt - st * st
+            b = (peso * sty - st * sy) / den
+            a = (sy - b * st) / peso
+        sin_recta = ~(den > 1e-9 * np.maximum(peso * stt, 1e-300))
+        b[sin_recta] = np.nan
+        a[sin_recta] = np.nan
+        return a, b, peso
+
+    def tiempo_hasta_bajar(self, filas: Union[int, np.ndarray], nivel: float = 0.0,
+                           peso_minimo: float = 3) -> np.ndarray:
+        """
+        Segundos (desde el último punto) hasta que la recta baja a 'nivel':
+        0 si ya está por debajo, inf si no baja, NaN si la fila tiene menos
+        de peso_minimo puntos efectivos.
+        """
+        a, b, peso = self.ajuste(filas)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            faltan = np.where(b < 0, (a - nivel) / -b, np.inf)
+        faltan = np.where(a <= nivel, 0.0, faltan)
+        faltan[np.isnan(a) | (peso < peso_minimo)] = np.nan
+        return faltan
+
+    def reiniciar(self, filas=None):
+        if filas is None:
+            self._sumas[:] = 0.0
+            self._t[:] = np.nan
+        else:
+            self._sumas[:, filas] = 0.0
+            self._t[filas] = np.nan
+
+
+class ModeloBateria:
+    """
+    Descarga de la batería de cada nodo a partir de sus lecturas de Bat.
+
+    La pendiente de una RegresionExponencial (ventana de ~tau segundos)
+    da el consumo en %/h y su cruce con 0 la autonomía, sin guardar el
+    historial. Una subida de más de 'recarga' puntos (batería cambiada o
+    cargada) descarta la tendencia anterior del nodo.
+
+    Bat viene en pasos de 0,01 % y baja despacio: no se estima hasta tener
+    'span_minimo' segundos de lecturas, ni se informa un consumo menor que
+    'consumo_minimo' %/h (se toma como batería estable).
+    """
+
+    def __init__(self, tau: float = 6 * 3600, peso_minimo: float = 5, span_minimo: float = 600,
+                 consumo_minimo: float = 0.05, recarga: float = 5, capacidad: int = 256):
+        self.peso_minimo = peso_minimo
+        self.span_minimo = span_minimo
+        self.consumo_minimo = consumo_minimo
+        self.recarga = recarga
+        self.tendencia = RegresionExponencial(tau, capacidad)
+        self._filas: Dict[Union[int, str], int] = {}
+        self._ultimo = np.full(capacidad, np.nan)     # último Bat
+        self._inicio = np.full(capacidad, np.nan)     # primera lectura desde la última recarga
+
+    def _fila(self, nodo) -> int:
+        fila = self._filas.get(nodo)
+        if fila is None:
+            fila = self._filas[nodo] = len(self._filas)
+            if fila >= len(self._ultimo):
+                for nombre in ("_ultimo", "_inicio"):
+                    viejo = getattr(self, nombre)
+                    nuevo = np.full(2 * len(viejo), np.nan)
+                    nuevo[:fila] = viejo
+                    setattr(self, nombre, nuevo)
+        return fila
+
+    def agregar_lote(self, nodos: Sequence, bateria: Sequence[float], ahora: Optional[float] = None):
+        """Una lectura de Bat (%) por elemento; un nodo puede repetirse."""
+        if not len(nodos):
+            return
+        ahora = time.time() if ahora is None else ahora
+        filas = np.fromiter((self._fila(n) for n in nodos), dtype=np.int64, count=len(nodos))
+        bateria = np.asarray(bateria, dtype=np.float64)
+        for sel in vueltas(filas):
+            f, b = filas[sel], bateria[sel]
+            cargada = b > self._ultimo[f] + self.recarga
+            if cargada.any():
+                self.tendencia.reiniciar(f[cargada])
+            validos = ~np.isnan(b)
+            self._inicio[f] = np.where(validos & (cargada | np.isnan(self._inicio[f])), ahora,
+                                       self._inicio[f])
+            self._ultimo[f] = np.where(validos, b, self._ultimo[f])
+            self.tendencia.agregar(f, ahora, b)
+
+    def estimar(self, nodos: Sequence, ahora: Optional[float] = None) -> Tuple[List[float], List[float]]:
+        """
+        (consumo en %/h, horas hasta 0 %) por nodo: NaN mientras no hay
+        lecturas suficientes, consumo 0 y horas inf si la batería no baja.
+        """
+        ahora = time.time() if ahora is None else ahora
+        filas = np.fromiter((self._filas.get(n, -1) for n in nodos), dtype=np.int64, count=len(nodos))
+        conocidas = filas >= 0
+        consumo = np.full(len(filas), np.nan)
+        horas = np.full(len(filas), np.nan)
+        if conocidas.any():
+            f = filas[conocidas]
+            _, b, peso = self.tendencia.ajuste(f)
+            tasa = -b * 3600
+            faltan = self.tendencia.tiempo_hasta_bajar(f, 0.0, self.peso_minimo) / 3600
+            estable = tasa < self.consumo_minimo
+            tasa[estable] = 0.0
+            faltan[estable & (faltan > 0)] = np.inf
+            # sin tiempo o puntos suficientes, la pendiente es ruido
+            pocos = (peso < self.peso_minimo) | ~(ahora - self._inicio[f] >= self.span_minimo)
+            tasa[pocos] = np.nan
+            faltan[pocos] = np.nan
+            consumo[conocidas] = tasa
+            horas[conocidas] = faltan
+        return consumo.tolist(), horas.tolist()
@@ -0,0 +1,181 @@
+import math
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+# El registro es sólo de agregado: reconocer una alerta no la modifica, se
+# anota aparte en 'reconocimientos'.
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS alertas (
+    id        INTEGER PRIMARY KEY,
+    ts        REAL    NOT NULL,
+    nodo      TEXT    NOT NULL,
+    regla     TEXT    NOT NULL,
+    severidad TEXT    NOT NULL,
+    estado    TEXT    NOT NULL,
+    valor     REAL,
+    mensaje   TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alertas_ts ON alertas (ts);
+CREATE INDEX IF NOT EXISTS idx_alertas_nodo_severidad_estado ON alertas (nodo, severidad, estado);
+CREATE INDEX IF NOT EXISTS idx_alertas_severidad_estado ON alertas (severidad, estado);
+CREATE INDEX IF NOT EXISTS idx_alertas_estado ON alertas (estado);
+DROP INDEX IF EXISTS idx_alertas_nodo_severidad;
+DROP INDEX IF EXISTS idx_alertas_severidad;
+CREATE TABLE IF NOT EXISTS reconocimientos (
+    alerta  INTEGER PRIMARY KEY REFERENCES alertas (id),
+    ts      REAL    NOT NULL,
+    usuario TEXT    NOT NULL DEFAULT ''
+);
+"""
+
+_COLUMNAS = "a.id, a.ts, a.nodo, a.regla, a.severidad, a.estado, a.valor, a.mensaje, r.ts"
+_CLAVES = ("id", "ts", "nodo", "regla", "severidad", "estado", "valor", "mensaje", "reconocida")
+
+
+class RegistroAlertas:
+    """
+    Historial de alertas en SQLite (modo WAL), indexado por nodo,
+    severidad y tiempo.
+
+    Las consultas son por páginas con keyset (id < último id de la página
+    anterior) en lugar de OFFSET, así que ir a la página siguiente cuesta lo
+    mismo con cien alertas que con cientos de miles y nunca se cargan todas.
+
+    filtros (todos opcionales): {"nodo", "severidad", "estado",
+    "sin_reconocer": bool, "desde": ts, "hasta": ts}
+    """
+
+    def __init__(self, ruta: str = "alertas.db"):
+        self.ruta = ruta
+        self._local = threading.local()
+        conn = self._conectar()
+        conn.executescript(_ESQUEMA)
+        conn.commit()
+
+    # escritura
+
+    def agregar(self, eventos: Iterable[dict]) -> int:
+        """Guarda eventos de MotorAlertas en una transacción. Son pocos: no hace falta un hilo."""
+        filas = [(e["ts"], str(e["nodo"]), e["regla"], e["severidad"], e["estado"],
+                  None if _es_nan(e.get("valor")) else e.get("valor"), e["mensaje"])
+                 for e in eventos]
+        if not filas:
+            return 0
+        try:
+            with self._conectar() as conn:
+                conn.executemany(
+                    "INSERT INTO alertas (ts, nodo, regla, severidad, estado, valor, mensaje) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+        except sqlite3.Error as e:
+            print(f"[ERROR] Alertas: no se pudieron guardar {len(filas)} alertas: {e}")
+            return 0
+        return len(filas)
+
+    def reconocer(self, ids: Iterable[int], usuario: str = "") -> float:
+        """Marca alertas como reconocidas (las ya reconocidas conservan su fecha)."""
+        ahora = time.time()
+        with self._conectar() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO reconocimientos (alerta, ts, usuario) VALUES (?, ?, ?)",
+                [(i, ahora, usuario) for i in ids])
+        return ahora
+
+    # lectura
+
+    def consultar(self, filtros: Optional[dict] = None, antes_de: Optional[int] = None,
+                  despues_de: Optional[int] = None, limite: int = 500) -> List[dict]:
+        """
+        Una página de alertas, de la más nueva a la más vieja.
+
+        antes_de: id de la última fila de la página actual (página siguiente).
+        despues_de: id de la primera fila de la página actual (página anterior).
+        """
+        where, params = self._where(filtros, por_id=True)
+        if antes_de is not None:
+            where.append("a.id < ?")
+            params.append(antes_de)
+        orden = "DESC"
+        if despues_de is not None:
+            where.append("a.id > ?")
+            params.append(despues_de)
+            orden = "ASC"
+        sql = (f"SELECT {_COLUMNAS} FROM alertas a LEFT JOIN reconocimientos r ON r.alerta = a.id "
+               f"{self._sql_where(where)} ORDER BY a.id {orden} LIMIT ?")
+        filas = self._conectar().execute(sql, (*params, limite)).fetchall()
+        if orden == "ASC":
+            filas.reverse()
+        return [dict(zip(_CLAVES, fila)) for fila in filas]
+
+    def contar(self, filtros: Optional[dict] = None, despues_de: Optional[int] = None,
+               antes_de: Optional[int] = None) -> int:
+        """
+        Alertas que cumplen los filtros, opcionalmente sólo las de id en
+        (despues_de, antes_de). Con todo el historial puede tardar decenas de
+        ms: para llevar un total al día contar sólo las llegadas desde la
+        última cuenta (ver AlertasPage).
+        """
+        where, params = self._where(filtros, por_id=despues_de is not None or antes_de is not None)
+        if despues_de is not None:
+            where.append("a.id > ?")
+            params.append(despues_de)
+        if antes_de is not None:
+            where.append("a.id < ?")
+            params.append(antes_de)
+        return self._conectar().execute(
+            f"SELECT COUNT(*) FROM alertas a {self._sql_where(where)}", params).fetchone()[0]
+
+    def ultimo_id(self) -> int:
+        return self._conectar().execute("SELECT COALESCE(MAX(id), 0) FROM alertas").fetchone()[0]
+
+    def nodos(self) -> List[str]:
+        return [f[0] for f in self._conectar().execute("SELECT DISTINCT nodo FROM alertas ORDER BY nodo")]
+
+    @staticmethod
+    def _where(filtros: Optional[dict], por_id: bool = False) -> Tuple[List[str], list]:
+        """
+        por_id: la consulta recorre un rango u orden de id. Severidad y estado
+        (dos valores cada uno) se sacan entonces de la elección de índice con
+        '+': la clave primaria encuentra antes la página o las alertas nuevas
+        que un índice por severidad o estado, que sólo sirve para contar todo.
+        """
+        filtros = filtros or {}
+        where, params = [], []
+        for campo in ("nodo", "severidad", "estado"):
+            if filtros.get(campo):
+                prefijo = "+" if por_id and campo != "nodo" else ""
+                where.append(f"{prefijo}a.{campo} = ?")
+                params.append(str(filtros[campo]))
+        if filtros.get("desde") is not None:
+            where.append("a.ts >= ?")
+            params.append(filtros["desde"])
+        if filtros.get("hasta") is not None:
+            where.append("a.ts < ?")
+            params.append(filtros["hasta"])
+        if filtros.get("sin_reconocer"):
+            where.append("NOT EXISTS (SELECT 1 FROM reconocimientos x WHERE x.alerta = a.id)")
+        return where, params
+
+    @staticmethod
+    def _sql_where(where: List[str]) -> str:
+        return "WHERE " + " AND ".join(where) if where else ""
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def cerrar(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _es_nan(valor) -> bool:
+    return isinstance(valor, float) and math.isnan(valor)
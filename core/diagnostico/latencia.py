@@ -0,0 +1,139 @@
+import json
+import time
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+# Marcas de tiempo (time.perf_counter, mismo reloj en todos los procesos)
+# que viajan dentro de cada lectura:
+T_RX = "_t_rx"        # ESP32Serial: llegó del puerto
+T_EMIT = "_t_emit"    # ESP32Worker: se emitió hacia la UI
+
+_SUB = 32            # sub-buckets por potencia de 2 (~3% de precisión)
+_BITS_SUB = 5
+_MAGNITUDES = 27     # 1 µs .. ~2^31 µs (~35 min)
+
+
+class HistogramaHDR:
+    """
+    Histograma log-lineal de latencias en microsegundos, memoria fija.
+
+    Como HdrHistogram: valores < 32 µs van en buckets de 1 µs y de ahí en
+    más cada potencia de 2 se parte en 32 buckets, así que el error relativo
+    de cualquier percentil queda por debajo del 3 % sin guardar muestras.
+    """
+
+    def __init__(self):
+        self.cuentas = np.zeros(_SUB * _MAGNITUDES, dtype=np.int64)
+        self.total = 0
+        self.maximo = 0.0
+
+    @staticmethod
+    def _indices(us: np.ndarray) -> np.ndarray:
+        v = np.maximum(us, 0).astype(np.int64)
+        mag = np.zeros_like(v)
+        grandes = v >= _SUB
+        mag[grandes] = np.floor(np.log2(v[grandes])).astype(np.int64) - _BITS_SUB + 1
+        sub = v >> np.maximum(mag - 1, 0)
+        sub[grandes] -= _SUB
+        idx = np.where(grandes, mag * _SUB + sub, v)
+        return np.minimum(idx, _SUB * _MAGNITUDES - 1)
+
+    @staticmethod
+    def _limite_superior(idx: np.ndarray) -> np.ndarray:
+        mag, sub = np.divmod(idx, _SUB)
+        base = np.where(mag == 0, sub, (sub + _SUB) << np.maximum(mag - 1, 0))
+        ancho = np.where(mag == 0, 1, 1 << np.maximum(mag - 1, 0))
+        return base + ancho - 1
+
+    def registrar(self, segundos: Iterable[float]):
+        us = np.asarray(segundos, dtype=np.float64) * 1e6
+        if not us.size:
+            return
+        np.add.at(self.cuentas, self._indices(us), 1)
+        self.total += us.size
+        self.maximo = max(self.maximo, float(us.max()))
+
+    def percentil(self, p: float) -> float:
+        """Valor en µs bajo el que cae el p % de las muestras (cota superior del bucket)."""
+        if not self.total:
+            return 0.0
+        objetivo = max(1, int(np.ceil(self.total * p / 100)))
+        idx = int(np.searchsorted(np.cumsum(self.cuentas), objetivo))
+        return float(min(self._limite_superior(np.array([idx]))[0], self.maximo))
+
+    def reiniciar(self):
+        self.cuentas[:] = 0
+        self.total = 0
+        self.maximo = 0.0
+
+
+class RegistroLatencias:
+    """
+    Histogramas por etapa del camino de una lectura:
+
+        puerto→worker   de T_RX a T_EMIT (lectura, decodificación, coalescido)
+        worker→<ui>     de T_EMIT a que la vista la aplica (cola de eventos Qt)
+        total→<ui>      de T_RX a que la vista la aplica
+
+    registrar_emision() lo llama el worker al emitir y registrar_lote() cada
+    vista desde el hilo de la UI con el lote ya aplicado.
+    """
+
+    PERCENTILES = (50, 90, 99, 99.9)
+
+    def __init__(self):
+        # la del worker se crea acá: el diccionario sólo crece desde la UI
+        self.etapas: Dict[str, HistogramaHDR] = {"puerto→worker": HistogramaHDR()}
+        self.habilitado = True
+
+    def histograma(self, etapa: str) -> HistogramaHDR:
+        h = self.etapas.get(etapa)
+        if h is None:
+            h = self.etapas[etapa] = HistogramaHDR()
+        return h
+
+    def registrar_emision(self, lote: List[dict], t_emit: float):
+        if not self.habilitado or not lote:
+            return
+        self.etapas["puerto→worker"].registrar(t_emit - self._marcas(lote, T_RX))
+
+    def registrar_lote(self, lote: List[dict], vista: str):
+        if not self.habilitado or not lote:
+            return
+        ahora = time.perf_counter()
+        self.histograma(f"worker→{vista}").registrar(ahora - self._marcas(lote, T_EMIT))
+        self.histograma(f"total→{vista}").registrar(ahora - self._marcas(lote, T_RX))
+
+    @staticmethod
+    def _marcas(lote: List[dict], clave: str) -> np.ndarray:
+        marcas = np.fromiter((d.get(clave, np.nan) for d in lote), dtype=np.float64, count=len(lote))
+        return marcas[~np.isnan(marcas)]
+
+    def resumen(self) -> List[dict]:
+        filas = []
+        for etapa, h in list(self.etapas.items()):
+            fila = {"etapa": etapa, "n": h.total, "max_ms": h.maximo / 1000}
+            for p in self.PERCENTILES:
+                fila[f"p{p:g}_ms"] = h.percentil(p) / 1000
+            filas.append(fila)
+        return filas
+
+    def reiniciar(self):
+        for h in self.etapas.values():
+            h.reiniciar()
+
+    def volcar(self, ruta: str):
+        """Guarda el resumen y los buckets crudos (para combinar corridas) en JSON."""
+        datos = {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "resumen": self.resumen(),
+            "buckets": {etapa: {str(i): int(c) for i, c in enumerate(h.cuentas) if c}
+                        for etapa, h in self.etapas.items()},
+        }
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(datos, f, indent=2, ensure_ascii=False)
+
+
+# registro único de la aplicación
+LATENCIAS = RegistroLatencias()
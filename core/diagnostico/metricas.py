@@ -0,0 +1,258 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+
+class _Metrica:
+    """Base: una serie por combinación de valores de etiquetas."""
+
+    tipo = ""
+
+    def __init__(self, registro: "RegistroMetricas", nombre: str, ayuda: str,
+                 etiquetas: Sequence[str] = ()):
+        self._registro = registro
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._series: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _nombre_serie(self, valores: tuple, sufijo: str = "", extra: str = "") -> str:
+        pares = [f'{k}="{v}"' for k, v in zip(self.etiquetas, valores)]
+        if extra:
+            pares.append(extra)
+        return f"{self.nombre}{sufijo}{{{','.join(pares)}}}" if pares else self.nombre + sufijo
+
+    def reiniciar(self):
+        with self._lock:
+            self._series.clear()
+
+    def lineas(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, n: float = 1, etiquetas: tuple = ()):
+        if not self._registro.habilitado or not n:
+            return
+        with self._lock:
+            self._series[etiquetas] = self._series.get(etiquetas, 0) + n
+
+    def valor(self, etiquetas: tuple = ()) -> float:
+        return self._series.get(etiquetas, 0)
+
+    def lineas(self) -> List[str]:
+        with self._lock:
+            series = list(self._series.items())
+        return [f"{self._nombre_serie(k)} {v:g}" for k, v in series]
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def fijar(self, valor: float, etiquetas: tuple = ()):
+        if not self._registro.habilitado:
+            return
+        with self._lock:
+            self._series[etiquetas] = valor
+
+    def valor(self, etiquetas: tuple = ()) -> float:
+        return self._series.get(etiquetas, 0)
+
+    def lineas(self) -> List[str]:
+        with self._lock:
+            series = list(self._series.items())
+        return [f"{self._nombre_serie(k)} {v:g}" for k, v in series]
+
+
+class Histograma(_Metrica):
+    """Buckets acumulativos como los de Prometheus (le = límite superior)."""
+
+    tipo = "histogram"
+    LIMITES = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+    def __init__(self, registro, nombre, ayuda, etiquetas=(), limites: Sequence[float] = LIMITES):
+        super().__init__(registro, nombre, ayuda, etiquetas)
+        self.limites = tuple(limites)
+
+    def observar(self, valor: float, etiquetas: tuple = ()):
+        if not self._registro.habilitado:
+            return
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                # cuentas por bucket (la última es +Inf), suma y total
+                serie = self._series[etiquetas] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            serie[0][bisect_left(self.limites, valor)] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def lineas(self) -> List[str]:
+        with self._lock:
+            series = [(k, list(c), s, n) for k, (c, s, n) in self._series.items()]
+        lineas = []
+        for k, cuentas, suma, total in series:
+            acumulado = 0
+            for limite, c in zip(self.limites + (float("inf"),), cuentas):
+                acumulado += c
+                le = "+Inf" if limite == float("inf") else f"{limite:g}"
+                extra = f'le="{le}"'
+                lineas.append(f"{self._nombre_serie(k, '_bucket', extra)} {acumulado}")
+            lineas.append(f"{self._nombre_serie(k, '_sum')} {suma:g}")
+            lineas.append(f"{self._nombre_serie(k, '_count')} {total}")
+        return lineas
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    registro: "RegistroMetricas" = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        cuerpo = self.registro.texto_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        # sin una línea en consola por cada consulta
+        pass
+
+
+class RegistroMetricas:
+    """
+    Métricas de la aplicación (contadores, medidores e histogramas).
+
+    Deshabilitado por defecto: mientras lo esté, inc/fijar/observar vuelven
+    de inmediato y no se guarda nada. iniciar() lo habilita y, si se pide,
+    publica el formato de texto de Prometheus en http://127.0.0.1:<puerto>/metrics
+    y/o lo escribe cada 'intervalo' segundos en 'archivo', conservando las
+    'copias' anteriores (archivo.1, archivo.2, ...).
+    """
+
+    def __init__(self):
+        self.habilitado = False
+        self._metricas: Dict[str, _Metrica] = {}
+        self._servidor: Optional[ThreadingHTTPServer] = None
+        self._detener = threading.Event()
+        self._hilos: List[threading.Thread] = []
+
+    # definición
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        if metrica.nombre in self._metricas:
+            raise ValueError(f"Métrica duplicada: {metrica.nombre}")
+        self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(self, nombre, ayuda, etiquetas))
+
+    def medidor(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Medidor:
+        return self._registrar(Medidor(self, nombre, ayuda, etiquetas))
+
+    def histograma(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                   limites: Sequence[float] = Histograma.LIMITES) -> Histograma:
+        return self._registrar(Histograma(self, nombre, ayuda, etiquetas, limites))
+
+    # exposición
+
+    def texto_prometheus(self) -> str:
+        bloques = []
+        for m in list(self._metricas.values()):
+            bloques.append(f"# HELP {m.nombre} {m.ayuda}")
+            bloques.append(f"# TYPE {m.nombre} {m.tipo}")
+            bloques.extend(m.lineas())
+        return "\n".join(bloques) + "\n"
+
+    def guardar(self, ruta: str, copias: int = 5):
+        """Escribe una instantánea en ruta rotando las anteriores."""
+        if copias > 0 and os.path.exists(ruta):
+            for i in range(copias - 1, 0, -1):
+                if os.path.exists(f"{ruta}.{i}"):
+                    os.replace(f"{ruta}.{i}", f"{ruta}.{i + 1}")
+            os.replace(ruta, f"{ruta}.1")
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(f"# instantánea {time.strftime('%Y-%m-%dT%H:%M:%S')}\n")
+            f.write(self.texto_prometheus())
+        os.replace(temporal, ruta)
+
+    def iniciar(self, puerto_http: Optional[int] = None, archivo: Optional[str] = None,
+                intervalo: float = 60, copias: int = 5):
+        self.detener()
+        self.habilitado = True
+        self._detener.clear()
+
+        if puerto_http:
+            manejador = type("Manejador", (_Manejador,), {"registro": self})
+            try:
+                self._servidor = ThreadingHTTPServer(("127.0.0.1", int(puerto_http)), manejador)
+            except OSError as e:
+                print(f"[ERROR] No se pudo abrir el puerto de métricas {puerto_http}: {e}")
+            else:
+                self._servidor.daemon_threads = True
+                hilo = threading.Thread(target=self._servidor.serve_forever, name="metricas-http",
+                                        daemon=True)
+                hilo.start()
+                self._hilos.append(hilo)
+                print(f"[INFO] Métricas en http://127.0.0.1:{puerto_http}/metrics")
+
+        if archivo:
+            hilo = threading.Thread(target=self._guardar_periodico, args=(archivo, intervalo, copias),
+                                    name="metricas-archivo", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def _guardar_periodico(self, ruta: str, intervalo: float, copias: int):
+        while not self._detener.wait(intervalo):
+            try:
+                self.guardar(ruta, copias)
+            except OSError as e:
+                print(f"[ERROR] No se pudo guardar la instantánea de métricas: {e}")
+
+    def detener(self):
+        self._detener.set()
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+        for hilo in self._hilos:
+            hilo.join(timeout=2)
+        self._hilos.clear()
+        self.habilitado = False
+
+    def reiniciar(self):
+        for m in self._metricas.values():
+            m.reiniciar()
+
+
+# registro único de la aplicación y las métricas que usan los módulos
+METRICAS = RegistroMetricas()
+
+LECTURAS_RECIBIDAS = METRICAS.contador(
+    "esp32_lecturas_recibidas_total", "Lecturas decodificadas desde los puertos")
+LECTURAS_MALFORMADAS = METRICAS.contador(
+    "esp32_lecturas_malformadas_total", "Líneas JSON inválidas o tramas binarias descartadas")
+LECTURAS_DESCARTADAS = METRICAS.contador(
+    "esp32_lecturas_descartadas_total",
+    "Lecturas válidas que no llegaron a la UI (anillo lleno o reemplazadas al coalescer)",
+    ("motivo",))
+BYTES_RECIBIDOS = METRICAS.contador(
+    "esp32_bytes_recibidos_total", "Bytes leídos de los puertos")
+PROFUNDIDAD_COLA = METRICAS.medidor(
+    "ingesta_cola_profundidad", "Lecturas esperando en cada cola de la ingesta", ("cola",))
+ACTUALIZACION_UI = METRICAS.histograma(
+    "ui_actualizacion_segundos", "Tiempo de aplicar lecturas y repintar cada vista", ("vista",))
+ALERTAS = METRICAS.contador(
+    "alertas_total", "Alertas disparadas", ("tipo",))
+DISPOSITIVOS = METRICAS.medidor(
+    "dispositivos", "Dispositivos registrados por estado", ("estado",))
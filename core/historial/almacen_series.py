@@ -0,0 +1,256 @@
+import math
+import sqlite3
+import threading
+import time
+from queue import Empty, Full, Queue
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from core.sensores.protocolo_binario import CAMPOS_VALOR
+
+# Campos que se guardan, por índice (la columna 'campo' es el índice en esta tupla)
+CAMPOS = CAMPOS_VALOR
+_INDICE_CAMPO = {campo: i for i, campo in enumerate(CAMPOS)}
+SENTINELA = -255
+
+# Resúmenes precalculados (segundos por bucket): 1 min, 1 h, 1 día
+NIVELES_ROLLUP = (60, 3600, 86400)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS lecturas (
+    ts    REAL    NOT NULL,
+    nodo  INTEGER NOT NULL,
+    campo INTEGER NOT NULL,
+    valor REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lecturas_nodo_campo_ts ON lecturas (nodo, campo, ts);
+CREATE TABLE IF NOT EXISTS nodos (nodo INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS rollup (
+    nivel  INTEGER NOT NULL,
+    nodo   INTEGER NOT NULL,
+    campo  INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    n      INTEGER NOT NULL,
+    suma   REAL    NOT NULL,
+    minimo REAL    NOT NULL,
+    maximo REAL    NOT NULL,
+    PRIMARY KEY (nivel, nodo, campo, bucket)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_ROLLUP = """
+INSERT INTO rollup (nivel, nodo, campo, bucket, n, suma, minimo, maximo)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (nivel, nodo, campo, bucket) DO UPDATE SET
+    n = n + excluded.n,
+    suma = suma + excluded.suma,
+    minimo = min(minimo, excluded.minimo),
+    maximo = max(maximo, excluded.maximo)
+"""
+
+
+class AlmacenSeries:
+    """
+    Historial de lecturas en SQLite (modo WAL), sólo de agregado.
+
+    agregar_lote() no bloquea: encola las lecturas y un hilo escritor las
+    inserta por lotes en una sola transacción. Las consultas abren su propia
+    conexión por hilo, así que la UI puede leer mientras se escribe.
+
+    En la misma transacción se actualizan los resúmenes por minuto, hora y
+    día (n, suma, mínimo, máximo) que usa consultar_reducido() para rangos
+    largos.
+    """
+
+    def __init__(self, ruta: str = "historial.db", max_pendientes: int = 200_000,
+                 intervalo_escritura: float = 0.5):
+        self.ruta = ruta
+        self.intervalo_escritura = intervalo_escritura
+        self.descartadas = 0
+
+        self._cola: Queue = Queue(maxsize=max_pendientes)
+        self._local = threading.local()
+        self._stop_event = threading.Event()
+
+        conn = self._conectar()
+        conn.executescript(_ESQUEMA)
+        conn.commit()
+        self._completar_rollup(conn)
+
+        self._hilo = threading.Thread(target=self._hilo_escritor, daemon=True)
+        self._hilo.start()
+
+    # escritura
+
+    def agregar_lote(self, lecturas: Iterable[Dict[str, Union[int, float]]],
+                     ts: Optional[float] = None):
+        """Encola lecturas normalizadas (las de ESP32Serial). No bloquea."""
+        if ts is None:
+            ts = time.time()
+        filas = []
+        for datos in lecturas:
+            nodo = datos.get("ID")
+            if nodo is None or nodo == SENTINELA:
+                continue
+            for campo, i in _INDICE_CAMPO.items():
+                valor = datos.get(campo, SENTINELA)
+                # NaN, None o texto romperían el INSERT (y con él todo el lote)
+                if (isinstance(valor, (int, float)) and not isinstance(valor, bool)
+                        and math.isfinite(valor) and valor != SENTINELA):
+                    filas.append((ts, nodo, i, valor))
+        if not filas:
+            return
+        try:
+            self._cola.put_nowait(filas)
+        except Full:
+            self.descartadas += len(filas)
+
+    def _hilo_escritor(self):
+        conn = sqlite3.connect(self.ruta)
+        self._configurar(conn)
+        while not self._stop_event.is_set() or not self._cola.empty():
+            try:
+                lotes = [self._cola.get(timeout=self.intervalo_escritura)]
+            except Empty:
+                continue
+            # juntar todo lo pendiente en una sola transacción
+            while True:
+                try:
+                    lotes.append(self._cola.get_nowait())
+                except Empty:
+                    break
+            if not self._guardar(conn, [fila for lote in lotes for fila in lote]) and len(lotes) > 1:
+                # reintentar lote por lote: sólo se pierde el que falla
+                for lote in lotes:
+                    self._guardar(conn, lote)
+        conn.close()
+
+    def _guardar(self, conn: sqlite3.Connection, filas: List[tuple]) -> bool:
+        try:
+            with conn:
+                self._escribir(conn, filas)
+            return True
+        except Exception as e:
+            # un lote malo no debe terminar el hilo escritor
+            print(f"[ERROR] Historial: no se pudieron guardar {len(filas)} valores: {e}")
+            return False
+
+    def _escribir(self, conn: sqlite3.Connection, filas: List[tuple]):
+        conn.executemany("INSERT INTO lecturas (ts, nodo, campo, valor) VALUES (?, ?, ?, ?)", filas)
+        conn.executemany("INSERT OR IGNORE INTO nodos (nodo) VALUES (?)",
+                         [(nodo,) for nodo in {fila[1] for fila in filas}])
+
+        # agregar el lote en memoria y hacer un upsert por bucket
+        resumen = {}
+        for ts, nodo, campo, valor in filas:
+            for nivel in NIVELES_ROLLUP:
+                clave = (nivel, nodo, campo, int(ts // nivel))
+                r = resumen.get(clave)
+                if r is None:
+                    resumen[clave] = [1, valor, valor, valor]
+                else:
+                    r[0] += 1
+                    r[1] += valor
+                    if valor < r[2]:
+                        r[2] = valor
+                    elif valor > r[3]:
+                        r[3] = valor
+        conn.executemany(_UPSERT_ROLLUP, [clave + tuple(r) for clave, r in resumen.items()])
+
+    def _completar_rollup(self, conn: sqlite3.Connection):
+        # bases creadas antes de existir los resúmenes
+        if conn.execute("SELECT 1 FROM rollup LIMIT 1").fetchone() is not None:
+            return
+        if conn.execute("SELECT 1 FROM lecturas LIMIT 1").fetchone() is None:
+            return
+        print("[INFO] Historial: calculando resúmenes del historial existente...")
+        with conn:
+            for nivel in NIVELES_ROLLUP:
+                conn.execute(
+                    """INSERT INTO rollup (nivel, nodo, campo, bucket, n, suma, minimo, maximo)
+                       SELECT ?, nodo, campo, CAST(ts / ? AS INTEGER), COUNT(*), SUM(valor), MIN(valor), MAX(valor)
+                       FROM lecturas GROUP BY nodo, campo, CAST(ts / ? AS INTEGER)""",
+                    (nivel, nivel, nivel),
+                )
+
+    # lectura
+
+    def consultar(self, nodo: int, campo: str, t0: float, t1: float) -> List[Tuple[float, float]]:
+        """Valores crudos (ts, valor) de un nodo y campo en [t0, t1)."""
+        return self._conectar().execute(
+            "SELECT ts, valor FROM lecturas WHERE nodo = ? AND campo = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (nodo, _INDICE_CAMPO[campo], t0, t1),
+        ).fetchall()
+
+    def consultar_lecturas(self, t0: float, t1: float,
+                           nodos: Optional[Iterable[int]] = None) -> List[Tuple[float, int, int, float]]:
+        """Todas las lecturas crudas (ts, nodo, índice de campo, valor) en [t0, t1), por nodo y ts."""
+        sql = "SELECT ts, nodo, campo, valor FROM lecturas WHERE ts >= ? AND ts < ?"
+        params: list = [t0, t1]
+        if nodos is not None:
+            nodos = list(nodos)
+            sql += f" AND nodo IN ({', '.join('?' * len(nodos))})"
+            params += nodos
+        return self._conectar().execute(sql + " ORDER BY nodo, ts, campo", params).fetchall()
+
+    def consultar_reducido(self, nodo: int, campo: str, t0: float, t1: float,
+                           max_puntos: int) -> List[Tuple[float, float, float, float]]:
+        """
+        Serie reducida a lo sumo a max_puntos buckets de igual ancho en [t0, t1).
+
+        Devuelve (t_centro, mínimo, máximo, promedio) por bucket con datos. El
+        agrupamiento lo hace SQLite y, si el bucket pedido es de al menos un
+        minuto, parte del resumen más grueso que alcance en lugar de las
+        lecturas crudas, así el costo depende de max_puntos y no del rango.
+        """
+        ancho = (t1 - t0) / max(1, max_puntos)
+        if ancho <= 0:
+            return []
+        i_campo = _INDICE_CAMPO[campo]
+        nivel = max((n for n in NIVELES_ROLLUP if n <= ancho), default=None)
+
+        if nivel is None:
+            filas = self._conectar().execute(
+                """SELECT CAST((ts - ?) / ? AS INTEGER) AS b, MIN(valor), MAX(valor), AVG(valor)
+                   FROM lecturas
+                   WHERE nodo = ? AND campo = ? AND ts >= ? AND ts < ?
+                   GROUP BY b ORDER BY b""",
+                (t0, ancho, nodo, i_campo, t0, t1),
+            ).fetchall()
+        else:
+            filas = self._conectar().execute(
+                """SELECT CAST((bucket * ? - ?) / ? AS INTEGER) AS b, MIN(minimo), MAX(maximo), SUM(suma) / SUM(n)
+                   FROM rollup
+                   WHERE nivel = ? AND nodo = ? AND campo = ? AND bucket >= ? AND bucket < ?
+                   GROUP BY b ORDER BY b""",
+                # sólo resúmenes que empiezan en t0 o después: uno anterior
+                # mezclaría lecturas de antes de t0 en el primer punto
+                (nivel, t0, ancho, nivel, nodo, i_campo,
+                 math.ceil(t0 / nivel), math.ceil(t1 / nivel)),
+            ).fetchall()
+
+        # el último resumen puede asomar pasado t1
+        return [(t0 + (b + 0.5) * ancho, minimo, maximo, promedio)
+                for b, minimo, maximo, promedio in filas if b < max_puntos]
+
+    def nodos(self) -> List[int]:
+        return [fila[0] for fila in self._conectar().execute(
+            "SELECT nodo FROM nodos ORDER BY nodo")]
+
+    def _conectar(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta)
+            self._configurar(conn)
+            self._local.conn = conn
+        return conn
+
+    def _configurar(self, conn: sqlite3.Connection):
+        conn.execute("PRAGMA journal_mode=WAL")
+        # en WAL, NORMAL no corrompe la base ante un corte, sólo puede perder
+        # las últimas transacciones
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+    def cerrar(self):
+        """Escribe lo pendiente y detiene el hilo escritor."""
+        self._stop_event.set()
+        self._hilo.join()
@@ -0,0 +1,209 @@
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.sensores.protocolo_binario import CAMPOS_VALOR
+from core.sensores.golpes import vueltas
+
+CAMPOS = CAMPOS_VALOR
+SENTINELA = -255
+
+# códigos por valor (0 = normal) y el motivo que se muestra
+NORMAL, SIN_DATO, FUERA_DE_RANGO, ATASCADO, SALTO = range(5)
+MOTIVOS = ("", "sin dato", "fuera de rango", "atascado", "salto")
+
+# rango físico de cada sensor; fuera de él es una falla, no una excursión
+RANGOS = {
+    "T_Amb": (-40, 85), "T_Sonda": (-55, 125), "Hum": (0, 100), "Luz": (0, 200_000),
+    "Rocío": (-60, 60), "Bat": (0, 100), "Acc": (0, 16),
+}
+# variación mínima esperable entre lecturas (resolución del sensor): evita
+# que un campo muy quieto marque como salto cualquier cambio
+SIGMA_MINIMA = {
+    "T_Amb": 0.05, "T_Sonda": 0.05, "Hum": 0.5, "Luz": 5, "Rocío": 0.05, "Bat": 0.5, "Acc": 0.02,
+}
+# campos que nunca se quedan quietos si el sensor funciona (Luz puede estar
+# en 0 toda la noche y Bat no moverse por horas)
+CAMPOS_ATASCO = ("T_Amb", "T_Sonda", "Hum", "Rocío", "Acc")
+# campos donde un pico de una sola lectura es una falla; en Acc un pico es
+# justamente un golpe real (ver DetectorGolpes)
+CAMPOS_SALTO = ("T_Amb", "T_Sonda", "Hum", "Luz", "Rocío", "Bat")
+
+
+class DetectorAnomalias:
+    """
+    Fallas de sensor por nodo y campo, en línea y con memoria constante.
+
+    Por valor se marca:
+    - sin dato: llegó el sentinela -255.
+    - fuera de rango: imposible para el sensor (RANGOS).
+    - atascado: el mismo valor exacto 'repeticiones' veces seguidas.
+    - salto: el cambio respecto del último valor aceptado está a más de
+      z_max desvíos de los cambios habituales (varianza EWMA de los
+      incrementos, así las tendencias y ciclos normales no cuentan). Sólo
+      en CAMPOS_SALTO.
+
+    Un salto queda sospechoso hasta la lectura siguiente: si ésta sigue
+    cerca del valor nuevo era una excursión real y pasa a ser la referencia;
+    si vuelve cerca de la anterior era una falla del sensor. Los valores
+    marcados no entran en las estadísticas.
+
+    procesar() corre en el hilo de ingesta y deja en las lecturas con algún
+    valor marcado "sospechosos" = {campo: motivo}. evaluar_matriz() hace lo
+    mismo sobre un historial completo (ver evaluar_historial).
+    """
+
+    def __init__(self, z_max: float = 6, alfa: float = 0.05, minimo: int = 10,
+                 repeticiones: int = 30, capacidad: int = 256):
+        self.z_max = z_max
+        self.alfa = alfa
+        self.minimo = minimo
+        self.repeticiones = repeticiones
+        self._bajo = np.array([RANGOS[c][0] for c in CAMPOS], dtype=np.float64)
+        self._alto = np.array([RANGOS[c][1] for c in CAMPOS], dtype=np.float64)
+        self._sigma_minima = np.array([SIGMA_MINIMA[c] for c in CAMPOS], dtype=np.float64)
+        self._atasco = np.array([c in CAMPOS_ATASCO for c in CAMPOS])
+        self._salto = np.array([c in CAMPOS_SALTO for c in CAMPOS])
+        self._filas: Dict[Union[int, str], int] = {}
+        self._nodos: List[Union[int, str]] = []
+        self._reservar(capacidad)
+
+    def _reservar(self, capacidad: int):
+        forma = (capacidad, len(CAMPOS))
+        viejos = getattr(self, "_ref", None)
+        nuevos = {
+            "_ref": np.full(forma, np.nan),           # último valor aceptado
+            "_var": np.zeros(forma),                  # varianza EWMA de los incrementos
+            "_n": np.zeros(forma, dtype=np.int64),    # incrementos aceptados
+            "_ultimo": np.full(forma, np.nan),        # último valor válido (para el atasco)
+            "_repetido": np.zeros(forma, dtype=np.int64),
+            "_candidato": np.full(forma, np.nan),     # salto sin confirmar
+        }
+        if viejos is not None:
+            n = len(viejos)
+            for nombre in nuevos:
+                nuevos[nombre][:n] = getattr(self, nombre)
+        for nombre, arreglo in nuevos.items():
+            setattr(self, nombre, arreglo)
+
+    def _fila(self, nodo) -> int:
+        fila = self._filas.get(nodo)
+        if fila is None:
+            fila = self._filas[nodo] = len(self._nodos)
+            self._nodos.append(nodo)
+            if fila >= len(self._ref):
+                self._reservar(2 * len(self._ref))
+        return fila
+
+    def procesar(self, lote: List[dict]):
+        if not lote:
+            return
+        filas = np.fromiter((self._fila(d.get("ID", SENTINELA)) for d in lote), dtype=np.int64,
+                            count=len(lote))
+        valores = np.array([[d.get(c, np.nan) for c in CAMPOS] for d in lote], dtype=np.float64)
+        codigos = np.zeros(valores.shape, dtype=np.uint8)
+        for sel in vueltas(filas):
+            codigos[sel] = self.evaluar(filas[sel], valores[sel])
+
+        for i in np.flatnonzero(codigos.any(axis=1)).tolist():
+            lote[i]["sospechosos"] = {CAMPOS[j]: MOTIVOS[c]
+                                      for j, c in enumerate(codigos[i].tolist()) if c}
+
+    def evaluar(self, filas: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """
+        Una lectura por fila (sin repetir), x de (filas, campos) con NaN donde
+        no vino el campo. Devuelve los códigos y actualiza el estado.
+        """
+        sentinela = x == SENTINELA
+        with np.errstate(invalid="ignore"):
+            fuera = ~sentinela & ((x < self._bajo) | (x > self._alto))
+        valido = ~np.isnan(x) & ~sentinela & ~fuera
+
+        ultimo = self._ultimo[filas]
+        repetido = np.where(valido & (x == ultimo), self._repetido[filas] + 1,
+                            np.where(valido, 0, self._repetido[filas]))
+        self._repetido[filas] = repetido
+        self._ultimo[filas] = np.where(valido, x, ultimo)
+        atascado = valido & self._atasco & (repetido >= self.repeticiones - 1)
+
+        ref = self._ref[filas]
+        var = self._var[filas]
+        n = self._n[filas]
+        candidato = self._candidato[filas]
+        sigma = np.maximum(np.sqrt(var), self._sigma_minima)
+        with np.errstate(invalid="ignore"):
+            d = x - ref
+            # el salto anterior se confirma si esta lectura quedó cerca de él
+            confirma = valido & (np.abs(x - candidato) <= self.z_max * sigma)
+            salto = (valido & self._salto & ~atascado & ~confirma & (n >= self.minimo)
+                     & (np.abs(d) > self.z_max * sigma))
+        self._candidato[filas] = np.where(valido, np.where(salto, x, np.nan), candidato)
+
+        # estadísticas sólo con lo aceptado; una excursión confirmada mueve
+        # la referencia sin contar como incremento
+        acepta = valido & ~atascado & ~salto
+        incremento = acepta & ~confirma & ~np.isnan(ref)
+        alfa = np.maximum(self.alfa, 1.0 / (n + 1))
+        self._var[filas] = np.where(incremento, (1 - alfa) * var + alfa * np.nan_to_num(d) ** 2, var)
+        self._n[filas] = n + incremento
+        self._ref[filas] = np.where(acepta, x, ref)
+
+        codigos = np.zeros(x.shape, dtype=np.uint8)
+        codigos[salto] = SALTO
+        codigos[atascado] = ATASCADO
+        codigos[fuera] = FUERA_DE_RANGO
+        codigos[sentinela] = SIN_DATO
+        return codigos
+
+    def evaluar_matriz(self, valores: np.ndarray) -> np.ndarray:
+        """
+        Modo por lotes: valores de (muestras, nodos, campos), la lectura k de
+        cada nodo en valores[k] (NaN si el nodo tiene menos). Recorre las
+        muestras vectorizando sobre nodos y campos; devuelve los códigos.
+        Usa las filas 0..nodos-1: no mezclar con procesar() en el mismo detector.
+        """
+        n_muestras, n_nodos, _ = valores.shape
+        if n_nodos > len(self._ref):
+            self._reservar(n_nodos)
+        filas = np.arange(n_nodos)
+        codigos = np.zeros(valores.shape, dtype=np.uint8)
+        for k in range(n_muestras):
+            codigos[k] = self.evaluar(filas, valores[k])
+        return codigos
+
+
+def evaluar_historial(almacen, t0: float, t1: float, nodos: Optional[Sequence[int]] = None,
+                      **opciones) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Evalúa lo guardado en un AlmacenSeries en [t0, t1) con un detector nuevo.
+
+    Devuelve {nodo: (ts, códigos)} con ts de (lecturas,) y códigos de
+    (lecturas, campos), en el orden de CAMPOS.
+    """
+    filas = almacen.consultar_lecturas(t0, t1, nodos)
+    if not filas:
+        return {}
+    ts, nodo, campo, valor = np.array(filas, dtype=np.float64).T
+    nodo = nodo.astype(np.int64)
+    campo = campo.astype(np.int64)
+
+    # una lectura = mismo nodo y ts (vienen ordenadas por nodo, ts)
+    nueva = np.r_[True, (nodo[1:] != nodo[:-1]) | (ts[1:] != ts[:-1])]
+    lectura = np.cumsum(nueva) - 1
+    primeras = np.flatnonzero(nueva)
+    nodo_lectura = nodo[primeras]
+    ids, inicio_nodo = np.unique(nodo_lectura, return_index=True)
+    fila_nodo = np.searchsorted(ids, nodo_lectura)
+    # índice de cada lectura dentro de su nodo
+    muestra = np.arange(len(primeras)) - inicio_nodo[fila_nodo]
+
+    valores = np.full((muestra.max() + 1, len(ids), len(CAMPOS)), np.nan)
+    valores[muestra[lectura], fila_nodo[lectura], campo] = valor
+    codigos = DetectorAnomalias(**opciones).evaluar_matriz(valores)
+
+    resultado = {}
+    for j, id_nodo in enumerate(ids.tolist()):
+        propias = fila_nodo == j
+        k = muestra[propias]
+        resultado[id_nodo] = (ts[primeras[propias]], codigos[k, j])
+    return resultado
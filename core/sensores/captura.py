@@ -0,0 +1,197 @@
+import gzip
+import struct
+import time
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Archivo de captura:
+#   cabecera  MAGIC + protocolo (b"J" json / b"B" binario)
+#   registros <d t desde el inicio (s, reloj monotónico)><I largo><bytes crudos>
+# Si la ruta termina en .gz se escribe y se lee comprimido.
+MAGIC = b"ESPCAP1"
+REGISTRO = struct.Struct("<dI")
+
+
+def _abrir(ruta: str, modo: str) -> BinaryIO:
+    if ruta.endswith(".gz"):
+        return gzip.open(ruta, modo, compresslevel=6)
+    return open(ruta, modo)
+
+
+def es_captura(ruta: str) -> bool:
+    try:
+        with _abrir(ruta, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def leer_captura(ruta: str) -> Tuple[str, Iterator[Tuple[float, bytes]]]:
+    """Devuelve (protocolo, iterador de (t, bytes)) sin cargar el archivo entero."""
+    f = _abrir(ruta, "rb")
+    cabecera = f.read(len(MAGIC) + 1)
+    if cabecera[:len(MAGIC)] != MAGIC:
+        f.close()
+        raise ValueError(f"{ruta} no es una captura serial")
+    protocolo = "binario" if cabecera[-1:] == b"B" else "json"
+
+    def registros():
+        with f:
+            while True:
+                encabezado = f.read(REGISTRO.size)
+                if len(encabezado) < REGISTRO.size:
+                    return
+                t, largo = REGISTRO.unpack(encabezado)
+                datos = f.read(largo)
+                if len(datos) < largo:
+                    return          # captura cortada (p. ej. cierre abrupto)
+                yield t, datos
+
+    return protocolo, registros()
+
+
+class GrabadorCaptura:
+    """Guarda cada bloque leído del puerto con su instante de llegada."""
+
+    def __init__(self, ruta: str, protocolo: str = "json"):
+        self.ruta = ruta
+        self.bytes_grabados = 0
+        self._f = _abrir(ruta, "wb")
+        self._f.write(MAGIC + (b"B" if protocolo == "binario" else b"J"))
+        self._t0 = time.monotonic()
+
+    def escribir(self, datos: bytes):
+        if not datos or self._f is None:
+            return
+        self._f.write(REGISTRO.pack(time.monotonic() - self._t0, len(datos)))
+        self._f.write(datos)
+        self.bytes_grabados += len(datos)
+
+    def cerrar(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+class PuertoGrabado:
+    """
+    Envuelve un serial.Serial y graba todo lo que se lee de él. El resto de
+    atributos (in_waiting, timeout, write...) pasan al puerto real.
+    """
+
+    def __init__(self, ser, grabador: GrabadorCaptura):
+        self._ser = ser
+        self.grabador = grabador
+
+    def __getattr__(self, nombre):
+        return getattr(self._ser, nombre)
+
+    def __setattr__(self, nombre, valor):
+        if nombre in ("_ser", "grabador"):
+            object.__setattr__(self, nombre, valor)
+        else:
+            setattr(self._ser, nombre, valor)
+
+    def read(self, n: int = 1) -> bytes:
+        datos = self._ser.read(n)
+        self.grabador.escribir(datos)
+        return datos
+
+    def readline(self) -> bytes:
+        datos = self._ser.readline()
+        self.grabador.escribir(datos)
+        return datos
+
+
+class PuertoReproducido:
+    """
+    Puerto serie que devuelve una captura respetando sus tiempos.
+
+    velocidad: 1 = tiempo real, N = N veces más rápido, 0 = sin esperas.
+    repetir:   al terminar vuelve a empezar (útil para pruebas largas).
+    """
+
+    def __init__(self, ruta: str, velocidad: float = 1.0, repetir: bool = False,
+                 bloque_max: int = 65536):
+        self.ruta = ruta
+        self.velocidad = velocidad
+        self.repetir = repetir
+        self.bloque_max = bloque_max
+        self.protocolo, self._registros = leer_captura(ruta)
+        self.terminada = False
+        self.bytes_reproducidos = 0
+
+        self._siguiente: Optional[Tuple[float, bytes]] = next(self._registros, None)
+        self._salida = bytearray()
+        self._t0 = time.monotonic()
+        self._desfase = 0.0      # tiempo de captura acumulado de vueltas anteriores
+
+        self.timeout = 1
+        self.is_open = True
+        self.port = f"replay://{ruta}"
+
+    def _avanzar(self):
+        if self.velocidad <= 0:
+            limite = float("inf")
+        else:
+            limite = (time.monotonic() - self._t0) * self.velocidad - self._desfase
+        while self._siguiente is not None and self._siguiente[0] <= limite:
+            t, datos = self._siguiente
+            self._salida += datos
+            self.bytes_reproducidos += len(datos)
+            self._siguiente = next(self._registros, None)
+            if self._siguiente is None and self.repetir:
+                self._desfase += t
+                _, self._registros = leer_captura(self.ruta)
+                self._siguiente = next(self._registros, None)
+            if self.velocidad <= 0 and len(self._salida) >= self.bloque_max:
+                break
+        if self._siguiente is None and not self.terminada:
+            self.terminada = True
+            print(f"[INFO] Fin de la captura {self.ruta}.")
+
+    # interfaz de serial.Serial
+
+    @property
+    def in_waiting(self) -> int:
+        self._avanzar()
+        return len(self._salida)
+
+    def read(self, n: int = 1) -> bytes:
+        limite = time.monotonic() + (self.timeout or 0)
+        while not self.in_waiting and not self.terminada and time.monotonic() < limite:
+            time.sleep(0.005)
+        if not self._salida and self.terminada:
+            # como un puerto sin datos: esperar el timeout en lugar de girar
+            time.sleep(max(0.0, limite - time.monotonic()))
+        datos = bytes(self._salida[:n])
+        del self._salida[:n]
+        return datos
+
+    def readline(self) -> bytes:
+        # como pyserial: esperar el salto de línea (una línea puede venir
+        # repartida en dos bloques) y sólo al vencer el timeout devolver lo que haya
+        limite = time.monotonic() + (self.timeout or 0)
+        while True:
+            self._avanzar()
+            fin = self._salida.find(b"\n")
+            if fin != -1:
+                n = fin + 1
+                break
+            if self.terminada or time.monotonic() >= limite:
+                n = len(self._salida)
+                break
+            time.sleep(0.005)
+        if not n and self.terminada:
+            time.sleep(max(0.0, limite - time.monotonic()))
+        datos = bytes(self._salida[:n])
+        del self._salida[:n]
+        return datos
+
+    def write(self, datos: bytes) -> int:
+        return len(datos)
+
+    def reset_input_buffer(self):
+        self._salida.clear()
+
+    def close(self):
+        self.is_open = False
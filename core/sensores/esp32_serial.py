@@ -4,8 +4,41 @@ import math
 import random
 import threading
 import serial
-from queue import Queue
-from typing import Dict, Union
+from collections import deque
+from queue import Empty, Queue
+from typing import Dict, List, Union
+from urllib.parse import parse_qsl
+
+from core.sensores.protocolo_binario import (
+    ACK_BINARIO, CMD_BINARIO, TAM_TRAMA, decodificar_buffer
+)
+from core.sensores.simulador import SimuladorFlota
+from core.sensores.captura import GrabadorCaptura, PuertoGrabado, PuertoReproducido
+from core.diagnostico.latencia import T_RX
+from core.diagnostico.metricas import BYTES_RECIBIDOS, LECTURAS_MALFORMADAS, LECTURAS_RECIBIDAS
+
+
+def lectura_simulada(nodo_id: int, fase: float) -> Dict[str, Union[int, float]]:
+    """Lectura sintética de un nodo en la fase dada (misma forma que las reales)."""
+    T_Amb = 22 + 3 * math.sin(fase)
+    T_Sonda = T_Amb + 2 + 0.5 * math.sin(fase + 1.5)
+    Hum = 45 + 10 * math.sin(fase - 1)
+    Luz = 300 + 150 * math.sin(fase + 0.5)
+    Rocio = T_Sonda - ((100 - Hum) / 5.0)
+    Bat = 80 + 10 * math.sin(fase / 2)
+    Acc = 0.3 + 0.2 * math.sin(fase * 3.1 + nodo_id) + random.uniform(-0.05, 0.05)  # m/s²
+
+    return {
+        "ID": nodo_id,
+        "T_Amb": round(T_Amb, 2),
+        "T_Sonda": round(T_Sonda, 2),
+        "Hum": round(Hum, 2),
+        "Luz": round(Luz, 2),
+        "Rocío": round(Rocio, 2),
+        "Bat": round(Bat, 2),
+        "Acc": round(Acc, 3)
+    }
+
 
 class ESP32Serial:
     CAMPOS = ["ID", "T_Amb", "T_Sonda", "Hum", "Luz", "Rocío", "Bat", "Acc"]
@@ -17,22 +50,94 @@ class ESP32Serial:
         self._cola_sim = Queue()
         self._hilos_sim = []
         self._stop_event = threading.Event()
+        # espera máxima (s) de las lecturas cuando no llega nada
+        self.timeout = 1
+
+        # protocolo binario (ver protocolo_binario.py)
+        self.binario = False
+        self._buffer = bytearray()
+        self._pendientes = deque()
+        self.tramas_descartadas = 0
+        self.lineas_invalidas = 0
+        self.bytes_recibidos = 0
 
-    def configurar_conexion(self, puerto: Union[str, int], baudios: Union[int, float]) -> bool:
+    def configurar_conexion(self, puerto: Union[str, int], baudios: Union[int, float],
+                            protocolo: str = "json") -> bool:
+        """
+        protocolo: "json" (una línea JSON por lectura) o "binario". En modo
+        binario se negocia con el ESP32; si no confirma se usa JSON.
+
+        puerto "sim://<nodos>?semilla=..." usa un SimuladorFlota en lugar de
+        un puerto real (ver SimuladorFlota.desde_url) y
+        "replay://<archivo>?velocidad=N&repetir=1" reproduce una captura
+        (ver iniciar_captura); velocidad=0 la reproduce sin esperas.
+        """
         if puerto == -1 and baudios == -1:
             print("[INFO] Modo de simulación activado.")
             self.simulacion = True
             self._iniciar_simulacion()
             return True
-        try:
-            self.ser = serial.Serial(puerto, baudios, timeout=1)
+        if isinstance(puerto, str) and puerto.startswith("sim://"):
+            try:
+                self.ser = SimuladorFlota.desde_url(puerto)
+            except ValueError as e:
+                print(f"[ERROR] Simulador mal configurado ({puerto}): {e}")
+                return False
+            self.ser.timeout = self.timeout
+            self.simulacion = False
+            self.binario = False
+            print(f"[INFO] Simulando {self.ser.nodos} nodos ({puerto}).")
+            return True
+        if isinstance(puerto, str) and puerto.startswith("replay://"):
+            ruta, _, consulta = puerto[len("replay://"):].partition("?")
+            opciones = dict(parse_qsl(consulta))
+            try:
+                self.ser = PuertoReproducido(ruta, float(opciones.get("velocidad", 1.0)),
+                                             opciones.get("repetir", "0") not in ("0", ""))
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] No se pudo abrir la captura {ruta}: {e}")
+                return False
+            self.ser.timeout = self.timeout
             self.simulacion = False
+            # el protocolo es el que se usó al grabar
+            self.binario = self.ser.protocolo == "binario"
+            print(f"[INFO] Reproduciendo captura {ruta} ({self.ser.protocolo}).")
             return True
+        try:
+            self.ser = serial.Serial(puerto, baudios, timeout=self.timeout)
+            self.simulacion = False
         except serial.SerialException as e:
             print(f"[ERROR] No se pudo abrir el puerto {puerto}: {e}")
             return False
 
+        self.binario = protocolo == "binario" and self._negociar_binario()
+        return True
+
+    def _negociar_binario(self) -> bool:
+        try:
+            self.ser.reset_input_buffer()
+            self.ser.write(CMD_BINARIO)
+            # el ESP32 puede tener lecturas JSON en vuelo antes del ACK
+            for _ in range(5):
+                linea = self.ser.readline().decode(errors="ignore").strip()
+                if linea == ACK_BINARIO:
+                    print("[INFO] Protocolo binario activado.")
+                    return True
+                if not linea:
+                    break
+        except serial.SerialException as e:
+            print(f"[ERROR] Negociando protocolo binario: {e}")
+        print("[ADVERTENCIA] El ESP32 no confirmó el protocolo binario, se usa JSON.")
+        return False
+
     def recibir_datos(self) -> Dict[str, Union[int, float]]:
+        datos = self._recibir_datos()
+        if datos:
+            datos[T_RX] = time.perf_counter()
+            LECTURAS_RECIBIDAS.inc()
+        return datos
+
+    def _recibir_datos(self) -> Dict[str, Union[int, float]]:
         if self.simulacion:
             try:
                 return self._cola_sim.get(timeout=1)
@@ -42,6 +147,9 @@ class ESP32Serial:
         if not self.ser or not self.ser.is_open:
             raise ConnectionError("Puerto serial no configurado o cerrado.")
 
+        if self.binario:
+            return self._recibir_binario()
+
         try:
             linea = self.ser.readline().decode().strip()
             if linea:
@@ -50,9 +158,107 @@ class ESP32Serial:
             else:
                 return {}
         except json.JSONDecodeError:
+            self.lineas_invalidas += 1
+            LECTURAS_MALFORMADAS.inc()
             print("[ADVERTENCIA] Error al decodificar JSON.")
             return {}
 
+    def recibir_lote(self) -> List[Dict[str, Union[int, float]]]:
+        """
+        Devuelve todas las lecturas completas disponibles en una sola llamada.
+
+        Lee de una vez lo que haya en el buffer del puerto (bloquea hasta el
+        timeout sólo si no hay nada) y conserva la línea o trama parcial del
+        final para la siguiente llamada. No mezclar con recibir_datos en modo
+        JSON, que lee línea a línea directamente del puerto.
+
+        Cada lectura lleva en T_RX el instante (perf_counter) en que se leyó
+        y decodificó, para medir latencias (ver core/diagnostico/latencia.py).
+        """
+        lote = self._recibir_lote()
+        if lote:
+            t = time.perf_counter()
+            for datos in lote:
+                datos[T_RX] = t
+            LECTURAS_RECIBIDAS.inc(len(lote))
+        return lote
+
+    def _recibir_lote(self) -> List[Dict[str, Union[int, float]]]:
+        if self.simulacion:
+            try:
+                lote = [self._cola_sim.get(timeout=self.timeout)]
+            except Empty:
+                return []
+            while True:
+                try:
+                    lote.append(self._cola_sim.get_nowait())
+                except Empty:
+                    return lote
+
+        if not self.ser or not self.ser.is_open:
+            raise ConnectionError("Puerto serial no configurado o cerrado.")
+
+        self._leer_pendiente()
+
+        if self.binario:
+            lote = list(self._pendientes)
+            self._pendientes.clear()
+            lecturas, consumidos, descartadas = decodificar_buffer(self._buffer)
+            del self._buffer[:consumidos]
+            self.tramas_descartadas += descartadas
+            LECTURAS_MALFORMADAS.inc(descartadas)
+            lote.extend(lecturas)
+            return lote
+
+        fin = self._buffer.rfind(b"\n")
+        if fin == -1:
+            return []
+        completas = self._buffer[:fin]
+        del self._buffer[:fin + 1]
+
+        lote = []
+        invalidas = 0
+        for linea in completas.split(b"\n"):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                lote.append(self._normalizar_datos(json.loads(linea)))
+            except (ValueError, AttributeError):
+                invalidas += 1
+        if invalidas:
+            self.lineas_invalidas += invalidas
+            LECTURAS_MALFORMADAS.inc(invalidas)
+            print(f"[ADVERTENCIA] {invalidas} líneas con JSON inválido descartadas.")
+        return lote
+
+    def _leer_pendiente(self):
+        # un solo read() con todo lo pendiente; si no hay nada, read(1) espera
+        # hasta el timeout del puerto en lugar de girar en vacío
+        n = self.ser.in_waiting
+        leido = self.ser.read(n or 1)
+        if not n:
+            resto = self.ser.in_waiting
+            if resto:
+                leido += self.ser.read(resto)
+        self.bytes_recibidos += len(leido)
+        BYTES_RECIBIDOS.inc(len(leido))
+        self._buffer += leido
+
+    def _recibir_binario(self) -> Dict[str, Union[int, float]]:
+        if not self._pendientes:
+            # bloquea como readline() hasta tener al menos una trama o timeout
+            leido = self.ser.read(max(self.ser.in_waiting, TAM_TRAMA))
+            self.bytes_recibidos += len(leido)
+            BYTES_RECIBIDOS.inc(len(leido))
+            self._buffer += leido
+            lecturas, consumidos, descartadas = decodificar_buffer(self._buffer)
+            del self._buffer[:consumidos]
+            self.tramas_descartadas += descartadas
+            LECTURAS_MALFORMADAS.inc(descartadas)
+            self._pendientes.extend(lecturas)
+        return self._pendientes.popleft() if self._pendientes else {}
+
     def _normalizar_datos(self, datos_raw: dict) -> Dict[str, Union[int, float]]:
         datos_norm = {}
         for campo in self.CAMPOS:
@@ -78,29 +284,7 @@ class ESP32Serial:
         fase_base = random.uniform(0, 2 * math.pi)
         contador = 0
         while not self._stop_event.is_set():
-            t_actual = time.time()
-            fase = fase_base + contador * 0.1
-
-            T_Amb = 22 + 3 * math.sin(fase)
-            T_Sonda = T_Amb + 2 + 0.5 * math.sin(fase + 1.5)
-            Hum = 45 + 10 * math.sin(fase - 1)
-            Luz = 300 + 150 * math.sin(fase + 0.5)
-            Rocio = T_Sonda - ((100 - Hum) / 5.0)
-            Bat = 80 + 10 * math.sin(fase / 2)
-            Acc = 0.3 + 0.2 * math.sin(fase * 3.1 + nodo_id) + random.uniform(-0.05, 0.05)  # m/s²
-
-            datos = {
-                "ID": nodo_id,
-                "T_Amb": round(T_Amb, 2),
-                "T_Sonda": round(T_Sonda, 2),
-                "Hum": round(Hum, 2),
-                "Luz": round(Luz, 2),
-                "Rocío": round(Rocio, 2),
-                "Bat": round(Bat, 2),
-                "Acc": round(Acc, 3)
-            }
-
-            self._cola_sim.put(datos)
+            self._cola_sim.put(lectura_simulada(nodo_id, fase_base + contador * 0.1))
             contador += 1
             intervalo = 10 + random.uniform(-2, 2)
             time.sleep(intervalo)
@@ -129,8 +313,29 @@ class ESP32Serial:
             print(f"[ERROR] Al recibir texto: {e}")
             return ""
 
+    def iniciar_captura(self, ruta: str) -> bool:
+        """Graba desde ahora los bytes crudos del puerto (ruta .gz = comprimida)."""
+        if self.ser is None or self.simulacion:
+            print("[ERROR] No hay un puerto abierto para capturar.")
+            return False
+        self.detener_captura()
+        try:
+            grabador = GrabadorCaptura(ruta, "binario" if self.binario else "json")
+        except OSError as e:
+            print(f"[ERROR] No se pudo crear la captura {ruta}: {e}")
+            return False
+        self.ser = PuertoGrabado(self.ser, grabador)
+        print(f"[INFO] Capturando el puerto en {ruta}.")
+        return True
+
+    def detener_captura(self):
+        if isinstance(self.ser, PuertoGrabado):
+            self.ser.grabador.cerrar()
+            self.ser = self.ser._ser
+
     def cerrar_conexion(self):
         self._stop_event.set()
+        self.detener_captura()
         if self.ser and self.ser.is_open:
             self.ser.close()
 
@@ -1,44 +1,192 @@
 from PyQt6.QtCore import QThread, pyqtSignal
 from core.sensores.esp32_serial import ESP32Serial
+from core.sensores.gateways import GestorGateways
+from core.sensores.ingesta_async import MotorIngesta
+from core.sensores.ingesta_proceso import IngestaProceso
+from core.sensores.golpes import DetectorGolpes
+from core.sensores.anomalias import DetectorAnomalias
+from core.diagnostico.latencia import LATENCIAS, T_EMIT
+from core.diagnostico.metricas import LECTURAS_DESCARTADAS, PROFUNDIDAD_COLA
+import asyncio
 import time
 
 class ESP32Worker(QThread):
+    # max_hz = 0: una señal data_received por lectura.
+    # max_hz > 0: como mucho max_hz señales batch_received por segundo, cada
+    # una con la última lectura de cada nodo desde la emisión anterior.
+    # proceso=True: el puerto se lee en otro proceso (ver IngestaProceso).
+    # puerto puede ser una lista: un gateway por puerto (ver GestorGateways).
+    # asincrono=True: puertos y nodos simulados en un event loop de asyncio
+    # dentro de este hilo (ver MotorIngesta); con puerto=-1 se simulan
+    # nodos_simulados nodos.
+    # captura: ruta donde grabar los bytes crudos del puerto (ver captura.py);
+    # para reproducirla usar puerto="replay://<ruta>".
+    # golpes: DetectorGolpes que ve todas las lecturas antes de coalescer;
+    # sus eventos salen por golpes_detectados.
+    # anomalias: DetectorAnomalias, también antes de coalescer; marca en las
+    # lecturas los valores sospechosos ("sospechosos").
     data_received = pyqtSignal(dict)
+    batch_received = pyqtSignal(list)
+    golpes_detectados = pyqtSignal(list)
     error = pyqtSignal(str)
 
-    def __init__(self, puerto="COM7", baudios=115200, parent=None):
+    def __init__(self, puerto="COM7", baudios=115200, protocolo="json", max_hz=10,
+                 almacen=None, proceso=False, asincrono=False, nodos_simulados=3,
+                 captura=None, golpes=None, anomalias=None, parent=None):
         super().__init__(parent)
         self.puerto = puerto
         self.baudios = baudios
+        self.protocolo = protocolo
+        self.max_hz = max_hz
+        # AlmacenSeries opcional: recibe todas las lecturas, sin coalescer
+        self.almacen = almacen
+        self.golpes = golpes if golpes is not None else DetectorGolpes()
+        self.anomalias = anomalias if anomalias is not None else DetectorAnomalias()
+        self.ingesta = None
         self._running = False
-        self.receptor = ESP32Serial()
+        if isinstance(puerto, (list, tuple)):
+            self.receptor = GestorGateways(puerto, baudios, protocolo)
+            if proceso:
+                print("[ADVERTENCIA] Con varios gateways la lectura se hace en el hilo del worker.")
+                proceso = False
+        else:
+            self.receptor = ESP32Serial()
+        self.proceso = proceso
+        self.asincrono = asincrono
+        self.nodos_simulados = nodos_simulados
+        self.captura = captura
+        if max_hz:
+            # que la espera del puerto no retrase la emisión del lote
+            self.receptor.timeout = min(1, 1 / max_hz)
 
     def configurar(self):
-        ok = self.receptor.configurar_conexion(self.puerto, self.baudios)
+        ok = self._configurar_receptor()
         if not ok:
             self.error.emit("No se pudo configurar el puerto serial.")
         return ok
 
+    def start(self, *args, **kwargs):
+        # antes de arrancar el hilo: un stop() inmediato no debe perderse
+        self._running = True
+        super().start(*args, **kwargs)
+
     def run(self):
-        # Intentar configurar 
-        try:
-            self.receptor.configurar_conexion(self.puerto, self.baudios)
-        except Exception as e:
-            self.error.emit(f"Error al configurar serial: {e}")
+        self._intervalo = 1 / self.max_hz if self.max_hz else 0
+        self._pendientes = {}
+        self._proxima_emision = 0.0
+
+        if self.asincrono:
+            asyncio.run(self._run_async())
+            return
+
+        if self.proceso:
+            self.ingesta = IngestaProceso(self.puerto, self.baudios, self.protocolo,
+                                          captura=self.captura)
+            self.ingesta.iniciar()
+            self._ingesta_caida = False
+            recibir = self._recibir_de_proceso
+        else:
+            # Intentar configurar
+            try:
+                self._configurar_receptor()
+            except Exception as e:
+                self.error.emit(f"Error al configurar serial: {e}")
+            recibir = self.receptor.recibir_lote
 
-        self._running = True
         while self._running:
             try:
-                datos = self.receptor.recibir_datos()
-                if datos:
-                    # Emitir copia segura de los datos
-                    self.data_received.emit(dict(datos))
-                # Pequeña pausa para evitar bloqueo completo
-                time.sleep(0.1)
+                # recibir_lote espera hasta el timeout del puerto si no hay
+                # datos, así que no hace falta pausar entre lecturas
+                self._entregar(recibir())
             except Exception as e:
                 self.error.emit(f"Error lectura serial: {e}")
                 time.sleep(0.5)
 
+        if self.ingesta is not None:
+            self.ingesta.detener()
+            self.ingesta = None
+
+    async def _run_async(self):
+        if self.puerto == -1:
+            puertos, simulados = [], self.nodos_simulados
+        else:
+            puertos = self.puerto if isinstance(self.puerto, (list, tuple)) else [self.puerto]
+            simulados = 0
+        if self.captura:
+            print("[ADVERTENCIA] La captura no está disponible en modo asíncrono.")
+        motor = MotorIngesta(puertos, self.baudios, self.protocolo, nodos_simulados=simulados)
+        if not await motor.iniciar():
+            self.error.emit("No se pudo configurar el puerto serial.")
+        try:
+            # lotes() devuelve un lote vacío por timeout: así se ve stop()
+            async for lote in motor.lotes(self.receptor.timeout):
+                if not self._running:
+                    break
+                try:
+                    self._entregar(lote)
+                except Exception as e:
+                    self.error.emit(f"Error lectura serial: {e}")
+        finally:
+            await motor.cerrar()
+
+    def _entregar(self, lote: list):
+        if lote:
+            self.anomalias.procesar(lote)
+            eventos = self.golpes.procesar(lote)
+            if eventos:
+                self.golpes_detectados.emit(eventos)
+        if lote and self.almacen is not None:
+            self.almacen.agregar_lote(lote)
+
+        if not self._intervalo:
+            if lote:
+                self._marcar_emision(lote)
+            for datos in lote:
+                # cada lectura es un dict nuevo, no hace falta copiarlo
+                self.data_received.emit(datos)
+            return
+
+        # coalescer: sólo la última lectura de cada nodo
+        previas = len(self._pendientes)
+        for datos in lote:
+            self._pendientes[datos.get("ID")] = datos
+        LECTURAS_DESCARTADAS.inc(len(lote) - (len(self._pendientes) - previas), ("coalescidas",))
+        PROFUNDIDAD_COLA.fijar(len(self._pendientes), ("coalescido",))
+
+        ahora = time.monotonic()
+        if self._pendientes and ahora >= self._proxima_emision:
+            salientes = list(self._pendientes.values())
+            self._marcar_emision(salientes)
+            self.batch_received.emit(salientes)
+            self._pendientes = {}
+            self._proxima_emision = ahora + self._intervalo
+
+    def _marcar_emision(self, lote: list):
+        t = time.perf_counter()
+        for datos in lote:
+            datos[T_EMIT] = t
+        LATENCIAS.registrar_emision(lote, t)
+
+    def _configurar_receptor(self):
+        if isinstance(self.receptor, GestorGateways):
+            if self.captura:
+                print("[ADVERTENCIA] La captura no está disponible con varios gateways.")
+            return self.receptor.configurar_conexion()
+        ok = self.receptor.configurar_conexion(self.puerto, self.baudios, self.protocolo)
+        if ok and self.captura:
+            self.receptor.iniciar_captura(self.captura)
+        return ok
+
+    def _recibir_de_proceso(self):
+        for mensaje in self.ingesta.errores():
+            self.error.emit(mensaje)
+        if not self._ingesta_caida and not self.ingesta.vivo():
+            # avisar una vez; lo que quedó en el anillo se sigue leyendo
+            self._ingesta_caida = True
+            self.error.emit(f"El proceso de ingesta terminó inesperadamente "
+                            f"(código {self.ingesta.codigo_salida}).")
+        return self.ingesta.leer_nuevas(self.receptor.timeout)
+
     def stop(self):
         self._running = False
         try:
@@ -0,0 +1,151 @@
+import selectors
+import time
+from typing import Dict, Iterable, List, Union
+
+import serial
+
+from core.sensores.esp32_serial import ESP32Serial
+
+
+class GestorGateways:
+    """
+    Varios gateways (un puerto serie cada uno) leídos desde un solo hilo.
+
+    Cada puerto tiene su propio ESP32Serial (buffer, protocolo y contadores
+    propios) y recibir_lote() devuelve las lecturas de todos juntas, cada una
+    con la clave "Puerto" del gateway que la trajo. Donde los puertos tienen
+    descriptor (Linux/macOS) se espera con selectors; en Windows se revisa
+    in_waiting de cada puerto con una pausa corta.
+
+    Mismo contrato que ESP32Serial para ESP32Worker: timeout, recibir_lote()
+    y cerrar_conexion().
+    """
+
+    def __init__(self, puertos: Iterable[Union[str, int]], baudios: Union[int, float] = 115200,
+                 protocolo: str = "json"):
+        self.puertos = list(puertos)
+        self.baudios = baudios
+        self.protocolo = protocolo
+        # espera máxima (s) de recibir_lote cuando ningún puerto tiene datos
+        self.timeout = 1
+
+        self.receptores: Dict[Union[str, int], ESP32Serial] = {}
+        self._lecturas: Dict[Union[str, int], int] = {}
+        self._bytes: Dict[Union[str, int], int] = {}
+        self._descartadas: Dict[Union[str, int], int] = {}
+        self._selector = None
+        self._ultima_medicion = time.monotonic()
+        self._previo: Dict[Union[str, int], tuple] = {}
+
+    def configurar_conexion(self) -> bool:
+        """Abre todos los puertos; los que fallan se informan y se omiten."""
+        for puerto in self.puertos:
+            receptor = ESP32Serial()
+            if not receptor.configurar_conexion(puerto, self.baudios, self.protocolo):
+                continue
+            # después de negociar el protocolo, lecturas sin espera: la espera
+            # la hace recibir_lote sobre todos los puertos a la vez
+            receptor.ser.timeout = 0
+            self.receptores[puerto] = receptor
+            self._lecturas[puerto] = 0
+            self._bytes[puerto] = 0
+            self._descartadas[puerto] = 0
+            self._previo[puerto] = (0, 0)
+
+        if self._selector is not None:
+            self._selector.close()
+        self._selector = None
+        selector = None
+        try:
+            selector = selectors.DefaultSelector()
+            for puerto, receptor in self.receptores.items():
+                selector.register(receptor.ser.fileno(), selectors.EVENT_READ, puerto)
+            self._selector = selector
+        except (AttributeError, OSError, ValueError):
+            # pyserial en Windows no expone fileno(); cerrar el selector a
+            # medio armar para no perder su descriptor en cada reintento
+            if selector is not None:
+                selector.close()
+
+        if not self.receptores:
+            print("[ERROR] No se pudo abrir ningún gateway.")
+            return False
+        print(f"[INFO] Gateways abiertos: {', '.join(str(p) for p in self.receptores)}")
+        return True
+
+    def recibir_lote(self) -> List[Dict[str, Union[int, float]]]:
+        if not self.receptores:
+            raise ConnectionError("Ningún gateway abierto.")
+
+        lote = []
+        for puerto in self._puertos_listos():
+            receptor = self.receptores.get(puerto)
+            if receptor is None:
+                continue
+            try:
+                lecturas = receptor.recibir_lote()
+            except (serial.SerialException, OSError, ConnectionError) as e:
+                print(f"[ERROR] Gateway {puerto} desconectado: {e}")
+                self._quitar(puerto)
+                continue
+            for datos in lecturas:
+                datos["Puerto"] = puerto
+            self._lecturas[puerto] += len(lecturas)
+            self._bytes[puerto] = receptor.bytes_recibidos
+            self._descartadas[puerto] = receptor.lineas_invalidas + receptor.tramas_descartadas
+            lote.extend(lecturas)
+        return lote
+
+    def _puertos_listos(self) -> List[Union[str, int]]:
+        if self._selector is not None:
+            return [key.data for key, _ in self._selector.select(self.timeout)]
+
+        limite = time.monotonic() + self.timeout
+        while True:
+            listos = [p for p, r in self.receptores.items() if r.ser.in_waiting]
+            if listos or time.monotonic() >= limite:
+                return listos
+            time.sleep(0.005)
+
+    def _quitar(self, puerto):
+        receptor = self.receptores.pop(puerto)
+        if self._selector is not None:
+            try:
+                self._selector.unregister(receptor.ser.fileno())
+            except (KeyError, OSError, ValueError):
+                pass
+        try:
+            receptor.cerrar_conexion()
+        except Exception:
+            pass
+
+    def estadisticas(self) -> Dict[Union[str, int], dict]:
+        """
+        Contadores por puerto: totales y tasa desde la llamada anterior.
+        Los puertos que se desconectaron aparecen con abierto=False.
+        """
+        ahora = time.monotonic()
+        dt = max(1e-6, ahora - self._ultima_medicion)
+        self._ultima_medicion = ahora
+
+        resultado = {}
+        for puerto, lecturas in self._lecturas.items():
+            bytes_ = self._bytes[puerto]
+            lecturas_prev, bytes_prev = self._previo[puerto]
+            resultado[puerto] = {
+                "abierto": puerto in self.receptores,
+                "lecturas": lecturas,
+                "bytes": bytes_,
+                "lecturas_s": (lecturas - lecturas_prev) / dt,
+                "bytes_s": (bytes_ - bytes_prev) / dt,
+                "descartadas": self._descartadas[puerto],
+            }
+            self._previo[puerto] = (lecturas, bytes_)
+        return resultado
+
+    def cerrar_conexion(self):
+        for puerto in list(self.receptores):
+            self._quitar(puerto)
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
@@ -0,0 +1,155 @@
+import time
+from typing import Dict, List, Union
+
+import numpy as np
+
+SENTINELA = -255
+# motivos de DetectorAnomalias con los que Acc no es una medición (un salto sí lo es)
+MOTIVOS_INVALIDOS = ("sin dato", "fuera de rango")
+
+GOLPE = "golpe"
+VIBRACION = "vibracion"
+
+# para publicarlos como alertas: (regla, mensaje con las claves del evento)
+ALERTAS_GOLPE = {
+    GOLPE: ("Golpe", "Nodo {nodo}: golpe de {magnitud:.2f} g"),
+    VIBRACION: ("Vibración", "Nodo {nodo}: vibración sostenida de {magnitud:.2f} g RMS"),
+}
+
+
+def vueltas(filas: np.ndarray):
+    """
+    Índices de 'filas' agrupados por vuelta: la 1.ª aparición de cada fila,
+    la 2.ª, ... Así un lote con nodos repetidos se procesa vectorizado y en
+    orden, sin un bucle por lectura.
+    """
+    if not len(filas):
+        return
+    orden = np.argsort(filas, kind="stable")
+    ordenadas = filas[orden]
+    comienzos = np.flatnonzero(np.r_[True, ordenadas[1:] != ordenadas[:-1]])
+    if len(comienzos) == len(filas):
+        yield np.arange(len(filas))
+        return
+    vuelta = np.empty(len(filas), dtype=np.int64)
+    vuelta[orden] = np.arange(len(filas)) - np.repeat(comienzos, np.diff(np.r_[comienzos, len(filas)]))
+    for k in range(int(vuelta.max()) + 1):
+        yield np.flatnonzero(vuelta == k)
+
+
+def _acc_valido(datos: dict) -> float:
+    if datos["sospechosos"].get("Acc") in MOTIVOS_INVALIDOS:
+        return np.nan
+    return datos.get("Acc", np.nan)
+
+
+class DetectorGolpes:
+    """
+    Golpes y vibración sobre el campo Acc, lectura por lectura.
+
+    Por nodo guarda sólo una ventana circular de las últimas 'ventana'
+    lecturas y la suma de sus cuadrados (memoria constante por nodo):
+    - golpe: una lectura con Acc >= umbral_pico (pico).
+    - vibración: RMS de la ventana >= umbral_rms, con la ventana llena.
+    Cada uno se informa una vez al cruzar el umbral y se rearma cuando baja
+    de umbral * rearme, así una sacudida larga no genera un evento por lectura.
+
+    procesar() corre en el hilo de ingesta, antes de coalescer, sobre todas
+    las lecturas y después de DetectorAnomalias: un Acc marcado sin dato o
+    fuera de rango se ignora. Deja en cada lectura "golpe" = magnitud del
+    último golpe del nodo al final del lote (si tuvo alguno) y devuelve los
+    eventos:
+    {"ts", "nodo", "tipo": "golpe" | "vibracion", "magnitud"}
+    """
+
+    def __init__(self, umbral_pico: float = 1.5, umbral_rms: float = 0.8, ventana: int = 8,
+                 rearme: float = 0.8, capacidad: int = 256):
+        self.umbral_pico = umbral_pico
+        self.umbral_rms = umbral_rms
+        self.ventana = ventana
+        self.rearme = rearme
+        self._filas: Dict[Union[int, str], int] = {}
+        self._nodos: List[Union[int, str]] = []
+        self._reservar(capacidad)
+
+    def _reservar(self, capacidad: int):
+        viejos = getattr(self, "_anillo", None)
+        nuevos = {
+            "_anillo": np.zeros((capacidad, self.ventana)),
+            "_pos": np.zeros(capacidad, dtype=np.int64),
+            "_n": np.zeros(capacidad, dtype=np.int64),
+            "_suma2": np.zeros(capacidad),
+            "_en_golpe": np.zeros(capacidad, dtype=bool),
+            "_en_vibracion": np.zeros(capacidad, dtype=bool),
+            "_ultimo": np.full(capacidad, np.nan),
+        }
+        if viejos is not None:
+            n = len(viejos)
+            for nombre in nuevos:
+                nuevos[nombre][:n] = getattr(self, nombre)
+        for nombre, arreglo in nuevos.items():
+            setattr(self, nombre, arreglo)
+
+    def _fila(self, nodo) -> int:
+        fila = self._filas.get(nodo)
+        if fila is None:
+            fila = self._filas[nodo] = len(self._nodos)
+            self._nodos.append(nodo)
+            if fila >= len(self._pos):
+                self._reservar(2 * len(self._pos))
+        return fila
+
+    def procesar(self, lote: List[dict]) -> List[dict]:
+        if not lote:
+            return []
+        ahora = time.time()
+        filas = np.fromiter((self._fila(d.get("ID", SENTINELA)) for d in lote), dtype=np.int64,
+                            count=len(lote))
+        acc = np.fromiter((d.get("Acc", np.nan) if "sospechosos" not in d else _acc_valido(d)
+                           for d in lote), dtype=np.float64, count=len(lote))
+        validas = ~np.isnan(acc) & (acc != SENTINELA)
+
+        eventos = []
+        indices = np.flatnonzero(validas)
+        for sel in vueltas(filas[indices]):
+            sel = indices[sel]
+            self._agregar(filas[sel], acc[sel], ahora, eventos)
+
+        ultimo = self._ultimo[filas].tolist()
+        for datos, magnitud in zip(lote, ultimo):
+            if magnitud == magnitud:     # no NaN
+                datos["golpe"] = magnitud
+        return eventos
+
+    def _agregar(self, filas: np.ndarray, acc: np.ndarray, ahora: float, eventos: List[dict]):
+        """Una lectura por fila (sin repetir)."""
+        pos = self._pos[filas]
+        viejo = self._anillo[filas, pos]
+        self._anillo[filas, pos] = acc
+        self._pos[filas] = (pos + 1) % self.ventana
+        n = np.minimum(self._n[filas] + 1, self.ventana)
+        self._n[filas] = n
+        suma2 = np.maximum(self._suma2[filas] + acc * acc - viejo * viejo, 0.0)
+        self._suma2[filas] = suma2
+        rms = np.sqrt(suma2 / n)
+
+        # golpe: flanco de subida del pico; mientras dura se guarda el máximo
+        en_golpe = self._en_golpe[filas]
+        golpe = (acc >= self.umbral_pico) & ~en_golpe
+        sigue = (en_golpe & (acc >= self.umbral_pico * self.rearme)) | golpe
+        self._en_golpe[filas] = sigue
+        ultimo = self._ultimo[filas]
+        ultimo = np.where(golpe, acc, ultimo)
+        ultimo = np.where(sigue & (acc > ultimo), acc, ultimo)
+        self._ultimo[filas] = ultimo
+
+        en_vibracion = self._en_vibracion[filas]
+        vibracion = (n == self.ventana) & (rms >= self.umbral_rms) & ~en_vibracion
+        self._en_vibracion[filas] = (en_vibracion & (rms >= self.umbral_rms * self.rearme)) | vibracion
+
+        for i in np.flatnonzero(golpe).tolist():
+            eventos.append({"ts": ahora, "nodo": self._nodos[filas[i]], "tipo": GOLPE,
+                            "magnitud": float(acc[i])})
+        for i in np.flatnonzero(vibracion).tolist():
+            eventos.append({"ts": ahora, "nodo": self._nodos[filas[i]], "tipo": VIBRACION,
+                            "magnitud": float(rms[i])})
@@ -0,0 +1,153 @@
+import asyncio
+import math
+import random
+import time
+from typing import AsyncIterator, Dict, Iterable, List, Tuple, Union
+
+import serial
+
+from core.sensores.esp32_serial import ESP32Serial, lectura_simulada
+from core.diagnostico.latencia import T_RX
+from core.diagnostico.metricas import LECTURAS_RECIBIDAS, PROFUNDIDAD_COLA
+
+Lectura = Dict[str, Union[int, float]]
+
+
+class MotorIngesta:
+    """
+    Ingesta con asyncio: todos los puertos y nodos simulados en un solo hilo.
+
+    Cada puerto queda registrado en el event loop (add_reader sobre su
+    descriptor) y se lee sólo cuando tiene datos; donde no hay descriptor
+    (pyserial en Windows) una corrutina revisa in_waiting cada pocos ms.
+    Cada nodo simulado es una corrutina, así que simular miles de nodos no
+    crea hilos.
+
+    Uso, dentro del loop:
+
+        motor = MotorIngesta(["/dev/ttyUSB0"], nodos_simulados=0)
+        await motor.iniciar()
+        async for lectura in motor:      # o: async for lote in motor.lotes()
+            ...
+        await motor.cerrar()
+    """
+
+    def __init__(self, puertos: Iterable[Union[str, int]] = (), baudios: Union[int, float] = 115200,
+                 protocolo: str = "json", nodos_simulados: int = 0,
+                 intervalo_sim: Tuple[float, float] = (8, 12)):
+        self.puertos = list(puertos)
+        self.baudios = baudios
+        self.protocolo = protocolo
+        self.nodos_simulados = nodos_simulados
+        self.intervalo_sim = intervalo_sim
+
+        self.receptores: Dict[Union[str, int], ESP32Serial] = {}
+        self._cola: asyncio.Queue = None
+        self._tareas: List[asyncio.Task] = []
+        self._lectores: List[int] = []
+        self._loop: asyncio.AbstractEventLoop = None
+
+    async def iniciar(self) -> bool:
+        self._loop = asyncio.get_running_loop()
+        self._cola = asyncio.Queue()
+
+        for puerto in self.puertos:
+            receptor = ESP32Serial()
+            if not receptor.configurar_conexion(puerto, self.baudios, self.protocolo):
+                continue
+            receptor.ser.timeout = 0
+            self.receptores[puerto] = receptor
+            try:
+                fd = receptor.ser.fileno()
+                self._loop.add_reader(fd, self._leer_puerto, puerto)
+                self._lectores.append(fd)
+            except (AttributeError, NotImplementedError, OSError):
+                self._tareas.append(asyncio.create_task(self._sondear_puerto(puerto)))
+
+        for nodo_id in range(self.nodos_simulados):
+            self._tareas.append(asyncio.create_task(self._nodo_simulado(nodo_id)))
+
+        if not self.receptores and not self.nodos_simulados:
+            print("[ERROR] Ingesta: no hay puertos abiertos ni nodos simulados.")
+            return False
+        return True
+
+    # fuentes
+
+    def _leer_puerto(self, puerto):
+        receptor = self.receptores.get(puerto)
+        if receptor is None:
+            return
+        try:
+            lecturas = receptor.recibir_lote()
+        except (serial.SerialException, OSError, ConnectionError) as e:
+            print(f"[ERROR] Gateway {puerto} desconectado: {e}")
+            self._quitar(puerto)
+            return
+        for datos in lecturas:
+            datos["Puerto"] = puerto
+            self._cola.put_nowait(datos)
+
+    async def _sondear_puerto(self, puerto, espera: float = 0.005):
+        while puerto in self.receptores:
+            receptor = self.receptores[puerto]
+            try:
+                hay_datos = receptor.ser.in_waiting
+            except (serial.SerialException, OSError):
+                hay_datos = True    # que _leer_puerto informe y lo quite
+            if hay_datos:
+                self._leer_puerto(puerto)
+            await asyncio.sleep(espera)
+
+    async def _nodo_simulado(self, nodo_id: int):
+        fase_base = random.uniform(0, 2 * math.pi)
+        contador = 0
+        # desfasar el arranque para que los nodos no reporten todos juntos
+        await asyncio.sleep(random.uniform(0, self.intervalo_sim[0]))
+        while True:
+            datos = lectura_simulada(nodo_id, fase_base + contador * 0.1)
+            datos[T_RX] = time.perf_counter()
+            LECTURAS_RECIBIDAS.inc()
+            self._cola.put_nowait(datos)
+            contador += 1
+            await asyncio.sleep(random.uniform(*self.intervalo_sim))
+
+    def _quitar(self, puerto):
+        receptor = self.receptores.pop(puerto)
+        try:
+            fd = receptor.ser.fileno()
+            if fd in self._lectores:
+                self._loop.remove_reader(fd)
+                self._lectores.remove(fd)
+        except (AttributeError, OSError, ValueError):
+            pass
+        receptor.cerrar_conexion()
+
+    # consumo
+
+    def __aiter__(self) -> AsyncIterator[Lectura]:
+        return self
+
+    async def __anext__(self) -> Lectura:
+        return await self._cola.get()
+
+    async def lotes(self, timeout: float = 1) -> AsyncIterator[List[Lectura]]:
+        """Todo lo acumulado por vuelta; un lote vacío si pasa timeout sin datos."""
+        while True:
+            try:
+                lote = [await asyncio.wait_for(self._cola.get(), timeout)]
+            except asyncio.TimeoutError:
+                yield []
+                continue
+            PROFUNDIDAD_COLA.fijar(self._cola.qsize() + 1, ("asyncio",))
+            while not self._cola.empty():
+                lote.append(self._cola.get_nowait())
+            yield lote
+
+    async def cerrar(self):
+        for tarea in self._tareas:
+            tarea.cancel()
+        await asyncio.gather(*self._tareas, return_exceptions=True)
+        self._tareas.clear()
+        for puerto in list(self.receptores):
+            self._quitar(puerto)
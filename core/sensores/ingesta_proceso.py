@@ -0,0 +1,262 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+from queue import Empty
+from typing import Dict, List, Union
+
+import numpy as np
+
+from core.sensores.esp32_serial import ESP32Serial
+from core.diagnostico.latencia import T_RX
+from core.diagnostico.metricas import (
+    BYTES_RECIBIDOS, LECTURAS_DESCARTADAS, LECTURAS_MALFORMADAS, LECTURAS_RECIBIDAS, PROFUNDIDAD_COLA
+)
+
+CLAVES = ESP32Serial.CAMPOS          # "ID" + campos de valor
+SENTINELA = -255
+_CABECERA = 64                       # contador de escritos + estadísticas (uint64) + relleno
+
+
+class AnilloLecturas:
+    """
+    Buffer circular de registros fijos sobre memoria compartida.
+
+    Registro = ID (int64) + T_RX (float64) + un float64 por campo. Un solo escritor agrega
+    registros y después avanza el contador 'escritos'; cada lector guarda su
+    propio índice y copia de los arreglos sólo lo nuevo, sin pickle ni locks.
+    Si el lector se atrasa más de 'capacidad' registros, los más viejos se
+    pierden y se cuentan.
+
+    La cabecera lleva además los totales de bytes y lecturas malformadas del
+    receptor del hijo, para que las métricas se vean en el proceso de la UI.
+
+    Sólo viajan ID, T_RX y los campos de CLAVES: otras claves de la lectura
+    (p. ej. "Puerto") no entran en el registro fijo y se pierden.
+    """
+
+    def __init__(self, buf, capacidad: int):
+        self.capacidad = capacidad
+        n_valores = len(CLAVES) - 1
+        self._contador = np.ndarray((1,), dtype=np.uint64, buffer=buf)
+        self._estadisticas = np.ndarray((2,), dtype=np.uint64, buffer=buf, offset=8)
+        self._ids = np.ndarray((capacidad,), dtype=np.int64, buffer=buf, offset=_CABECERA)
+        self._t_rx = np.ndarray((capacidad,), dtype=np.float64, buffer=buf,
+                                offset=_CABECERA + 8 * capacidad)
+        self._valores = np.ndarray((capacidad, n_valores), dtype=np.float64, buffer=buf,
+                                   offset=_CABECERA + 16 * capacidad)
+
+    @staticmethod
+    def tamano(capacidad: int) -> int:
+        return _CABECERA + 8 * capacidad * (len(CLAVES) + 1)
+
+    @property
+    def escritos(self) -> int:
+        return int(self._contador[0])
+
+    def escribir(self, lote: List[Dict[str, Union[int, float]]]) -> List[str]:
+        """Escribe las lecturas que entran en el registro; devuelve un error por cada descartada."""
+        registros, errores = [], []
+        for datos in lote:
+            try:
+                registros.append(_registro(datos))
+            except (TypeError, ValueError, OverflowError) as e:
+                errores.append(f"{e} en {datos!r}")
+        if len(registros) > self.capacidad:
+            registros = registros[-self.capacidad:]
+        if registros:
+            escritos = self.escritos
+            idx = (escritos + np.arange(len(registros))) % self.capacidad
+            ids, t_rx, valores = zip(*registros)
+            self._ids[idx] = ids
+            self._t_rx[idx] = t_rx
+            self._valores[idx] = valores
+            # publicar recién después de copiar los registros
+            self._contador[0] = escritos + len(registros)
+        return errores
+
+    def publicar_estadisticas(self, bytes_recibidos: int, malformadas: int):
+        self._estadisticas[:] = (bytes_recibidos, malformadas)
+
+    def estadisticas(self):
+        """(bytes, malformadas) acumulados por el escritor."""
+        return int(self._estadisticas[0]), int(self._estadisticas[1])
+
+    def leer(self, desde: int):
+        """Devuelve (lecturas, hasta, perdidas) con los registros en [desde, escritos)."""
+        hasta = self.escritos
+        perdidas = max(0, hasta - desde - self.capacidad)
+        desde += perdidas
+        idx = np.arange(desde, hasta) % self.capacidad
+        ids = self._ids[idx].tolist()
+        t_rx = self._t_rx[idx].tolist()
+        valores = self._valores[idx].tolist()
+
+        # lo que el escritor pisó mientras copiábamos no es confiable
+        pisadas = max(0, self.escritos - self.capacidad - desde)
+        if pisadas:
+            ids = ids[pisadas:]
+            t_rx = t_rx[pisadas:]
+            valores = valores[pisadas:]
+            perdidas += pisadas
+
+        lecturas = []
+        for nodo, t, fila in zip(ids, t_rx, valores):
+            datos = dict(zip(CLAVES, (nodo, *fila)))
+            datos[T_RX] = t
+            lecturas.append(datos)
+        return lecturas, hasta, perdidas
+
+    def liberar(self):
+        # las vistas numpy retienen el buffer; sin esto shm.close() falla
+        self._contador = self._estadisticas = self._ids = self._t_rx = self._valores = None
+
+
+def _registro(datos: dict):
+    """(ID, T_RX, valores) de una lectura; ValueError/TypeError si algo no es numérico."""
+    nodo = datos.get("ID", SENTINELA)
+    if isinstance(nodo, float) and not nodo.is_integer():
+        raise ValueError(f"ID no entero: {nodo!r}")
+    nodo = int(nodo)
+    t = datos.get(T_RX)
+    valores = []
+    for campo in CLAVES[1:]:
+        valor = datos.get(campo, SENTINELA)
+        # null en el JSON: sin dato, igual que en el resto de la aplicación
+        valores.append(SENTINELA if valor is None else float(valor))
+    return nodo, float("nan") if t is None else float(t), valores
+
+
+def _proceso_ingesta(nombre_shm: str, capacidad: int, puerto, baudios, protocolo: str,
+                     captura, detener, errores):
+    """Proceso hijo: lee el puerto con ESP32Serial y escribe en el anillo."""
+    shm = shared_memory.SharedMemory(name=nombre_shm)
+    anillo = AnilloLecturas(shm.buf, capacidad)
+    receptor = ESP32Serial()
+    receptor.timeout = 0.2
+    if not receptor.configurar_conexion(puerto, baudios, protocolo):
+        errores.put("No se pudo configurar el puerto serial.")
+    elif captura:
+        receptor.iniciar_captura(captura)
+
+    descartadas = 0
+    try:
+        while not detener.is_set():
+            try:
+                lote = receptor.recibir_lote()
+                rechazadas = anillo.escribir(lote) if lote else []
+            except Exception as e:
+                errores.put(f"Error lectura serial: {e}")
+                time.sleep(0.5)
+                continue
+            if rechazadas:
+                descartadas += len(rechazadas)
+                errores.put(f"Ingesta: {len(rechazadas)} lecturas descartadas ({rechazadas[0]})")
+            anillo.publicar_estadisticas(receptor.bytes_recibidos,
+                                         receptor.lineas_invalidas + receptor.tramas_descartadas
+                                         + descartadas)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receptor.cerrar_conexion()
+        anillo.liberar()
+        shm.close()
+
+
+class IngestaProceso:
+    """
+    Lectura serial en un proceso aparte (no compite con Qt por el GIL).
+
+    El proceso hijo decodifica y normaliza igual que ESP32Serial y deja las
+    lecturas en un AnilloLecturas; leer_nuevas() las toma del lado de la UI.
+    Si la UI se traba, el hijo sigue leyendo el puerto: sólo se pierden
+    lecturas si el atraso supera la capacidad del anillo.
+    """
+
+    def __init__(self, puerto="COM7", baudios=115200, protocolo="json", capacidad: int = 65536,
+                 captura: str = None):
+        self.puerto = puerto
+        self.baudios = baudios
+        self.protocolo = protocolo
+        self.captura = captura
+        self.capacidad = capacidad
+        self.perdidas = 0
+
+        # spawn también en Linux: no heredar el estado de Qt con fork
+        self._ctx = mp.get_context("spawn")
+        self._shm = None
+        self._anillo = None
+        self._proceso = None
+        self._leidos = 0
+        self._estadisticas = (0, 0)
+
+    def iniciar(self):
+        self._shm = shared_memory.SharedMemory(create=True, size=AnilloLecturas.tamano(self.capacidad))
+        self._anillo = AnilloLecturas(self._shm.buf, self.capacidad)
+        self._leidos = 0
+        self._estadisticas = (0, 0)
+
+        self._detener = self._ctx.Event()
+        self._errores = self._ctx.Queue()
+        self._proceso = self._ctx.Process(
+            target=_proceso_ingesta,
+            args=(self._shm.name, self.capacidad, self.puerto, self.baudios, self.protocolo, self.captura,
+                  self._detener, self._errores),
+            name="ingesta-serial",
+            daemon=True,
+        )
+        self._proceso.start()
+
+    def leer_nuevas(self, timeout: float = 0.1, espera: float = 0.005) -> List[Dict[str, Union[int, float]]]:
+        """Lecturas escritas desde la llamada anterior; espera hasta timeout si no hay."""
+        limite = time.monotonic() + timeout
+        while self._anillo.escritos == self._leidos:
+            if time.monotonic() >= limite:
+                self._actualizar_metricas()
+                return []
+            time.sleep(espera)
+
+        PROFUNDIDAD_COLA.fijar(self._anillo.escritos - self._leidos, ("anillo",))
+        lecturas, self._leidos, perdidas = self._anillo.leer(self._leidos)
+        LECTURAS_RECIBIDAS.inc(len(lecturas) + perdidas)
+        self._actualizar_metricas()
+        if perdidas:
+            self.perdidas += perdidas
+            LECTURAS_DESCARTADAS.inc(perdidas, ("anillo",))
+            print(f"[ADVERTENCIA] Ingesta: {perdidas} lecturas perdidas (la UI se atrasó más que el anillo).")
+        return lecturas
+
+    def _actualizar_metricas(self):
+        # el receptor vive en el hijo: sus totales llegan por la cabecera del anillo
+        actuales = self._anillo.estadisticas()
+        BYTES_RECIBIDOS.inc(actuales[0] - self._estadisticas[0])
+        LECTURAS_MALFORMADAS.inc(actuales[1] - self._estadisticas[1])
+        self._estadisticas = actuales
+
+    def vivo(self) -> bool:
+        return self._proceso is not None and self._proceso.is_alive()
+
+    @property
+    def codigo_salida(self):
+        return None if self._proceso is None else self._proceso.exitcode
+
+    def errores(self) -> List[str]:
+        mensajes = []
+        while True:
+            try:
+                mensajes.append(self._errores.get_nowait())
+            except Empty:
+                return mensajes
+
+    def detener(self, timeout: float = 3):
+        if self._proceso is None:
+            return
+        self._detener.set()
+        self._proceso.join(timeout)
+        if self._proceso.is_alive():
+            self._proceso.terminate()
+            self._proceso.join()
+        self._proceso = None
+        self._anillo.liberar()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
@@ -0,0 +1,83 @@
+import struct
+from binascii import crc_hqx
+from typing import Dict, List, Tuple, Union
+
+# Trama binaria de una lectura (little endian, 36 bytes):
+#   magic (2s) | ID (H) | T_Amb T_Sonda Hum Luz Rocío Bat Acc (7i) | seq (H) | crc16 (H)
+# Los valores van en punto fijo (centésimas, Acc en milésimas) para que el
+# decodificado sea exacto sin redondear. El CRC es CRC-CCITT (crc_hqx, semilla
+# 0xFFFF) sobre todos los bytes previos.
+
+MAGIC = b"\xa5\x5a"
+TRAMA = struct.Struct("<2sH7iHH")
+TAM_TRAMA = TRAMA.size
+CAMPOS_VALOR = ("T_Amb", "T_Sonda", "Hum", "Luz", "Rocío", "Bat", "Acc")
+ESCALAS = (100, 100, 100, 100, 100, 100, 1000)
+
+# Handshake que se envía al abrir el puerto para pedir el modo binario
+CMD_BINARIO = b"PROTO BIN\n"
+ACK_BINARIO = "PROTO BIN OK"
+
+_CRC_SEMILLA = 0xFFFF
+_TAM_SIN_CRC = TAM_TRAMA - 2
+
+
+def codificar_trama(datos: Dict[str, Union[int, float]], seq: int) -> bytes:
+    """Empaqueta una lectura normalizada como trama binaria (lo que manda el firmware)."""
+    valores = [round(datos.get(campo, -255) * escala) for campo, escala in zip(CAMPOS_VALOR, ESCALAS)]
+    cuerpo = TRAMA.pack(MAGIC, int(datos["ID"]) & 0xFFFF, *valores, seq & 0xFFFF, 0)[:_TAM_SIN_CRC]
+    return cuerpo + struct.pack("<H", crc_hqx(cuerpo, _CRC_SEMILLA))
+
+
+def decodificar_buffer(buffer: Union[bytes, bytearray, memoryview]) -> Tuple[List[dict], int, int]:
+    """
+    Decodifica todas las tramas completas del buffer.
+
+    Devuelve (lecturas, bytes_consumidos, tramas_descartadas). Los bytes no
+    consumidos (una trama parcial al final) deben conservarse para la siguiente
+    lectura. Ante basura o CRC inválido se resincroniza buscando el siguiente magic.
+    """
+    mv = memoryview(buffer)
+    total = len(mv)
+    lecturas = []
+    descartadas = 0
+    off = 0
+
+    while total - off >= TAM_TRAMA:
+        if mv[off:off + 2] != MAGIC:
+            siguiente = bytes(mv[off + 1:]).find(MAGIC)
+            if siguiente == -1:
+                # conservar el último byte por si es el inicio de un magic
+                off = total - 1
+                break
+            off += 1 + siguiente
+            continue
+
+        # camino rápido: todas las tramas alineadas desde 'off'
+        n = (total - off) // TAM_TRAMA
+        pos = off
+        for magic, nodo, t_amb, t_sonda, hum, luz, roc, bat, acc, _seq, crc in \
+                TRAMA.iter_unpack(mv[off:off + n * TAM_TRAMA]):
+            if magic != MAGIC or crc_hqx(mv[pos:pos + _TAM_SIN_CRC], _CRC_SEMILLA) != crc:
+                break
+            lecturas.append({
+                "ID": nodo,
+                "T_Amb": t_amb / 100,
+                "T_Sonda": t_sonda / 100,
+                "Hum": hum / 100,
+                "Luz": luz / 100,
+                "Rocío": roc / 100,
+                "Bat": bat / 100,
+                "Acc": acc / 1000,
+            })
+            pos += TAM_TRAMA
+
+        if pos == off + n * TAM_TRAMA:
+            off = pos
+            break
+
+        # trama corrupta en 'pos': descartar su magic y resincronizar
+        descartadas += 1
+        off = pos + 1
+
+    return lecturas, off, descartadas
@@ -0,0 +1,185 @@
+import time
+from typing import Callable, List, Optional
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+
+SENTINELA = -255
+FUERA_DE_RANGO = 9999.0
+
+# una línea como las del ESP32 (claves que mapea ESP32Serial._mapear_clave)
+_FORMATO = ('{{"id":{},"ta":{:.2f},"ts":{:.2f},"h":{:.2f},"lz":{:.2f},'
+            '"roc":{:.2f},"bat":{:.2f},"a":{:.3f}}}\n')
+
+
+class SimuladorFlota:
+    """
+    Puerto serie simulado: líneas JSON de N nodos generadas con NumPy.
+
+    Se comporta como un serial.Serial para ESP32Serial (in_waiting, read,
+    readline, write, close), así que las lecturas recorren el mismo camino
+    que las reales, incluida la decodificación JSON.
+
+    El tiempo simulado avanza en ticks fijos (tick segundos) y cada tick
+    consume siempre los mismos números aleatorios: con la misma semilla la
+    secuencia de líneas es idéntica sin importar cada cuánto se lea.
+
+    velocidad: multiplicador del tiempo real (10 = diez veces más rápido);
+               0 = lo más rápido posible (ticks_por_lectura ticks por read).
+    fallas:    probabilidad por lectura de 'caidas' (no se envía),
+               'malformadas' (JSON cortado), 'fuera_rango' (un campo en
+               ±9999) y 'sentinelas' (un campo en -255).
+    """
+
+    def __init__(self, nodos: int = 1000, semilla: Optional[int] = None, velocidad: float = 1.0,
+                 periodo: float = 10.0, tick: float = 0.1, fallas: Optional[dict] = None,
+                 ticks_por_lectura: int = 10, reloj: Callable[[], float] = time.monotonic):
+        self.nodos = nodos
+        self.velocidad = velocidad
+        self.periodo = periodo
+        self.tick = tick
+        self.ticks_por_lectura = ticks_por_lectura
+        self.fallas = {"caidas": 0.0, "malformadas": 0.0, "fuera_rango": 0.0, "sentinelas": 0.0}
+        self.fallas.update(fallas or {})
+        self.inyectadas = dict.fromkeys(self.fallas, 0)
+        self.lineas_generadas = 0
+
+        self._rng = np.random.default_rng(semilla)
+        self._fase = self._rng.uniform(0, 2 * np.pi, nodos)
+        self._contador = np.zeros(nodos, dtype=np.int64)
+        # instante simulado del próximo reporte de cada nodo, repartidos en un periodo
+        self._proximo = self._rng.uniform(0, periodo, nodos)
+
+        self._reloj = reloj
+        self._t0 = reloj()
+        self._ticks = 0
+        self._salida = bytearray()
+
+        # atributos de serial.Serial que ESP32Serial consulta o ajusta
+        self.timeout = 1
+        self.is_open = True
+        self.port = f"sim://{nodos}"
+
+    @classmethod
+    def desde_url(cls, url: str) -> "SimuladorFlota":
+        """sim://<nodos>?semilla=1&velocidad=10&periodo=10&caidas=0.01&... """
+        partes = urlparse(url)
+        opciones = dict(parse_qsl(partes.query))
+        fallas = {k: float(opciones.pop(k)) for k in list(opciones)
+                  if k in ("caidas", "malformadas", "fuera_rango", "sentinelas")}
+        return cls(
+            nodos=int(partes.netloc or 1000),
+            semilla=int(opciones["semilla"]) if "semilla" in opciones else None,
+            velocidad=float(opciones.get("velocidad", 1.0)),
+            periodo=float(opciones.get("periodo", 10.0)),
+            fallas=fallas,
+        )
+
+    # generación
+
+    def generar_ticks(self, n: int) -> bytes:
+        """Avanza n ticks de tiempo simulado y devuelve las líneas generadas."""
+        lineas: List[str] = []
+        for _ in range(n):
+            self._ticks += 1
+            self._generar_tick(self._ticks * self.tick, lineas)
+        self.lineas_generadas += len(lineas)
+        return "".join(lineas).encode()
+
+    def _generar_tick(self, t_fin: float, lineas: List[str]):
+        idx = np.flatnonzero(self._proximo < t_fin)
+        k = len(idx)
+        if not k:
+            return
+        rng = self._rng
+
+        fase = self._fase[idx] + self._contador[idx] * 0.1
+        self._contador[idx] += 1
+        self._proximo[idx] += self.periodo * rng.uniform(0.8, 1.2, k)
+
+        t_amb = 22 + 3 * np.sin(fase)
+        t_sonda = t_amb + 2 + 0.5 * np.sin(fase + 1.5)
+        hum = 45 + 10 * np.sin(fase - 1)
+        luz = 300 + 150 * np.sin(fase + 0.5)
+        rocio = t_sonda - (100 - hum) / 5.0
+        bat = 80 + 10 * np.sin(fase / 2)
+        acc = 0.3 + 0.2 * np.sin(fase * 3.1 + idx) + rng.uniform(-0.05, 0.05, k)
+        valores = np.column_stack((t_amb, t_sonda, hum, luz, rocio, bat, acc))
+
+        # fallas: se sortean siempre, aunque la probabilidad sea 0, para que
+        # la secuencia aleatoria no dependa de la configuración
+        sorteo = rng.random((4, k))
+        columna = rng.integers(0, valores.shape[1], (2, k))
+        signo = rng.choice((-1.0, 1.0), k)
+        corte = rng.random(k)
+
+        filas = np.flatnonzero(sorteo[2] < self.fallas["fuera_rango"])
+        valores[filas, columna[0, filas]] = signo[filas] * FUERA_DE_RANGO
+        self.inyectadas["fuera_rango"] += len(filas)
+
+        filas = np.flatnonzero(sorteo[3] < self.fallas["sentinelas"])
+        valores[filas, columna[1, filas]] = SENTINELA
+        self.inyectadas["sentinelas"] += len(filas)
+
+        enviar = sorteo[0] >= self.fallas["caidas"]
+        self.inyectadas["caidas"] += k - int(enviar.sum())
+        malformada = sorteo[1] < self.fallas["malformadas"]
+
+        for i, nodo, fila in zip(np.flatnonzero(enviar).tolist(), idx[enviar].tolist(),
+                                 valores[enviar].tolist()):
+            linea = _FORMATO.format(nodo, *fila)
+            if malformada[i]:
+                # cortada en algún punto antes del cierre, sin perder el salto de línea
+                linea = linea[:1 + int(corte[i] * (len(linea) - 3))] + "\n"
+                self.inyectadas["malformadas"] += 1
+            lineas.append(linea)
+
+    def _avanzar(self):
+        if self.velocidad <= 0:
+            if not self._salida:
+                self._salida += self.generar_ticks(self.ticks_por_lectura)
+            return
+        t_sim = (self._reloj() - self._t0) * self.velocidad
+        pendientes = int(t_sim / self.tick) - self._ticks
+        if pendientes > 0:
+            self._salida += self.generar_ticks(pendientes)
+
+    # interfaz de serial.Serial
+
+    @property
+    def in_waiting(self) -> int:
+        self._avanzar()
+        return len(self._salida)
+
+    def read(self, n: int = 1) -> bytes:
+        limite = self._reloj() + (self.timeout or 0)
+        while not self.in_waiting and self._reloj() < limite:
+            time.sleep(min(0.01, self.tick / max(self.velocidad, 1e-9)))
+        datos = bytes(self._salida[:n])
+        del self._salida[:n]
+        return datos
+
+    def readline(self) -> bytes:
+        # como pyserial: esperar el salto de línea o el timeout, no devolver
+        # media línea sólo porque todavía no se generó el resto
+        limite = self._reloj() + (self.timeout or 0)
+        self._avanzar()
+        fin = self._salida.find(b"\n")
+        while fin == -1 and self._reloj() < limite:
+            time.sleep(min(0.01, self.tick / max(self.velocidad, 1e-9)))
+            self._avanzar()
+            fin = self._salida.find(b"\n")
+        n = len(self._salida) if fin == -1 else fin + 1
+        datos = bytes(self._salida[:n])
+        del self._salida[:n]
+        return datos
+
+    def write(self, datos: bytes) -> int:
+        # el simulador no entiende comandos (p. ej. el cambio a binario)
+        return len(datos)
+
+    def reset_input_buffer(self):
+        self._salida.clear()
+
+    def close(self):
+        self.is_open = False
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor, QFont
+
+
+# (encabezado, clave en el dict de la alerta)
+COLUMNAS = [
+    ("Fecha", "ts"), ("Nodo", "nodo"), ("Severidad", "severidad"), ("Estado", "estado"),
+    ("Regla", "regla"), ("Mensaje", "mensaje"), ("Reconocida", "reconocida"),
+]
+COL_SEVERIDAD = 2
+
+SEVERIDADES = {"critica": "Crítica", "advertencia": "Advertencia"}
+
+COLORES = {
+    "critica": QColor("#b71c1c"),
+    "advertencia": QColor("#e65100"),
+}
+
+
+def _fecha(ts) -> str:
+    return datetime.fromtimestamp(ts).strftime("%d/%m/%Y %H:%M:%S") if ts else ""
+
+
+class AlertasModel(QAbstractTableModel):
+    """Una página de alertas (la que trae RegistroAlertas.consultar)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.alertas = []
+        # activas sin reconocer, en negrita
+        self._negrita = QFont()
+        self._negrita.setBold(True)
+
+    def set_alertas(self, alertas: list):
+        self.beginResetModel()
+        self.alertas = alertas
+        self.endResetModel()
+
+    def alerta(self, row: int) -> dict:
+        return self.alertas[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.alertas)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNAS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNAS[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        a = self.alertas[index.row()]
+        clave = COLUMNAS[index.column()][1]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if clave in ("ts", "reconocida"):
+                return _fecha(a[clave])
+            if clave == "severidad":
+                return SEVERIDADES.get(a[clave], a[clave])
+            return str(a[clave])
+        if role == Qt.ItemDataRole.ForegroundRole and index.column() == COL_SEVERIDAD:
+            return COLORES.get(a["severidad"])
+        if role == Qt.ItemDataRole.FontRole and not a["reconocida"] and a["estado"] == "activa":
+            return self._negrita
+        return None
+
+    def marcar_reconocidas(self, ids: set, ts: float):
+        """Actualiza en el lugar las filas reconocidas (sin volver a consultar)."""
+        filas = [i for i, a in enumerate(self.alertas) if a["id"] in ids and not a["reconocida"]]
+        for i in filas:
+            self.alertas[i]["reconocida"] = ts
+        if filas:
+            self.dataChanged.emit(self.index(min(filas), 0),
+                                  self.index(max(filas), len(COLUMNAS) - 1))
@@ -0,0 +1,219 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QLineEdit, QCheckBox,
+    QPushButton, QTableView, QHeaderView, QAbstractItemView
+)
+from PyQt6.QtCore import QTimer
+
+from ui.alertas.alertas_model import AlertasModel
+
+POR_PAGINA = 200
+
+
+class AlertasPage(QWidget):
+    """
+    Alertas & Notificaciones: historial persistente con filtros y páginas.
+
+    Sólo la página visible se trae de RegistroAlertas; las alertas nuevas
+    se muestran solas si se está mirando la primera página.
+
+    Contar con filtros recorre todo el historial, así que se cuenta entero
+    sólo al cambiar los filtros o reconocer alertas; después se suman las
+    llegadas (id mayor que el último contado). Las alertas anteriores a la
+    página se cuentan sólo al cambiar de página.
+    """
+
+    def __init__(self, registro, parent=None):
+        super().__init__(parent)
+        self.registro = registro
+        # id de la primera y la última fila de la página mostrada
+        self._primero = None
+        self._ultimo = None
+        self._desactualizada = True
+        # filtros con los que se contó, total, último id contado y alertas más
+        # nuevas que la página mostrada
+        self._filtros = None
+        self._total = 0
+        self._contadas = 0
+        self._previas = 0
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(24, 24, 24, 24)
+        root.setSpacing(12)
+
+        titulo = QLabel("Alertas y Notificaciones")
+        titulo.setStyleSheet("font-size: 20px; font-weight: 600;")
+        root.addWidget(titulo)
+
+        # filtros
+        barra = QHBoxLayout(spacing=8)
+        self.combo_severidad = QComboBox()
+        self.combo_severidad.addItem("Todas las severidades", None)
+        self.combo_severidad.addItem("Crítica", "critica")
+        self.combo_severidad.addItem("Advertencia", "advertencia")
+        barra.addWidget(self.combo_severidad)
+
+        self.combo_estado = QComboBox()
+        self.combo_estado.addItem("Todos los estados", None)
+        self.combo_estado.addItem("Activadas", "activa")
+        self.combo_estado.addItem("Resueltas", "resuelta")
+        barra.addWidget(self.combo_estado)
+
+        self.input_nodo = QLineEdit(placeholderText="Nodo…")
+        self.input_nodo.setFixedWidth(120)
+        barra.addWidget(self.input_nodo)
+
+        self.chk_sin_reconocer = QCheckBox("Sólo sin reconocer")
+        barra.addWidget(self.chk_sin_reconocer)
+
+        barra.addStretch()
+        self.btn_reconocer = QPushButton("Reconocer seleccionadas", clicked=self.reconocer_seleccionadas)
+        barra.addWidget(self.btn_reconocer)
+        root.addLayout(barra)
+
+        self.combo_severidad.currentIndexChanged.connect(self.primera_pagina)
+        self.combo_estado.currentIndexChanged.connect(self.primera_pagina)
+        self.chk_sin_reconocer.toggled.connect(self.primera_pagina)
+        # el nodo se aplica al dejar de escribir
+        self._timer_filtro = QTimer(self, singleShot=True, interval=300, timeout=self.primera_pagina)
+        self.input_nodo.textChanged.connect(self._timer_filtro.start)
+
+        # tabla
+        self.model = AlertasModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setAlternatingRowColors(True)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(26)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        root.addWidget(self.table)
+
+        # páginas
+        paginas = QHBoxLayout(spacing=8)
+        self.btn_anterior = QPushButton("◀ Anterior", clicked=self.pagina_anterior)
+        self.btn_siguiente = QPushButton("Siguiente ▶", clicked=self.pagina_siguiente)
+        self.lbl_pagina = QLabel()
+        paginas.addWidget(self.btn_anterior)
+        paginas.addWidget(self.lbl_pagina)
+        paginas.addWidget(self.btn_siguiente)
+        paginas.addStretch()
+        root.addLayout(paginas)
+
+    # consultas
+
+    def filtros(self) -> dict:
+        return {
+            "severidad": self.combo_severidad.currentData(),
+            "estado": self.combo_estado.currentData(),
+            "nodo": self.input_nodo.text().strip(),
+            "sin_reconocer": self.chk_sin_reconocer.isChecked(),
+        }
+
+    def _mostrar(self, alertas: list, previas: int = None):
+        """previas: alertas más nuevas que la página; None = contarlas (sólo al cambiar de página)."""
+        self.model.set_alertas(alertas)
+        if alertas:
+            self._primero, self._ultimo = alertas[0]["id"], alertas[-1]["id"]
+        else:
+            self._primero = self._ultimo = None
+        if previas is None:
+            previas = (self.registro.contar(self._filtros, despues_de=self._primero)
+                       if self._primero is not None else 0)
+        self._previas = previas
+        self._actualizar_paginado()
+
+    def _actualizar_paginado(self):
+        total, previas = self._total, self._previas
+        paginas = max(1, -(-total // POR_PAGINA))
+        actual = previas // POR_PAGINA + 1
+        self.lbl_pagina.setText(f"Página {actual} de {paginas} · {total} alertas")
+        self.btn_anterior.setEnabled(previas > 0)
+        self.btn_siguiente.setEnabled(previas + self.model.rowCount() < total)
+
+    def _contar(self):
+        """Cuenta todo con los filtros actuales."""
+        self._filtros = self.filtros()
+        self._contadas = self.registro.ultimo_id()
+        self._total = self.registro.contar(self._filtros)
+
+    def _contar_nuevas(self) -> int:
+        """Suma al total las alertas llegadas desde la última cuenta y devuelve cuántas son."""
+        ultimo = self.registro.ultimo_id()
+        if ultimo <= self._contadas:
+            return 0
+        nuevas = self.registro.contar(self._filtros, despues_de=self._contadas, antes_de=ultimo + 1)
+        self._contadas = ultimo
+        self._total += nuevas
+        return nuevas
+
+    def primera_pagina(self):
+        """Al cambiar los filtros: vuelve a contar y muestra la página más nueva."""
+        self._contar()
+        self._recargar()
+
+    def _recargar(self):
+        self._mostrar(self.registro.consultar(self._filtros, limite=POR_PAGINA), previas=0)
+        self._desactualizada = False
+
+    def pagina_siguiente(self):
+        if self._ultimo is None:
+            return
+        alertas = self.registro.consultar(self._filtros, antes_de=self._ultimo, limite=POR_PAGINA)
+        if alertas:
+            self._mostrar(alertas)
+
+    def pagina_anterior(self):
+        if self._primero is None:
+            return
+        alertas = self.registro.consultar(self._filtros, despues_de=self._primero, limite=POR_PAGINA)
+        if len(alertas) < POR_PAGINA:
+            # cerca del principio: completar hasta una página entera
+            self._mostrar(self.registro.consultar(self._filtros, limite=POR_PAGINA), previas=0)
+        else:
+            self._mostrar(alertas)
+
+    def alertas_nuevas(self):
+        """Llamar después de agregar alertas al registro."""
+        if not self.isVisible() or self._filtros is None:
+            self._desactualizada = True
+            return
+        en_primera = self._previas == 0
+        nuevas = self._contar_nuevas()
+        if en_primera:
+            self._recargar()
+        elif nuevas:
+            # no mover la página que se está mirando; las nuevas quedan antes
+            self._previas += nuevas
+            self._actualizar_paginado()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._filtros is None:
+            self.primera_pagina()
+        elif self._desactualizada:
+            self._contar_nuevas()
+            self._recargar()
+
+    # acciones
+
+    def reconocer_seleccionadas(self):
+        filas = {i.row() for i in self.table.selectionModel().selectedRows()}
+        ids = {self.model.alerta(f)["id"] for f in filas}
+        if not ids:
+            return
+        ts = self.registro.reconocer(ids)
+        if self.chk_sin_reconocer.isChecked():
+            # las reconocidas salen del filtro: recargar desde la misma página
+            self._contar()
+            alertas = self.registro.consultar(self._filtros, antes_de=self._primero + 1,
+                                              limite=POR_PAGINA)
+            if alertas:
+                self._mostrar(alertas)
+            else:
+                self._recargar()
+        else:
+            self.model.marcar_reconocidas(ids, ts)
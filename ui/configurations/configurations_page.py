@@ -4,7 +4,7 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QFrame, QScrollArea, QFormLayout,
     QLineEdit, QComboBox, QPushButton, QHBoxLayout, QCheckBox, QMessageBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 
 try:
     from core.sensores.esp32_serial import ESP32Serial
@@ -16,6 +16,9 @@ CONFIG_FILE = "configurations.json"
 
 
 class ConfigurationsPage(QWidget):
+    # la configuración completa, después de guardarla
+    config_guardada = pyqtSignal(dict)
+
     def __init__(self, role="admin"):
         super().__init__()
         self.role = role
@@ -156,7 +159,9 @@ class ConfigurationsPage(QWidget):
 
     def save_config(self):
         """Guarda configuraciones en JSON."""
-        cfg = {
+        # conservar las claves que esta página no edita (p. ej. "metricas")
+        cfg = self._config_guardada()
+        cfg.update({
             "tema": self.theme_combo.currentText(),
             "idioma": self.language_combo.currentText(),
             "puerto": self.port_input.text(),
@@ -166,7 +171,7 @@ class ConfigurationsPage(QWidget):
             "alertas_email": self.email_alerts.isChecked(),
             "usuario": self.username_input.text(),
             "telefono": self.phone_input.text(),
-        }
+        })
 
         try:
             with open(CONFIG_FILE, "w") as f:
@@ -176,8 +181,18 @@ class ConfigurationsPage(QWidget):
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"No se pudo guardar el archivo:\n{e}")
+            return
+
+        self.config_guardada.emit(cfg)
 
 
+    def _config_guardada(self) -> dict:
+        try:
+            with open(CONFIG_FILE, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
     # PROBAR CONEXIÓN ESP32
     def test_connection(self):
         if ESP32Serial is None:
@@ -1,16 +1,32 @@
 # ui/dashboard/dashboard_window.py
+import json
+import os
+import time
+
 from PyQt6.QtWidgets import (
     QWidget, QHBoxLayout, QVBoxLayout, QFrame, QPushButton,
-    QStackedWidget, QSizePolicy, QGridLayout, QLabel
+    QStackedWidget, QSizePolicy, QGridLayout, QLabel, QComboBox,
+    QTableView, QHeaderView, QAbstractItemView
 )
 from PyQt6.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer, QEvent
 from PyQt6.QtGui import QCursor
 
 from ui.widgets.sensor_card import SensorCard
+from ui.dashboard.flota_model import FlotaModel, nombre_nodo
 from core.sensores.esp32_worker import ESP32Worker
+from core.sensores.golpes import ALERTAS_GOLPE, DetectorGolpes
+from core.historial.almacen_series import AlmacenSeries
+from core.alertas.motor_alertas import ACTIVA, MotorAlertas
+from core.alertas.registro_alertas import RegistroAlertas
+from core.diagnostico.latencia import LATENCIAS
+from core.diagnostico.metricas import ACTUALIZACION_UI, METRICAS
 from ui.devices.devices_window import DevicesPage
 from ui.users.users_page import UsersPage
 from ui.insumos.insumos_page import InsumosPage
+from ui.historial.historial_page import HistorialPage
+from ui.alertas.alertas_page import AlertasPage
+from ui.diagnostico.diagnostico_window import DiagnosticoWindow
+from ui.configurations.configurations_page import CONFIG_FILE, ConfigurationsPage
 
 
 
@@ -23,6 +39,9 @@ class Dashboard(QWidget):
         # QUITADO: modo oscuro
         self.dark_mode = False
 
+        # ventana de diagnóstico (se crea al abrirla)
+        self.diagnostico = None
+
         # Dimensiones menú
         self.menu_expanded_width = 240
         self.menu_collapsed_width = 0
@@ -37,11 +56,22 @@ class Dashboard(QWidget):
 
         self.setObjectName("root")
 
+        cfg = self._leer_config()
+        self._iniciar_metricas(cfg)
+
         # ------------------------------
         #  PRIMERO INICIAMOS EL WORKER
         # ------------------------------
-        self.worker = ESP32Worker(puerto="COM7", baudios=115200)
+        self.historial = AlmacenSeries()
+        self.motor_alertas = MotorAlertas()
+        self._aplicar_config(cfg)
+        self.registro_alertas = RegistroAlertas()
+        # "golpes": {"umbral_pico": 1.5, "umbral_rms": 0.8, "ventana": 8} en configurations.json
+        self.worker = ESP32Worker(puerto="COM7", baudios=115200, almacen=self.historial,
+                                   proceso=True, golpes=DetectorGolpes(**cfg.get("golpes", {})))
         self.worker.data_received.connect(self.on_sensor_data)
+        self.worker.batch_received.connect(self.on_sensor_batch)
+        self.worker.golpes_detectados.connect(self.on_golpes)
         self.worker.error.connect(self.on_worker_error)
         self.worker.start()
 
@@ -96,15 +126,19 @@ class Dashboard(QWidget):
         self.page_dashboard = self._build_dashboard_page()
 
         #  Módulo Dispositivos REAL
-        self.page_devices = DevicesPage(esp32_worker=self.worker)
+        self.page_devices = DevicesPage(esp32_worker=self.worker, motor_alertas=self.motor_alertas)
 
         self.stack.addWidget(self.page_dashboard)
         self.stack.addWidget(self._placeholder_page("Rutas y Transporte"))
         self.stack.addWidget(InsumosPage())
         self.stack.addWidget(self.page_devices)
         self.stack.addWidget(UsersPage())
-        self.stack.addWidget(self._placeholder_page("Historial y Reportes"))
-        self.stack.addWidget(self._placeholder_page("Alertas y Notificaciones"))
+        self.stack.addWidget(HistorialPage(self.historial))
+        self.page_alertas = AlertasPage(self.registro_alertas)
+        self.stack.addWidget(self.page_alertas)
+        self.page_config = ConfigurationsPage(role=self.user_role)
+        self.page_config.config_guardada.connect(self._aplicar_config)
+        self.stack.addWidget(self.page_config)
         
 
         main_layout.addWidget(self.menu_container)
@@ -121,6 +155,19 @@ class Dashboard(QWidget):
         self.hide_menu_timer.setInterval(500)
         self.hide_menu_timer.timeout.connect(self.auto_hide_menu)
 
+        # Repintado del dashboard: un solo refresco por tick con lo acumulado
+        self._nodos_sucios = set()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(200)
+        self.refresh_timer.timeout.connect(self._refrescar_dashboard)
+        self.refresh_timer.start()
+
+        # Reglas de alerta: se evalúan sobre toda la flota una vez por segundo
+        self.alertas_timer = QTimer(self)
+        self.alertas_timer.setInterval(1000)
+        self.alertas_timer.timeout.connect(self._evaluar_alertas)
+        self.alertas_timer.start()
+
         self.stack.installEventFilter(self)
         self.setMouseTracking(True)
         self.stack.setMouseTracking(True)
@@ -192,6 +239,11 @@ class Dashboard(QWidget):
             btn.clicked.connect(lambda _, i=index: self.stack.setCurrentIndex(i))
             layout.addWidget(btn)
 
+        self.btn_diagnostico = QPushButton("Diagnóstico")
+        self.btn_diagnostico.setProperty("class", "menuBtn")
+        self.btn_diagnostico.clicked.connect(self._abrir_diagnostico)
+        layout.addWidget(self.btn_diagnostico)
+
         layout.addStretch()
 
         self.btn_logout = QPushButton("Cerrar sesión")
@@ -207,8 +259,32 @@ class Dashboard(QWidget):
     def _build_dashboard_page(self):
         page = QFrame()
         page.setObjectName("page")
-        g = QGridLayout(page)
-        g.setContentsMargins(24, 24, 24, 24)
+        root = QVBoxLayout(page)
+        root.setContentsMargins(24, 24, 24, 24)
+        root.setSpacing(20)
+
+        # Selector de nodo: las tarjetas muestran sólo el nodo elegido
+        barra = QHBoxLayout()
+        barra.addWidget(QLabel("Nodo:"))
+        self.combo_nodo = QComboBox()
+        self.combo_nodo.setMinimumWidth(160)
+        self.combo_nodo.currentIndexChanged.connect(self._on_nodo_seleccionado)
+        barra.addWidget(self.combo_nodo)
+        barra.addStretch()
+        self.lbl_flota = QLabel("Esperando lecturas...")
+        barra.addWidget(self.lbl_flota)
+        root.addLayout(barra)
+
+        # Aviso no bloqueante con las alertas activas
+        self.lbl_alertas = QLabel()
+        self.lbl_alertas.setWordWrap(True)
+        self.lbl_alertas.setStyleSheet(
+            "background: #fdecea; color: #b71c1c; border: 1px solid #f5c6cb;"
+            "border-radius: 8px; padding: 8px 12px;")
+        self.lbl_alertas.hide()
+        root.addWidget(self.lbl_alertas)
+
+        g = QGridLayout()
         g.setSpacing(20)
 
         self.cards = {
@@ -233,6 +309,26 @@ class Dashboard(QWidget):
                 g.addWidget(self.cards[keys[idx]], r, c)
                 idx += 1
 
+        root.addLayout(g)
+
+        # Resumen de la flota: una fila por nodo con todos los campos
+        lbl = QLabel("Resumen de la flota")
+        lbl.setStyleSheet("font-size: 15px; font-weight: 600;")
+        root.addWidget(lbl)
+
+        self.flota_model = FlotaModel()
+        self.tabla_flota = QTableView()
+        self.tabla_flota.setModel(self.flota_model)
+        self.tabla_flota.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.tabla_flota.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tabla_flota.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tabla_flota.setAlternatingRowColors(True)
+        self.tabla_flota.verticalHeader().setVisible(False)
+        self.tabla_flota.verticalHeader().setDefaultSectionSize(26)
+        self.tabla_flota.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tabla_flota.clicked.connect(lambda index: self.combo_nodo.setCurrentIndex(index.row()))
+        root.addWidget(self.tabla_flota, 1)
+
         return page
 
     def _placeholder_page(self, text):
@@ -302,18 +398,101 @@ class Dashboard(QWidget):
     # --------------------------- SENSORES ---------------------------------
     # ----------------------------------------------------------------------
     def on_sensor_data(self, datos: dict):
-        mapping = {
-            "T_Amb": "T_Amb",
-            "T_Sonda": "T_Sonda",
-            "Hum": "Hum",
-            "Luz": "Luz",
-            "Rocío": "Rocío",
-            "Bat": "Bat",
-            "Acc": "Acc"
-        }
-        for k_src, k_card in mapping.items():
-            if k_src in datos:
-                self.cards[k_card].update_value(datos[k_src])
+        self.on_sensor_batch([datos])
+
+    def on_sensor_batch(self, lote: list):
+        # sólo se guardan los datos; la vista se refresca en _refrescar_dashboard
+        self._nodos_sucios |= self.flota_model.aplicar_lote(lote)
+        self.motor_alertas.agregar_lote(lote)
+        LATENCIAS.registrar_lote(lote, "dashboard")
+
+    def on_golpes(self, eventos: list):
+        for evento in eventos:
+            regla, mensaje = ALERTAS_GOLPE[evento["tipo"]]
+            self.motor_alertas.notificar(evento["nodo"], regla, mensaje.format(**evento),
+                                         valor=evento["magnitud"], ts=evento["ts"])
+
+    def _refrescar_dashboard(self):
+        if not self._nodos_sucios:
+            return
+        inicio = time.perf_counter()
+
+        # nodos nuevos: el combo sigue el orden de filas del modelo
+        for row in range(self.combo_nodo.count(), self.flota_model.rowCount()):
+            nodo = self.flota_model.nodo(row)
+            self.combo_nodo.addItem(nombre_nodo(nodo), nodo)
+
+        self.flota_model.filas_cambiadas(self.flota_model.fila(n) for n in self._nodos_sucios)
+        if self.combo_nodo.currentData() in self._nodos_sucios:
+            self._mostrar_nodo(self.combo_nodo.currentData())
+        self.lbl_flota.setText(f"{self.flota_model.rowCount()} nodos reportando")
+        self._nodos_sucios.clear()
+        ACTUALIZACION_UI.observar(time.perf_counter() - inicio, ("dashboard",))
+
+    def _evaluar_alertas(self):
+        self.motor_alertas.evaluar()
+        eventos = self.motor_alertas.nuevas()
+        if not eventos:
+            return
+        self.registro_alertas.agregar(eventos)
+        self.page_alertas.alertas_nuevas()
+        for evento in eventos:
+            etiqueta = "[ADVERTENCIA]" if evento["estado"] == ACTIVA else "[INFO]"
+            print(f"{etiqueta} Alerta {evento['estado']}: {evento['mensaje']}")
+
+        activas = self.motor_alertas.activas()
+        if not activas:
+            self.lbl_alertas.hide()
+            return
+        ultima = max(activas, key=lambda a: a["ts"])
+        resto = f" (y {len(activas) - 1} más)" if len(activas) > 1 else ""
+        self.lbl_alertas.setText(f"⚠ {ultima['mensaje']}{resto}")
+        self.lbl_alertas.show()
+
+    def _on_nodo_seleccionado(self, index: int):
+        if index < 0:
+            return
+        nodo = self.combo_nodo.itemData(index)
+        for campo, card in self.cards.items():
+            card.set_historial(self.flota_model.tendencia(nodo, campo))
+        self._mostrar_nodo(nodo)
+        self.tabla_flota.selectRow(index)
+
+    def _mostrar_nodo(self, nodo):
+        sospechosos = self.flota_model.sospechosos(nodo)
+        for campo, valor in self.flota_model.valores(nodo).items():
+            card = self.cards[campo]
+            card.mostrar_valor(valor)
+            card.marcar_sospechoso(sospechosos.get(campo))
+            card.sparkline.marcar_cambio()
+
+    def _leer_config(self) -> dict:
+        if not os.path.exists(CONFIG_FILE):
+            return {}
+        try:
+            with open(CONFIG_FILE, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print("[ERROR] No se pudo leer la configuración:", e)
+            return {}
+
+    def _iniciar_metricas(self, cfg: dict):
+        # "metricas": {"puerto": 9108, "archivo": "metricas.prom", "intervalo": 60}
+        # en configurations.json; sin esa clave quedan deshabilitadas
+        cfg = cfg.get("metricas")
+        if cfg:
+            METRICAS.iniciar(cfg.get("puerto"), cfg.get("archivo"),
+                             cfg.get("intervalo", 60), cfg.get("copias", 5))
+
+    def _aplicar_config(self, cfg: dict):
+        # "Activar predicciones de alertas" en Configuración
+        self.motor_alertas.habilitar("Condensación prevista", bool(cfg.get("predicciones", False)))
+
+    def _abrir_diagnostico(self):
+        if self.diagnostico is None:
+            self.diagnostico = DiagnosticoWindow()
+        self.diagnostico.show()
+        self.diagnostico.raise_()
 
     def on_worker_error(self, mensaje: str):
         print("[ESP32 Worker] ", mensaje)
@@ -322,6 +501,11 @@ class Dashboard(QWidget):
         try:
             if self.worker and self.worker.isRunning():
                 self.worker.stop()
+            self.historial.cerrar()
+            if self.diagnostico is not None:
+                self.diagnostico.close()
+            METRICAS.detener()
+            self.registro_alertas.cerrar()
         except:
             pass
         if callable(self.on_logout):
@@ -331,6 +515,11 @@ class Dashboard(QWidget):
         try:
             if self.worker and self.worker.isRunning():
                 self.worker.stop()
+            self.historial.cerrar()
+            if self.diagnostico is not None:
+                self.diagnostico.close()
+            METRICAS.detener()
+            self.registro_alertas.cerrar()
         except:
             pass
         event.accept()
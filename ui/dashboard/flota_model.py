@@ -0,0 +1,155 @@
+import math
+import time
+from datetime import datetime
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+from core.sensores.protocolo_binario import CAMPOS_VALOR
+from ui.widgets.modelo_tabla import FilasCambiadasMixin
+from ui.widgets.sparkline import BufferCircular, SENTINELA
+
+CAMPOS = CAMPOS_VALOR
+
+ENCABEZADOS = {
+    "T_Amb": "T. Amb (°C)",
+    "T_Sonda": "T. Sonda (°C)",
+    "Hum": "Hum (%)",
+    "Luz": "Luz (lx)",
+    "Rocío": "Rocío (°C)",
+    "Bat": "Bat (%)",
+    "Acc": "Acc (g)",
+}
+
+# Nodo | un campo por columna | hora de la última lectura
+COLUMNAS = ["Nodo"] + [ENCABEZADOS[c] for c in CAMPOS] + ["Última lectura"]
+COL_HORA = len(COLUMNAS) - 1
+
+COLOR_SOSPECHOSO = QColor("#e65100")
+
+
+def nombre_nodo(nodo) -> str:
+    return "Sin ID" if nodo == SENTINELA else f"Nodo {nodo}"
+
+
+class FlotaModel(FilasCambiadasMixin, QAbstractTableModel):
+    """
+    Último valor de cada campo por nodo, una fila por nodo en orden de aparición.
+
+    aplicar_lote() sólo actualiza los datos y devuelve los nodos que
+    cambiaron; el Dashboard junta esos nodos y avisa a la vista una vez por
+    tick con filas_cambiadas(). Cada nodo guarda además la tendencia de cada
+    campo para las sparklines de las tarjetas y los campos cuyo último valor
+    quedó marcado como sospechoso (ver DetectorAnomalias).
+    """
+
+    def __init__(self, historial: int = 120, parent=None):
+        super().__init__(parent)
+        self.historial = historial
+        self._nodos: list = []
+        self._fila: dict = {}
+        self._valores: list[list[float]] = []
+        self._hora: list[float] = []
+        self._sospechosos: list[dict] = []
+        self._tendencias: dict = {}
+
+    # lectura
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._nodos)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNAS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNAS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return nombre_nodo(self._nodos[row])
+            if col == COL_HORA:
+                return datetime.fromtimestamp(self._hora[row]).strftime("%H:%M:%S")
+            valor = self._valores[row][col - 1]
+            return "--" if math.isnan(valor) else f"{valor:.2f}"
+        if role == Qt.ItemDataRole.TextAlignmentRole and col > 0:
+            return Qt.AlignmentFlag.AlignCenter
+        if role in (Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.ToolTipRole) and 0 < col < COL_HORA:
+            motivo = self._sospechosos[row].get(CAMPOS[col - 1])
+            if motivo is None:
+                return None
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return COLOR_SOSPECHOSO
+            return f"Valor sospechoso: {motivo}"
+        return None
+
+    def nodos(self) -> list:
+        return list(self._nodos)
+
+    def nodo(self, row: int):
+        return self._nodos[row]
+
+    def fila(self, nodo) -> int:
+        return self._fila.get(nodo, -1)
+
+    def valores(self, nodo) -> dict:
+        """{campo: último valor} del nodo (NaN si nunca llegó)."""
+        return dict(zip(CAMPOS, self._valores[self._fila[nodo]]))
+
+    def sospechosos(self, nodo) -> dict:
+        """{campo: motivo} de los valores del nodo marcados como sospechosos."""
+        return self._sospechosos[self._fila[nodo]]
+
+    def tendencia(self, nodo, campo: str) -> BufferCircular:
+        return self._tendencias[nodo][campo]
+
+    # cambios
+
+    def aplicar_lote(self, lote: list, ts: float = None) -> set:
+        """Guarda las lecturas sin avisar a la vista. Devuelve los nodos tocados."""
+        if ts is None:
+            ts = time.time()
+        tocados = set()
+        for datos in lote:
+            nodo = datos.get("ID", SENTINELA)
+            row = self._fila.get(nodo)
+            if row is None:
+                row = self._agregar_nodo(nodo)
+            fila = self._valores[row]
+            tendencias = self._tendencias[nodo]
+            motivos = datos.get("sospechosos")
+            sospechosos = self._sospechosos[row]
+            if motivos or sospechosos:
+                # cada campo que llega reemplaza la marca anterior
+                for campo in CAMPOS:
+                    if motivos and campo in motivos:
+                        sospechosos[campo] = motivos[campo]
+                    elif campo in datos:
+                        sospechosos.pop(campo, None)
+            for i, campo in enumerate(CAMPOS):
+                valor = datos.get(campo, SENTINELA)
+                if isinstance(valor, (int, float)) and valor != SENTINELA:
+                    fila[i] = valor
+                    # un valor sospechoso deja un hueco en la tendencia, no un pico
+                    tendencias[campo].agregar(math.nan if motivos and campo in motivos else valor)
+            self._hora[row] = ts
+            tocados.add(nodo)
+        return tocados
+
+    def _agregar_nodo(self, nodo) -> int:
+        row = len(self._nodos)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._nodos.append(nodo)
+        self._fila[nodo] = row
+        self._valores.append([math.nan] * len(CAMPOS))
+        self._hora.append(0.0)
+        self._sospechosos.append({})
+        self._tendencias[nodo] = {campo: BufferCircular(self.historial) for campo in CAMPOS}
+        self.endInsertRows()
+        return row
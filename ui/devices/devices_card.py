@@ -13,6 +13,11 @@ class TarjetaDispositivo(QFrame):
         super().__init__(parent)
 
         self.setProperty("datos", datos)
+        # últimos valores pintados, para no re-aplicar estilos sin cambios
+        self._foto_actual = object()  # fuerza la primera carga
+        self._estado_actual = None
+        self._color_bateria = None
+        self._texto_autonomia = None
 
         self.setStyleSheet("""
             QFrame {
@@ -53,6 +58,12 @@ class TarjetaDispositivo(QFrame):
         self.lbl_bateria.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.lbl_bateria)
 
+        # autonomía estimada (ver ModeloBateria)
+        self.lbl_autonomia = QLabel()
+        self.lbl_autonomia.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.lbl_autonomia.setStyleSheet("color: #666666; font-size: 9pt;")
+        layout.addWidget(self.lbl_autonomia)
+
         layout.addStretch(1)
 
         # botones
@@ -97,8 +108,20 @@ class TarjetaDispositivo(QFrame):
         # nombre
         self.lbl_nombre.setText(datos.get("name", "Sin nombre"))
 
-        # imagen
+        # imagen (sólo se recarga si cambió la ruta)
         foto = datos.get("foto")
+        if foto != self._foto_actual:
+            self._foto_actual = foto
+            self._actualizar_foto(foto)
+
+        # batería
+        self.actualizar_bateria(datos.get("battery", 100))
+        self.actualizar_autonomia(datos.get("autonomia"), datos.get("consumo"))
+
+        # estado
+        self.actualizar_estado(datos.get("active", True))
+
+    def _actualizar_foto(self, foto):
         if foto:
             pm = QPixmap(foto).scaled(120, 120,
                                       Qt.AspectRatioMode.KeepAspectRatio,
@@ -115,15 +138,12 @@ class TarjetaDispositivo(QFrame):
                 border: 1px dashed #e0e0e0;
             """)
 
-        # batería
-        self.actualizar_bateria(datos.get("battery", 100))
-
-        # estado
-        self.actualizar_estado(datos.get("active", True))
-
     # actualizar estado individual
 
     def actualizar_estado(self, active: bool):
+        if active == self._estado_actual:
+            return
+        self._estado_actual = active
         css = """
             QPushButton {{ background: {bg}; }}
             QPushButton:hover {{ background: {hover}; }}
@@ -138,7 +158,26 @@ class TarjetaDispositivo(QFrame):
     def actualizar_bateria(self, battery_val: int):
         color = "#d13438" if battery_val < 20 else "#107c10"
         self.lbl_bateria.setText(f"Batería: {battery_val}%")
-        self.lbl_bateria.setStyleSheet(f"color: {color}; font-weight: bold;")
+        if color != self._color_bateria:
+            self._color_bateria = color
+            self.lbl_bateria.setStyleSheet(f"color: {color}; font-weight: bold;")
+
+    def actualizar_autonomia(self, horas=None, consumo=None):
+        if horas is None or horas != horas:
+            texto = "Autonomía: --"
+        elif horas == float("inf"):
+            texto = "Sin descarga"
+        else:
+            if horas >= 48:
+                resto = f"{horas / 24:.1f} días"
+            elif horas >= 1:
+                resto = f"{horas:.0f} h"
+            else:
+                resto = f"{horas * 60:.0f} min"
+            texto = f"Autonomía: {resto} ({consumo:.1f} %/h)"
+        if texto != self._texto_autonomia:
+            self._texto_autonomia = texto
+            self.lbl_autonomia.setText(texto)
 
     # click
     def mousePressEvent(self, event):
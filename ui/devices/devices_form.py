@@ -110,4 +110,6 @@ class DispositivoDialog(QDialog):
             "luz": self.datos.get("luz"),
             "temp_sonda": self.datos.get("temp_sonda"),
             "punto_condensacion": self.datos.get("punto_condensacion"),
+            "consumo": self.datos.get("consumo"),
+            "autonomia": self.datos.get("autonomia"),
         }
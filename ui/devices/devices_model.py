@@ -0,0 +1,128 @@
+from PyQt6.QtWidgets import (
+    QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+)
+from PyQt6.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QEvent, pyqtSignal
+)
+
+from ui.widgets.modelo_tabla import FilasCambiadasMixin
+
+
+# (encabezado, clave en el dict del dispositivo)
+COLUMNAS = [
+    ("ID", "id"), ("Nombre", "name"), ("Conexiones", "connections"),
+    ("Ubicación", "location"), ("Batería (%)", "battery"), ("Estado", "active"),
+    ("Temp Amb", "temp_amb"), ("Humedad", "humedad"), ("Golpe", "golpe"),
+    ("Luz", "luz"), ("Temp Sonda", "temp_sonda"), ("Punto Cond.", "punto_condensacion"),
+    ("Acción", None), ("Eliminar", None),
+]
+COL_ESTADO = 5
+COL_TOGGLE = 12
+COL_ELIMINAR = 13
+
+# texto de toda la fila en minúsculas, para el filtro del proxy
+ROL_FILTRO = Qt.ItemDataRole.UserRole + 1
+
+
+def _texto(valor) -> str:
+    if valor is None:
+        return "--"
+    if isinstance(valor, float):
+        return f"{valor:.2f}"
+    return str(valor)
+
+
+class DevicesTableModel(FilasCambiadasMixin, QAbstractTableModel):
+    """Modelo sobre el DeviceStore de DevicesPage (no lo copia)."""
+
+    def __init__(self, devices, parent=None):
+        super().__init__(parent)
+        self.devices = devices
+
+    # lectura
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.devices)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNAS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNAS[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        d = self.devices[index.row()]
+        col = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._celda(d, col)
+        if role == ROL_FILTRO:
+            return " ".join(self._celda(d, c) for c in range(COL_TOGGLE)).lower()
+        if role == Qt.ItemDataRole.TextAlignmentRole and col >= COL_ESTADO:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def _celda(self, d: dict, col: int) -> str:
+        if col == 4:
+            return f"{d['battery']}%"
+        if col == COL_ESTADO:
+            return "Activo" if d["active"] else "Inactivo"
+        if col == COL_TOGGLE:
+            return "Desactivar" if d["active"] else "Activar"
+        if col == COL_ELIMINAR:
+            return "Eliminar"
+        return _texto(d.get(COLUMNAS[col][1]))
+
+    def dispositivo(self, row: int) -> dict:
+        return self.devices[row]
+
+    # cambios (la lista se modifica siempre a través del modelo)
+
+    def agregar(self, d: dict):
+        row = len(self.devices)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.devices.append(d)
+        self.endInsertRows()
+
+    def quitar(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.devices.pop(row)
+        self.endRemoveRows()
+
+
+class DevicesFilterProxy(QSortFilterProxyModel):
+    """Filtra por cualquier columna usando una sola consulta de rol por fila."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterRole(ROL_FILTRO)
+        self.setFilterKeyColumn(0)
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+
+class BotonDelegate(QStyledItemDelegate):
+    """Pinta un botón en la celda sin crear widgets; emite clicked con el índice."""
+
+    clicked = pyqtSignal(QModelIndex)
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionButton()
+        opt.rect = option.rect.adjusted(4, 3, -4, -3)
+        opt.text = index.data() or ""
+        opt.state = QStyle.StateFlag.State_Enabled
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            opt.state |= QStyle.StateFlag.State_MouseOver
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, opt, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and option.rect.contains(event.position().toPoint())):
+            self.clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,55 @@
+from typing import Iterator, Optional
+
+
+class DeviceStore:
+    """
+    Dispositivos en orden de alta con índice por id.
+
+    Se usa como la lista que tenía DevicesPage (len, iteración, acceso y
+    reemplazo por fila, append, pop) y además resuelve id -> fila en O(1).
+    Las filas son estables: sólo se corren al eliminar (pop), que es O(n).
+    """
+
+    def __init__(self):
+        self._filas: list[dict] = []
+        self._pos: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._filas)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._filas)
+
+    def __contains__(self, dev_id: str) -> bool:
+        return dev_id in self._pos
+
+    def __getitem__(self, row: int) -> dict:
+        return self._filas[row]
+
+    def __setitem__(self, row: int, d: dict):
+        anterior = self._filas[row]["id"]
+        if d["id"] != anterior:
+            raise ValueError(f"No se puede cambiar el id '{anterior}' al reemplazar")
+        self._filas[row] = d
+
+    def fila(self, dev_id: str) -> int:
+        """Fila del dispositivo o -1 si no existe."""
+        return self._pos.get(dev_id, -1)
+
+    def get(self, dev_id: str) -> Optional[dict]:
+        row = self._pos.get(dev_id)
+        return None if row is None else self._filas[row]
+
+    def append(self, d: dict):
+        dev_id = d["id"]
+        if dev_id in self._pos:
+            raise KeyError(f"Dispositivo duplicado: {dev_id}")
+        self._pos[dev_id] = len(self._filas)
+        self._filas.append(d)
+
+    def pop(self, row: int) -> dict:
+        d = self._filas.pop(row)
+        del self._pos[d["id"]]
+        for i in range(row, len(self._filas)):
+            self._pos[self._filas[i]["id"]] = i
+        return d
@@ -1,23 +1,47 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
-    QScrollArea, QGridLayout, QTableWidget, QTableWidgetItem,
-    QMessageBox, QFileDialog, QHeaderView
+    QTableView, QMessageBox, QFileDialog, QHeaderView
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import QTimer
 from functools import partial
 import csv
+import time
 
 from ui.devices.devices_card import TarjetaDispositivo
 from ui.devices.devices_form import DispositivoDialog
+from ui.devices.devices_store import DeviceStore
+from ui.widgets.virtual_card_grid import VirtualCardGrid
+from ui.devices.devices_model import (
+    DevicesTableModel, DevicesFilterProxy, BotonDelegate, COL_TOGGLE, COL_ELIMINAR
+)
 from core.sensores.esp32_worker import ESP32Worker
+from core.diagnostico.latencia import LATENCIAS
+from core.diagnostico.metricas import ACTUALIZACION_UI, DISPOSITIVOS
+from core.alertas.motor_alertas import MotorAlertas, SENTINELA
+from core.alertas.prediccion import ModeloBateria
+from core.sensores.golpes import ALERTAS_GOLPE
 
 
 class DevicesPage(QWidget):
-    def __init__(self, esp32_worker=None, esp32_puerto=-1, esp32_baudios=-1, parent=None):
+    def __init__(self, esp32_worker=None, esp32_puerto=-1, esp32_baudios=-1, motor_alertas=None,
+                 parent=None):
         super().__init__(parent)
 
-        self.devices: list[dict] = []
-        self.device_cards: dict[str, TarjetaDispositivo] = {}
+        # las alertas van al feed del motor (ver MotorAlertas); si no viene
+        # uno de afuera, esta página lo alimenta y lo evalúa
+        self.motor_propio = motor_alertas is None
+        self.motor_alertas = MotorAlertas() if self.motor_propio else motor_alertas
+
+        # ordenados por alta e indexados por id (ver DeviceStore)
+        self.devices = DeviceStore()
+
+        # ids con datos cambiados pendientes de pintar; los altas/bajas
+        # pasan por actualizar_vistas(), que además re-acomoda la grilla
+        self._sucios: set[str] = set()
+
+        # consumo y autonomía a partir de las lecturas reales de Bat
+        self.bateria = ModeloBateria()
+        self._lecturas_bat: list = []
 
         self.external_worker = esp32_worker is not None
         self.worker = esp32_worker
@@ -29,7 +53,7 @@ class DevicesPage(QWidget):
                 font-size: 11pt;
                 color: #222;
             }
-            QLineEdit, QTableWidget {
+            QLineEdit, QTableView {
                 border: 1px solid #d0d0d0;
                 border-radius: 6px;
                 padding: 6px;
@@ -65,23 +89,28 @@ class DevicesPage(QWidget):
         self.main_container = QWidget()
         main_layout = QVBoxLayout(self.main_container)
 
-        self.scroll = QScrollArea(widgetResizable=True)
-        self.cards_container = QWidget()
-        self.cards_layout = QGridLayout(self.cards_container)
-        self.cards_layout.setSpacing(12)
-        self.scroll.setWidget(self.cards_container)
-        main_layout.addWidget(self.scroll)
-
-        self.table = QTableWidget()
-        self.table.setColumnCount(14)
-        self.table.setHorizontalHeaderLabels([
-            "ID", "Nombre", "Conexiones", "Ubicación", "Batería (%)", "Estado",
-            "Temp Amb", "Humedad", "Golpe", "Luz", "Temp Sonda", "Punto Cond.",
-            "Acción", "Eliminar"
-        ])
+        # sólo existen tarjetas para las celdas visibles (ver VirtualCardGrid)
+        self.cards_grid = VirtualCardGrid(self._crear_tarjeta, TarjetaDispositivo.actualizar_visual)
+        self.cards_grid.set_items(self.devices)
+        main_layout.addWidget(self.cards_grid)
+
+        # tabla: modelo sobre self.devices + proxy para la búsqueda; los
+        # botones los pinta un delegate, sin widgets por fila
+        self.table_model = DevicesTableModel(self.devices, parent=self)
+        self.table_proxy = DevicesFilterProxy(self)
+        self.table_proxy.setSourceModel(self.table_model)
+
+        self.table = QTableView()
+        self.table.setModel(self.table_proxy)
+        self.table.setMouseTracking(True)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         header = self.table.horizontalHeader()
-        for col in range(self.table.columnCount()):
-            header.setSectionResizeMode(col, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+
+        self.table_buttons = BotonDelegate(self.table)
+        self.table_buttons.clicked.connect(self._on_table_button)
+        self.table.setItemDelegateForColumn(COL_TOGGLE, self.table_buttons)
+        self.table.setItemDelegateForColumn(COL_ELIMINAR, self.table_buttons)
         self.table.hide()
         main_layout.addWidget(self.table)
 
@@ -92,20 +121,19 @@ class DevicesPage(QWidget):
         self.timer = QTimer(self, timeout=self.alertas)
         self.timer.start(5000)
 
-        self.battery_timer = QTimer(self)
-        self.battery_timer.timeout.connect(self._auto_reduce_battery)
-        self.battery_timer.start(30000)  # 30 segundo
-
         # worker ESP32
 
         if not self.external_worker:
             self.worker = ESP32Worker(esp32_puerto, esp32_baudios, parent=self)
             self.worker.error.connect(self._on_worker_error)
             self.worker.data_received.connect(self._handle_esp32_data)
+            self.worker.batch_received.connect(self._handle_esp32_batch)
+            self.worker.golpes_detectados.connect(self._on_golpes)
             self.worker.configurar()
             self.worker.start()
         else:
             self.worker.data_received.connect(self._handle_esp32_data)
+            self.worker.batch_received.connect(self._handle_esp32_batch)
             self.worker.error.connect(self._on_worker_error)
 
     # funciones del worker
@@ -113,23 +141,57 @@ class DevicesPage(QWidget):
     def _on_worker_error(self, msg: str):
         print("[ESP32 Worker]:", msg)
 
+    def _on_golpes(self, eventos: list):
+        # con un worker de afuera los publica quien lo creó
+        for evento in eventos:
+            regla, mensaje = ALERTAS_GOLPE[evento["tipo"]]
+            self.motor_alertas.notificar(evento["nodo"], regla, mensaje.format(**evento),
+                                         valor=evento["magnitud"], ts=evento["ts"])
+
     def _handle_esp32_data(self, data: dict):
+        self._handle_esp32_batch([data])
+
+    def _handle_esp32_batch(self, lote: list):
+        # una sola actualización de vistas por lote
+        inicio = time.perf_counter()
+        nuevos = False
+        for data in lote:
+            nuevos = self._aplicar_lectura(data) or nuevos
+        self._actualizar_autonomia()
+        if nuevos:
+            self.actualizar_vistas()
+        else:
+            self._actualizar_sucios()
+        LATENCIAS.registrar_lote(lote, "dispositivos")
+        if self.motor_propio:
+            self.motor_alertas.agregar_lote(lote)
+        ACTUALIZACION_UI.observar(time.perf_counter() - inicio, ("dispositivos",))
+
+    def _aplicar_lectura(self, data: dict) -> bool:
+        """
+        Aplica una lectura a self.devices y marca el dispositivo como sucio.
+        Devuelve True si se dio de alta un dispositivo nuevo.
+        """
         if "ID" not in data:
-            return
+            return False
 
         dev_id = str(data["ID"])
         idx = self._idx(dev_id)
 
         if idx != -1 and not self.devices[idx].get("active", True):
-            return
+            return False
+
+        bat = self._bateria(data)
+        if bat is not None:
+            self._lecturas_bat.append((dev_id, bat))
 
         if idx == -1:
             nuevo = dict(
                 id=dev_id,
                 name=f"Dispositivo {dev_id}",
-                connections=data.get("connections", ""),
+                connections=data.get("connections", data.get("Puerto", "")),
                 location=data.get("location", ""),
-                battery=int(data.get("battery", 100)),
+                battery=int(round(bat)) if bat is not None else int(data.get("battery", 100)),
                 active=True,
                 foto=None,
                 temp_amb=data.get("T_Amb"),
@@ -139,9 +201,8 @@ class DevicesPage(QWidget):
                 temp_sonda=data.get("T_Sonda"),
                 punto_condensacion=data.get("Rocío")
             )
-            self.devices.append(nuevo)
-            self.actualizar_vistas()
-            return
+            self.table_model.agregar(nuevo)
+            return True
 
         d = self.devices[idx]
 
@@ -149,6 +210,7 @@ class DevicesPage(QWidget):
         campos = {
             "name": "name",
             "connections": "connections",
+            "Puerto": "connections",
             "location": "location",
             "battery": "battery",
             "T_Amb": "temp_amb",
@@ -162,16 +224,45 @@ class DevicesPage(QWidget):
         for key_in, key_out in campos.items():
             if key_in in data:
                 d[key_out] = data[key_in]
-
-        self.actualizar_vistas()
+        if bat is not None:
+            d["battery"] = int(round(bat))
+
+        self._sucios.add(dev_id)
+        return False
+
+    @staticmethod
+    def _bateria(data: dict):
+        """Bat de la lectura; None si no vino, es el sentinela o quedó marcada como sospechosa."""
+        bat = data.get("Bat")
+        if bat is None or bat == SENTINELA or "Bat" in data.get("sospechosos", ()):
+            return None
+        return bat
+
+    def _actualizar_autonomia(self):
+        """Alimenta el modelo de batería con las lecturas del lote y estima sólo esos dispositivos."""
+        if not self._lecturas_bat:
+            return
+        ids, valores = zip(*self._lecturas_bat)
+        self._lecturas_bat = []
+        self.bateria.agregar_lote(ids, valores)
+        unicos = list(dict.fromkeys(ids))
+        for dev_id, consumo, horas in zip(unicos, *self.bateria.estimar(unicos)):
+            idx = self._idx(dev_id)
+            if idx != -1:
+                d = self.devices[idx]
+                d["consumo"] = consumo
+                d["autonomia"] = horas
 
     # crud de dispositivos
 
     def agregar_dispositivo_en_linea(self):
-        new_id = f"DVC-{len(self.devices)+1}"
-        self.devices.append({
+        n = len(self.devices) + 1
+        while f"DVC-{n}" in self.devices:
+            n += 1
+        new_id = f"DVC-{n}"
+        self.table_model.agregar({
             "id": new_id,
-            "name": f"Dispositivo {len(self.devices)+1}",
+            "name": f"Dispositivo {n}",
             "connections": "",
             "location": "",
             "battery": 100,
@@ -194,7 +285,8 @@ class DevicesPage(QWidget):
         dlg = DispositivoDialog(self.devices[idx], parent=self)
         if dlg.exec():
             self.devices[idx] = dlg.get_datos()
-            self.actualizar_vistas()
+            self._sucios.add(dev_id)
+            self._actualizar_sucios()
 
     def eliminar_dispositivo_por_id(self, dev_id: str):
         idx = self._idx(dev_id)
@@ -207,7 +299,7 @@ class DevicesPage(QWidget):
         ) != QMessageBox.StandardButton.Yes:
             return
 
-        self.devices.pop(idx)
+        self.table_model.quitar(idx)
         self.actualizar_vistas()
 
     def toggle_device_status_por_id(self, dev_id: str):
@@ -216,111 +308,79 @@ class DevicesPage(QWidget):
             return
         d = self.devices[idx]
         d["active"] = not d["active"]
-        self.actualizar_vistas()
+        self._sucios.add(dev_id)
+        self._actualizar_sucios()
 
     # tarjetas y tablas
-    def _actualizar_tarjetas(self):
-        ids_existentes = {d["id"] for d in self.devices}
-
-        # eliminar tarjetas viejas
-        for dev_id in list(self.device_cards.keys()):
-            if dev_id not in ids_existentes:
-                card = self.device_cards.pop(dev_id)
-                self.cards_layout.removeWidget(card)
-                card.deleteLater()
-
-        # refrescar o crear tarjetas
-        for i, d in enumerate(self.devices):
-            dev_id = d["id"]
-
-            if dev_id not in self.device_cards:
-                card = TarjetaDispositivo(d, parent=self.cards_container)
-                self.device_cards[dev_id] = card
-
-                card.btn_edit.clicked.connect(partial(self.editar_dispositivo_por_id, dev_id))
-                card.btn_del.clicked.connect(partial(self.eliminar_dispositivo_por_id, dev_id))
-                card.btn_toggle.clicked.connect(partial(self.toggle_device_status_por_id, dev_id))
-            else:
-                card = self.device_cards[dev_id]
-
-            card.actualizar_visual(d)
-
-            row, col = divmod(i, 3)
-            self.cards_layout.addWidget(card, row, col)
-
-    def _actualizar_tabla(self):
-        self.table.setRowCount(len(self.devices))
-
-        for row, d in enumerate(self.devices):
-            self.table.setItem(row, 0, QTableWidgetItem(d["id"]))
-            self.table.setItem(row, 1, QTableWidgetItem(d["name"]))
-            self.table.setItem(row, 2, QTableWidgetItem(d["connections"]))
-            self.table.setItem(row, 3, QTableWidgetItem(d["location"]))
-            self.table.setItem(row, 4, QTableWidgetItem(f"{d['battery']}%"))
-
-            estado = QTableWidgetItem("Activo" if d["active"] else "Inactivo")
-            estado.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(row, 5, estado)
-
-            for col, key in enumerate(["temp_amb", "humedad", "golpe", "luz",
-                                       "temp_sonda", "punto_condensacion"], start=6):
-                self.table.setItem(row, col, QTableWidgetItem(str(d.get(key, "--"))))
-
-            btn_toggle = QPushButton("Desactivar" if d["active"] else "Activar")
-            btn_toggle.clicked.connect(partial(self.toggle_device_status_por_id, d["id"]))
-            self.table.setCellWidget(row, 12, btn_toggle)
-
-            btn_del = QPushButton("Eliminar")
-            btn_del.clicked.connect(partial(self.eliminar_dispositivo_por_id, d["id"]))
-            self.table.setCellWidget(row, 13, btn_del)
+    def _crear_tarjeta(self, parent):
+        card = TarjetaDispositivo({}, parent=parent)
+        # la tarjeta se recicla: el id se resuelve al hacer clic
+        card.btn_edit.clicked.connect(
+            lambda _, c=card: self.editar_dispositivo_por_id(self.cards_grid.item_de(c)["id"]))
+        card.btn_del.clicked.connect(
+            lambda _, c=card: self.eliminar_dispositivo_por_id(self.cards_grid.item_de(c)["id"]))
+        card.btn_toggle.clicked.connect(
+            lambda _, c=card: self.toggle_device_status_por_id(self.cards_grid.item_de(c)["id"]))
+        return card
 
     def actualizar_vistas(self):
-        self._actualizar_tarjetas()
-        self._actualizar_tabla()
+        """Re-acomoda las tarjetas: usar sólo en altas y bajas."""
+        # la tabla se entera de altas y bajas por el modelo; recargar()
+        # vuelve a enlazar las tarjetas visibles
+        self.cards_grid.recargar()
+        self._actualizar_sucios(tarjetas=False)
+
+    def _actualizar_sucios(self, tarjetas: bool = True):
+        """Repinta sólo la tarjeta y la fila de los dispositivos marcados."""
+        filas = [idx for idx in map(self._idx, self._sucios) if idx != -1]
+        self.table_model.filas_cambiadas(filas)
+        if tarjetas:
+            self.cards_grid.refrescar(self._sucios)
+        self._sucios.clear()
+
+    def _on_table_button(self, index):
+        dev_id = self.table_model.dispositivo(self.table_proxy.mapToSource(index).row())["id"]
+        accion = (self.toggle_device_status_por_id if index.column() == COL_TOGGLE
+                  else self.eliminar_dispositivo_por_id)
+        # fuera del evento del delegate: eliminar abre un diálogo y quita filas
+        QTimer.singleShot(0, partial(accion, dev_id))
 
     # alertas
     def alertas(self):
+        activos = 0
         for d in self.devices:
             if d["battery"] == 0 and d.get("active"):
-                QMessageBox.critical(self, "Dispositivo apagado",
-                                     f"{d['name']} se quedó sin batería.")
+                # sin diálogo modal: la alerta va al feed y no frena la UI
+                self.motor_alertas.publicar(d["id"], "Batería agotada",
+                                            f"{d['name']} se quedó sin batería.")
                 d["active"] = False
-
-    # bateria automática
-    def _auto_reduce_battery(self):
-        for d in self.devices:
-            if d.get("active"):
-                actual = d.get("battery", 100)
-                if isinstance(actual, int):
-                    d["battery"] = max(0, actual - 1)
-
-        self.actualizar_vistas()
+                self._sucios.add(d["id"])
+            elif d["battery"] != 0:
+                self.motor_alertas.resolver(d["id"], "Batería agotada")
+            activos += bool(d.get("active"))
+        DISPOSITIVOS.fijar(activos, ("activos",))
+        DISPOSITIVOS.fijar(len(self.devices) - activos, ("inactivos",))
+        if self.motor_propio:
+            self.motor_alertas.evaluar()
+            for evento in self.motor_alertas.nuevas():
+                print(f"[ADVERTENCIA] Alerta {evento['estado']}: {evento['mensaje']}")
+        self._actualizar_sucios()
 
     # utilidades
     def _idx(self, dev_id):
-        for i, d in enumerate(self.devices):
-            if d["id"] == dev_id:
-                return i
-        return -1
+        return self.devices.fila(dev_id)
 
     def filter_devices(self, text):
         text = text.lower()
-        for card in self.device_cards.values():
-            datos = card.property("datos") or {}
-            visible = any(text in str(v).lower() for v in datos.values())
-            card.setVisible(visible)
-
-        for row in range(self.table.rowCount()):
-            visible = any(
-                text in (self.table.item(row, col).text().lower()
-                         if self.table.item(row, col) else "")
-                for col in range(self.table.columnCount())
-            )
-            self.table.setRowHidden(row, not visible)
+        self.cards_grid.set_filtro(
+            (lambda d: any(text in str(v).lower() for v in d.values())) if text else None
+        )
+
+        self.table_proxy.setFilterFixedString(text)
 
     def toggle_view(self):
-        mostrando_cards = self.scroll.isVisible()
-        self.scroll.setVisible(not mostrando_cards)
+        mostrando_cards = self.cards_grid.isVisible()
+        self.cards_grid.setVisible(not mostrando_cards)
         self.table.setVisible(mostrando_cards)
 
         self.btn_toggle_view.setText(
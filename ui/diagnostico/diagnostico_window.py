@@ -0,0 +1,98 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTableWidget,
+    QTableWidgetItem, QHeaderView, QFileDialog, QCheckBox
+)
+from PyQt6.QtCore import Qt, QTimer
+
+from core.diagnostico.latencia import LATENCIAS
+
+COLUMNAS = [
+    ("Etapa", "etapa"),
+    ("Lecturas", "n"),
+    ("p50 (ms)", "p50_ms"),
+    ("p90 (ms)", "p90_ms"),
+    ("p99 (ms)", "p99_ms"),
+    ("p99.9 (ms)", "p99.9_ms"),
+    ("Máx (ms)", "max_ms"),
+]
+
+
+class DiagnosticoWindow(QWidget):
+    """Ventana no modal con los percentiles de latencia por etapa, refrescada cada segundo."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnóstico de latencia")
+        self.resize(760, 320)
+
+        layout = QVBoxLayout(self)
+
+        titulo = QLabel("Latencia de lecturas (desde que llegan al puerto hasta cada vista)")
+        titulo.setStyleSheet("font-weight: bold;")
+        layout.addWidget(titulo)
+
+        self.tabla = QTableWidget(0, len(COLUMNAS))
+        self.tabla.setHorizontalHeaderLabels([c[0] for c in COLUMNAS])
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.tabla)
+
+        botones = QHBoxLayout()
+        self.chk_habilitado = QCheckBox("Medir")
+        self.chk_habilitado.setChecked(LATENCIAS.habilitado)
+        self.chk_habilitado.toggled.connect(self._on_habilitado)
+        botones.addWidget(self.chk_habilitado)
+        botones.addStretch()
+
+        self.btn_reiniciar = QPushButton("Reiniciar")
+        self.btn_reiniciar.clicked.connect(self._reiniciar)
+        botones.addWidget(self.btn_reiniciar)
+
+        self.btn_guardar = QPushButton("Guardar…")
+        self.btn_guardar.clicked.connect(self._guardar)
+        botones.addWidget(self.btn_guardar)
+        layout.addLayout(botones)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.actualizar)
+        self.timer.start(1000)
+        self.actualizar()
+
+    def actualizar(self):
+        if not self.isVisible():
+            return
+        filas = LATENCIAS.resumen()
+        self.tabla.setRowCount(len(filas))
+        for r, fila in enumerate(filas):
+            for c, (_, clave) in enumerate(COLUMNAS):
+                valor = fila[clave]
+                if isinstance(valor, float):
+                    texto = f"{valor:.2f}"
+                else:
+                    texto = str(valor)
+                item = QTableWidgetItem(texto)
+                if c:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.tabla.setItem(r, c, item)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.actualizar()
+
+    def _on_habilitado(self, activo: bool):
+        LATENCIAS.habilitado = activo
+
+    def _reiniciar(self):
+        LATENCIAS.reiniciar()
+        self.actualizar()
+
+    def _guardar(self):
+        ruta, _ = QFileDialog.getSaveFileName(self, "Guardar latencias", "latencias.json", "JSON (*.json)")
+        if not ruta:
+            return
+        try:
+            LATENCIAS.volcar(ruta)
+            print(f"[INFO] Latencias guardadas en {ruta}")
+        except OSError as e:
+            print(f"[ERROR] No se pudo guardar {ruta}: {e}")
@@ -0,0 +1,203 @@
+import time
+from datetime import datetime
+
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QComboBox, QPushButton, QLabel, QSizePolicy
+)
+from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt6.QtCore import Qt, QPointF, QRectF
+
+from core.historial.almacen_series import CAMPOS
+
+
+ETIQUETAS = {
+    "T_Amb": "Temperatura Ambiente (°C)",
+    "T_Sonda": "Temp. Sonda (°C)",
+    "Hum": "Humedad (%)",
+    "Luz": "Luz (lx)",
+    "Rocío": "Punto de Condensación (°C)",
+    "Bat": "Batería (%)",
+    "Acc": "Aceleración (g)",
+}
+
+RANGOS = [
+    ("Última hora", 3600),
+    ("Últimas 24 horas", 86400),
+    ("Últimos 7 días", 7 * 86400),
+    ("Últimos 30 días", 30 * 86400),
+    ("Últimos 90 días", 90 * 86400),
+]
+
+
+class GraficaSerie(QWidget):
+    """
+    Gráfica de una serie reducida: banda mín/máx y línea del promedio.
+
+    Recibe a lo sumo un punto por píxel de ancho (ver puntos_maximos()), así
+    que el costo de pintar no depende del rango consultado.
+    """
+
+    MARGEN_IZQ = 60
+    MARGEN_DER = 16
+    MARGEN_SUP = 16
+    MARGEN_INF = 28
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(300)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self._puntos = []
+        self._t0 = 0.0
+        self._t1 = 1.0
+
+    def puntos_maximos(self) -> int:
+        return max(1, self.width() - self.MARGEN_IZQ - self.MARGEN_DER)
+
+    def set_serie(self, puntos: list, t0: float, t1: float):
+        """puntos: [(t, mínimo, máximo, promedio)] como los de consultar_reducido()."""
+        self._puntos = puntos
+        self._t0 = t0
+        self._t1 = t1
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        p.fillRect(self.rect(), QColor("#ffffff"))
+
+        area = QRectF(self.MARGEN_IZQ, self.MARGEN_SUP,
+                      self.width() - self.MARGEN_IZQ - self.MARGEN_DER,
+                      self.height() - self.MARGEN_SUP - self.MARGEN_INF)
+        p.setPen(QPen(QColor("#d0d0d0")))
+        p.drawRect(area)
+
+        if not self._puntos:
+            p.setPen(QColor("#999999"))
+            p.drawText(area, Qt.AlignmentFlag.AlignCenter, "Sin datos en el rango seleccionado")
+            return
+
+        v_min = min(pt[1] for pt in self._puntos)
+        v_max = max(pt[2] for pt in self._puntos)
+        if v_max == v_min:
+            v_max += 1
+            v_min -= 1
+        escala_t = area.width() / (self._t1 - self._t0)
+        escala_v = area.height() / (v_max - v_min)
+
+        def x(t):
+            return area.left() + (t - self._t0) * escala_t
+
+        def y(v):
+            return area.bottom() - (v - v_min) * escala_v
+
+        # banda mín/máx: una línea vertical por bucket
+        p.setPen(QPen(QColor(33, 150, 243, 90), 1))
+        for t, minimo, maximo, _ in self._puntos:
+            p.drawLine(QPointF(x(t), y(minimo)), QPointF(x(t), y(maximo)))
+
+        # promedio
+        p.setPen(QPen(QColor("#0d47a1"), 1.5))
+        p.drawPolyline(QPolygonF([QPointF(x(t), y(prom)) for t, _, _, prom in self._puntos]))
+
+        # ejes
+        p.setPen(QColor("#555555"))
+        for v in (v_min, (v_min + v_max) / 2, v_max):
+            p.drawText(QRectF(0, y(v) - 8, self.MARGEN_IZQ - 6, 16),
+                       Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, f"{v:.2f}")
+        formato = "%H:%M" if self._t1 - self._t0 <= 86400 else "%d/%m %H:%M"
+        abajo = QRectF(area.left(), area.bottom() + 4, area.width(), self.MARGEN_INF - 4)
+        p.drawText(abajo, Qt.AlignmentFlag.AlignLeft, datetime.fromtimestamp(self._t0).strftime(formato))
+        p.drawText(abajo, Qt.AlignmentFlag.AlignRight, datetime.fromtimestamp(self._t1).strftime(formato))
+
+
+class HistorialPage(QWidget):
+    def __init__(self, almacen, parent=None):
+        super().__init__(parent)
+        self.almacen = almacen
+
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #ffffff;
+                font-family: 'Segoe UI';
+                font-size: 11pt;
+                color: #222;
+            }
+            QComboBox {
+                border: 1px solid #d0d0d0;
+                border-radius: 6px;
+                padding: 4px;
+            }
+        """)
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(10, 10, 10, 10)
+        root.setSpacing(12)
+
+        # filtros
+        barra = QHBoxLayout(spacing=8)
+
+        self.combo_nodo = QComboBox()
+        self.combo_nodo.setMinimumWidth(140)
+        barra.addWidget(QLabel("Nodo:"))
+        barra.addWidget(self.combo_nodo)
+
+        self.combo_campo = QComboBox()
+        for campo in CAMPOS:
+            self.combo_campo.addItem(ETIQUETAS.get(campo, campo), campo)
+        barra.addWidget(QLabel("Variable:"))
+        barra.addWidget(self.combo_campo)
+
+        self.combo_rango = QComboBox()
+        for texto, segundos in RANGOS:
+            self.combo_rango.addItem(texto, segundos)
+        barra.addWidget(QLabel("Rango:"))
+        barra.addWidget(self.combo_rango)
+
+        self.btn_actualizar = QPushButton("Actualizar", clicked=self.actualizar)
+        barra.addWidget(self.btn_actualizar)
+        barra.addStretch()
+        root.addLayout(barra)
+
+        self.grafica = GraficaSerie()
+        root.addWidget(self.grafica, 1)
+
+        self.lbl_info = QLabel("")
+        self.lbl_info.setStyleSheet("color: #777; font-size: 9pt;")
+        root.addWidget(self.lbl_info)
+
+        self.combo_nodo.currentIndexChanged.connect(self.actualizar)
+        self.combo_campo.currentIndexChanged.connect(self.actualizar)
+        self.combo_rango.currentIndexChanged.connect(self.actualizar)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._cargar_nodos()
+        self.actualizar()
+
+    def _cargar_nodos(self):
+        actual = self.combo_nodo.currentData()
+        nodos = self.almacen.nodos()
+        self.combo_nodo.blockSignals(True)
+        self.combo_nodo.clear()
+        for nodo in nodos:
+            self.combo_nodo.addItem(f"Dispositivo {nodo}", nodo)
+        if actual in nodos:
+            self.combo_nodo.setCurrentIndex(nodos.index(actual))
+        self.combo_nodo.blockSignals(False)
+
+    def actualizar(self):
+        nodo = self.combo_nodo.currentData()
+        if nodo is None:
+            self.grafica.set_serie([], 0, 1)
+            self.lbl_info.setText("Todavía no hay lecturas guardadas.")
+            return
+
+        t1 = time.time()
+        t0 = t1 - self.combo_rango.currentData()
+        inicio = time.perf_counter()
+        puntos = self.almacen.consultar_reducido(
+            nodo, self.combo_campo.currentData(), t0, t1, self.grafica.puntos_maximos()
+        )
+        ms = (time.perf_counter() - inicio) * 1000
+        self.grafica.set_serie(puntos, t0, t1)
+        self.lbl_info.setText(f"{len(puntos)} puntos (mín/máx/promedio por intervalo) · consulta {ms:.0f} ms")
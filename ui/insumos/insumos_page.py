@@ -1,6 +1,6 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel,
-    QTabWidget, QScrollArea, QGridLayout, QTableWidget, QTableWidgetItem,
+    QTabWidget, QTableWidget, QTableWidgetItem,
     QMessageBox, QHeaderView, QFileDialog
 )
 from PyQt6.QtCore import Qt
@@ -11,6 +11,7 @@ from typing import Optional
 
 from ui.insumos.insumos_card import InsumoCard
 from ui.insumos.insumos_form import InsumoDialog
+from ui.widgets.virtual_card_grid import VirtualCardGrid
 
 
 class InsumosPage(QWidget):
@@ -24,13 +25,6 @@ class InsumosPage(QWidget):
             "Dispositivo Médico": [],
             "Biológico": []
         }
-        # cartas por tipo
-        self.cards = {
-            "Medicamento": {},
-            "Dispositivo Médico": {},
-            "Biológico": {}
-        }
-
         self.setStyleSheet("""
             QWidget { background: #ffffff; font-family: 'Segoe UI'; color: #222; }
             QLineEdit { border: 1px solid #d0d0d0; padding: 6px; border-radius: 6px; }
@@ -76,13 +70,9 @@ class InsumosPage(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(8)
 
-        # Cartas area
-        scroll = QScrollArea(widgetResizable=True)
-        container = QWidget()
-        grid = QGridLayout(container)
-        grid.setContentsMargins(8, 8, 8, 8)
-        grid.setSpacing(12)
-        scroll.setWidget(container)
+        # Cartas area (sólo las visibles, ver VirtualCardGrid)
+        cards_grid = VirtualCardGrid(partial(self._crear_tarjeta, page), InsumoCard.update_visual)
+        cards_grid.set_items(self.data[tipo])
 
         # Tabla area
         table = QTableWidget()
@@ -96,30 +86,39 @@ class InsumosPage(QWidget):
             header.setSectionResizeMode(col, QHeaderView.ResizeMode.Stretch)
         table.hide()
 
-        layout.addWidget(scroll)
+        layout.addWidget(cards_grid)
         layout.addWidget(table)
 
         # Guardar referencias en la página
-        page.scroll = scroll
-        page.container = container
-        page.grid = grid
+        page.cards_grid = cards_grid
         page.table = table
 
         self.tabs.addTab(page, tipo)
 
+    def _crear_tarjeta(self, page, parent):
+        card = InsumoCard({}, parent=parent)
+        # la tarjeta se recicla: el insumo se resuelve al hacer clic
+        card.btn_edit.clicked.connect(
+            lambda _, c=card: self._edit_by_id(*self._tipo_id(page.cards_grid.item_de(c))))
+        card.btn_del.clicked.connect(
+            lambda _, c=card: self._delete_by_id(*self._tipo_id(page.cards_grid.item_de(c))))
+        return card
+
+    def _tipo_id(self, insumo: dict):
+        return insumo["tipo"], insumo["id"]
+
     # Buscador conectado a la pestaña activa
 
     def _on_search_changed(self, text: str):
         text = text.lower()
         idx = self.tabs.currentIndex()
-        tipo = self.tabs.tabText(idx)
+        page = self.tabs.widget(idx)
         # filtrar tarjetas
-        for card in self.cards[tipo].values():
-            d = card.property("data") or {}
-            hay = any(text in str(d.get(k, "")).lower() for k in ("nombre", "lote", "registro_sanitario", "modelo"))
-            card.setVisible(hay)
+        page.cards_grid.set_filtro(
+            (lambda d: any(text in str(d.get(k, "")).lower()
+                           for k in ("nombre", "lote", "registro_sanitario", "modelo"))) if text else None
+        )
         # filtrar tabla
-        page = self.tabs.widget(idx)
         for row in range(page.table.rowCount()):
             visible = False
             for col in range(page.table.columnCount()):
@@ -187,9 +186,6 @@ class InsumosPage(QWidget):
         if dlg.exec():
             nuevo = dlg.get_data()
             self.data[tipo][idx].update(nuevo)
-            # actualizar vista rápida 
-            if insumo_id in self.cards[tipo]:
-                self.cards[tipo][insumo_id].update_visual(self.data[tipo][idx])
             self._refresh_tab(tipo)
 
     
@@ -202,10 +198,6 @@ class InsumosPage(QWidget):
         if QMessageBox.question(self, "Eliminar insumo", f"Eliminar '{self.data[tipo][idx].get('nombre','')}'?") != QMessageBox.StandardButton.Yes:
             return
         self.data[tipo].pop(idx)
-        # eliminar tarjeta si existe
-        if insumo_id in self.cards[tipo]:
-            card = self.cards[tipo].pop(insumo_id)
-            card.deleteLater()
         self._refresh_tab(tipo)
 
     
@@ -218,24 +210,8 @@ class InsumosPage(QWidget):
         idx = next(i for i in range(self.tabs.count()) if self.tabs.tabText(i) == tipo)
         page = self.tabs.widget(idx)
 
-        # limpiar tarjetas
-        while page.grid.count():
-            item = page.grid.takeAt(0)
-            widget = item.widget()
-            if widget:
-                page.grid.removeWidget(widget)
-                widget.setParent(None)
-
-        # recargar tarjetas
-        self.cards[tipo].clear()
-        for i, it in enumerate(self.data[tipo]):
-            card = InsumoCard(it, parent=page.container)
-            self.cards[tipo][it["id"]] = card
-            # conectar botones
-            card.btn_edit.clicked.connect(partial(self._edit_by_id, tipo, it["id"]))
-            card.btn_del.clicked.connect(partial(self._delete_by_id, tipo, it["id"]))
-            row, col = divmod(i, 3)
-            page.grid.addWidget(card, row, col)
+        # recargar tarjetas (re-enlaza sólo las visibles)
+        page.cards_grid.recargar()
 
         # refrescar tabla
         tbl = page.table
@@ -1,7 +1,7 @@
 # ui/users/users_page.py
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel,
-    QScrollArea, QGridLayout, QTableWidget, QTableWidgetItem, QFileDialog,
+    QTableWidget, QTableWidgetItem, QFileDialog,
     QMessageBox, QHeaderView, QFrame
 )
 from PyQt6.QtCore import Qt
@@ -12,6 +12,7 @@ from typing import Optional
 
 from ui.users.users_card import UserCard
 from ui.users.users_form import UserDialog
+from ui.widgets.virtual_card_grid import VirtualCardGrid
 
 
 class UsersPage(QWidget):
@@ -22,7 +23,6 @@ class UsersPage(QWidget):
 
         # datos de ejemplo
         self.users: list[dict] = []
-        self.user_cards: dict[str, UserCard] = {}
 
         self.setStyleSheet("""
             QWidget { background: #ffffff; font-family: 'Segoe UI'; color: #222; }
@@ -75,14 +75,10 @@ class UsersPage(QWidget):
         main_layout = QVBoxLayout(self.main_container)
         main_layout.setContentsMargins(0, 0, 0, 0)
 
-        # tarjetas area
-        self.scroll = QScrollArea(widgetResizable=True)
-        self.cards_container = QWidget()
-        self.cards_layout = QGridLayout(self.cards_container)
-        self.cards_layout.setContentsMargins(8, 8, 8, 8)
-        self.cards_layout.setSpacing(12)
-        self.scroll.setWidget(self.cards_container)
-        main_layout.addWidget(self.scroll)
+        # tarjetas area (sólo las visibles, ver VirtualCardGrid)
+        self.cards_grid = VirtualCardGrid(self._crear_tarjeta, UserCard.update_visual)
+        self.cards_grid.set_items(self.users)
+        main_layout.addWidget(self.cards_grid)
 
         # Tabla
         self.table = QTableWidget()
@@ -150,10 +146,6 @@ class UsersPage(QWidget):
             self.users[idx].update(new)
             # actualizar estado documentos
             self.users[idx]["estado_documentos"] = self._compute_doc_status(self.users[idx])
-            # actualizar tarjeta si existe
-            uid = self.users[idx]["id"]
-            if uid in self.user_cards:
-                self.user_cards[uid].update_visual(self.users[idx])
             self.actualizar_vistas()
 
     def delete_user_by_id(self, user_id: str):
@@ -167,30 +159,19 @@ class UsersPage(QWidget):
         self.actualizar_vistas()
 
     # Actualizar vistas
-    def _actualizar_tarjetas(self):
-        ids = {u["id"] for u in self.users}
-        # eliminar tarjetas obsoletas
-        for uid in list(self.user_cards.keys()):
-            if uid not in ids:
-                card = self.user_cards.pop(uid)
-                self.cards_layout.removeWidget(card)
-                card.deleteLater()
-
-        for i, u in enumerate(self.users):
-            uid = u["id"]
-            if uid not in self.user_cards:
-                card = UserCard(u, parent=self)
-                self.user_cards[uid] = card
-                card.btn_edit.clicked.connect(partial(self.edit_user_by_id, uid))
-                card.btn_del.clicked.connect(partial(self.delete_user_by_id, uid))
-                card.btn_preview_history.clicked.connect(partial(self._show_history, uid))
-            else:
-                card = self.user_cards[uid]
+    def _crear_tarjeta(self, parent):
+        card = UserCard({}, parent=parent)
+        # la tarjeta se recicla: el id se resuelve al hacer clic
+        card.btn_edit.clicked.connect(
+            lambda _, c=card: self.edit_user_by_id(self.cards_grid.item_de(c)["id"]))
+        card.btn_del.clicked.connect(
+            lambda _, c=card: self.delete_user_by_id(self.cards_grid.item_de(c)["id"]))
+        card.btn_preview_history.clicked.connect(
+            lambda _, c=card: self._show_history(self.cards_grid.item_de(c)["id"]))
+        return card
 
-            card.update_visual(u)
-
-            row, col = divmod(i, 3)
-            self.cards_layout.addWidget(card, row, col)
+    def _actualizar_tarjetas(self):
+        self.cards_grid.recargar()
 
     def _actualizar_tabla(self):
         self.table.setRowCount(len(self.users))
@@ -235,14 +216,13 @@ class UsersPage(QWidget):
 
     def filter_users(self, text: str):
         text = text.lower()
-        for card in self.user_cards.values():
-            datos = card.property("data") or {}
-            full = " ".join([
+        self.cards_grid.set_filtro(
+            (lambda datos: text in " ".join([
                 datos.get("nombre",""), datos.get("apellido",""),
                 datos.get("usuario",""), datos.get("rfc",""),
                 datos.get("telefono","")
-            ]).lower()
-            card.setVisible(text in full)
+            ]).lower()) if text else None
+        )
         # tabla
         for row in range(self.table.rowCount()):
             visible = False
@@ -254,8 +234,8 @@ class UsersPage(QWidget):
             self.table.setRowHidden(row, not visible)
 
     def toggle_view(self):
-        cards_visible = self.scroll.isVisible()
-        self.scroll.setVisible(not cards_visible)
+        cards_visible = self.cards_grid.isVisible()
+        self.cards_grid.setVisible(not cards_visible)
         self.table.setVisible(cards_visible)
         self.btn_toggle_view.setText("Cambiar a Tarjetas" if cards_visible else "Cambiar a Tabla")
 
@@ -0,0 +1,14 @@
+class FilasCambiadasMixin:
+    """Para modelos de tabla de Qt que se refrescan por lotes de filas sucias."""
+
+    def filas_cambiadas(self, rows):
+        """Emite un dataChanged por cada rango contiguo de filas."""
+        ultima_col = self.columnCount() - 1
+        rows = sorted(rows)
+        i = 0
+        while i < len(rows):
+            j = i
+            while j + 1 < len(rows) and rows[j + 1] == rows[j] + 1:
+                j += 1
+            self.dataChanged.emit(self.index(rows[i], 0), self.index(rows[j], ultima_col))
+            i = j + 1
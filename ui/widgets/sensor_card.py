@@ -2,11 +2,14 @@ from PyQt6.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt
 
+from ui.widgets.sparkline import BufferCircular, Sparkline
+
 class SensorCard(QWidget):
-    def __init__(self, titulo: str, unidad: str = ""):
+    def __init__(self, titulo: str, unidad: str = "", historial: int = 120):
         super().__init__()
         self.titulo = titulo
         self.unidad = unidad
+        self._motivo = None
 
         self.setMinimumHeight(140)
         self.setMaximumHeight(160)
@@ -60,19 +63,40 @@ class SensorCard(QWidget):
         val_layout.addWidget(self.lbl_unidad)
         val_layout.addStretch()
 
+        # Tendencia de las últimas lecturas
+        self.sparkline = Sparkline(BufferCircular(historial))
+
         main.addWidget(self.lbl_titulo)
         main.addLayout(val_layout)
+        main.addWidget(self.sparkline)
 
         self.setLayout(main)
 
     def update_value(self, value):
-        """Actualiza el valor mostrado en la tarjeta."""
+        """Actualiza el valor mostrado en la tarjeta y lo agrega a la tendencia."""
+        self.mostrar_valor(value)
+        self.sparkline.agregar(value)
+
+    def mostrar_valor(self, value):
+        """Sólo cambia el texto (la tendencia la alimenta otro, ver set_historial)."""
         try:
             if isinstance(value, float):
-                texto = f"{value:.2f}"
+                texto = "--" if value != value else f"{value:.2f}"
             else:
                 texto = str(value)
         except Exception:
             texto = str(value)
 
         self.lbl_valor.setText(texto)
+
+    def marcar_sospechoso(self, motivo=None):
+        """Resalta el valor si está marcado como sospechoso (motivo=None lo quita)."""
+        if motivo == self._motivo:
+            return
+        self._motivo = motivo
+        self.lbl_valor.setStyleSheet("color: #e65100;" if motivo else "")
+        self.lbl_valor.setToolTip(f"Valor sospechoso: {motivo}" if motivo else "")
+
+    def set_historial(self, buffer):
+        """Muestra la tendencia de otro BufferCircular (p. ej. la de otro nodo)."""
+        self.sparkline.set_buffer(buffer)
@@ -0,0 +1,92 @@
+import numpy as np
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt6.QtCore import Qt, QPointF, QTimer
+
+SENTINELA = -255
+
+
+class BufferCircular:
+    """Últimos N valores en un arreglo NumPy fijo: agregar() no reserva memoria."""
+
+    def __init__(self, capacidad: int = 120):
+        self._datos = np.full(capacidad, np.nan)
+        self._pos = 0
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def capacidad(self) -> int:
+        return len(self._datos)
+
+    def agregar(self, valor: float):
+        self._datos[self._pos] = valor
+        self._pos = (self._pos + 1) % len(self._datos)
+        if self._n < len(self._datos):
+            self._n += 1
+
+    def valores(self) -> np.ndarray:
+        """Copia en orden cronológico (para pintar, no por lectura)."""
+        if self._n < len(self._datos):
+            return self._datos[:self._n].copy()
+        return np.concatenate((self._datos[self._pos:], self._datos[:self._pos]))
+
+
+class Sparkline(QWidget):
+    """
+    Mini gráfica de tendencia sobre un BufferCircular.
+
+    marcar_cambio() sólo agenda un repintado; como mucho se pinta fps veces
+    por segundo, sin importar cuántas lecturas lleguen.
+    """
+
+    def __init__(self, buffer: BufferCircular = None, fps: int = 10, color: str = "#2196F3", parent=None):
+        super().__init__(parent)
+        self.buffer = buffer if buffer is not None else BufferCircular()
+        self._color = QColor(color)
+        self.setMinimumHeight(32)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(1000 // fps)
+        self._timer.timeout.connect(self.update)
+
+    def set_buffer(self, buffer: BufferCircular):
+        self.buffer = buffer
+        self.marcar_cambio()
+
+    def agregar(self, valor):
+        if isinstance(valor, (int, float)) and valor != SENTINELA:
+            self.buffer.agregar(valor)
+            self.marcar_cambio()
+
+    def marcar_cambio(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def paintEvent(self, event):
+        valores = self.buffer.valores()
+        validos = ~np.isnan(valores)
+        if validos.sum() < 2:
+            return
+
+        v_min = valores[validos].min()
+        v_max = valores[validos].max()
+        rango = (v_max - v_min) or 1.0
+        w = self.width() - 2
+        h = self.height() - 4
+        paso = w / max(1, self.buffer.capacidad - 1)
+        # alineado a la derecha: el valor más nuevo siempre en el borde
+        x0 = 1 + (self.buffer.capacidad - len(valores)) * paso
+
+        puntos = QPolygonF([
+            QPointF(x0 + i * paso, 2 + h - (v - v_min) / rango * h)
+            for i, v in enumerate(valores) if validos[i]
+        ])
+
+        p = QPainter(self)
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        p.setPen(QPen(self._color, 1.5, Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap))
+        p.drawPolyline(puntos)
@@ -0,0 +1,144 @@
+from PyQt6.QtWidgets import QAbstractScrollArea, QWidget
+from typing import Callable, Iterable, Optional
+
+
+class VirtualCardGrid(QAbstractScrollArea):
+    """
+    Grilla de tarjetas que sólo crea widgets para las celdas visibles.
+
+    Las tarjetas salen de un pool que se recicla al hacer scroll: cuando una
+    celda sale de la vista su tarjeta se vuelve a enlazar con la celda que
+    entra. Así el costo (widgets, estilos, pixmaps) depende del tamaño de la
+    ventana y no de la cantidad de registros.
+
+    crear_tarjeta(parent) -> QWidget   crea una tarjeta vacía (tamaño fijo)
+    enlazar(tarjeta, item)              pinta el item en la tarjeta
+    clave(item)                         identifica al item (por defecto item["id"])
+    """
+
+    def __init__(self, crear_tarjeta: Callable[[QWidget], QWidget],
+                 enlazar: Callable[[QWidget, dict], None],
+                 clave: Callable[[dict], object] = lambda item: item["id"],
+                 espaciado: int = 12, margen: int = 8, parent=None):
+        super().__init__(parent)
+        self._crear_tarjeta = crear_tarjeta
+        self._enlazar = enlazar
+        self._clave = clave
+        self.espaciado = espaciado
+        self.margen = margen
+
+        self._items = []
+        self._filtro: Optional[Callable[[dict], bool]] = None
+        self._visibles = range(0)
+
+        # pool de tarjetas: posición visible -> tarjeta y tarjetas libres
+        self._asignadas: dict[int, QWidget] = {}
+        self._libres: list[QWidget] = []
+        self._item_de: dict[QWidget, dict] = {}
+        self._en_relayout = False
+
+        # el tamaño de celda sale de la primera tarjeta
+        prototipo = self._crear_tarjeta(self.viewport())
+        prototipo.hide()
+        self._libres.append(prototipo)
+        self._ancho = prototipo.width()
+        self._alto = prototipo.height()
+
+        self.verticalScrollBar().setSingleStep(40)
+
+    # datos
+
+    def set_items(self, items):
+        """items: secuencia indexable (list, DeviceStore...) que se muestra tal cual."""
+        self._items = items
+        self.recargar()
+
+    def set_filtro(self, filtro: Optional[Callable[[dict], bool]]):
+        self._filtro = filtro
+        self.verticalScrollBar().setValue(0)
+        self.recargar()
+
+    def recargar(self):
+        """Recalcula los items visibles tras altas, bajas o cambio de filtro."""
+        if self._filtro is None:
+            self._visibles = range(len(self._items))
+        else:
+            self._visibles = [i for i, item in enumerate(self._items) if self._filtro(item)]
+        for tarjeta in self._asignadas.values():
+            self._liberar(tarjeta)
+        self._asignadas.clear()
+        self._relayout()
+
+    def refrescar(self, claves: Optional[Iterable] = None):
+        """Vuelve a enlazar las tarjetas visibles (todas o las de esas claves)."""
+        claves = None if claves is None else set(claves)
+        for pos, tarjeta in self._asignadas.items():
+            item = self._items[self._visibles[pos]]
+            if claves is None or self._clave(item) in claves:
+                self._item_de[tarjeta] = item
+                self._enlazar(tarjeta, item)
+
+    def item_de(self, tarjeta: QWidget) -> Optional[dict]:
+        """Item enlazado actualmente a la tarjeta (para los botones de la tarjeta)."""
+        return self._item_de.get(tarjeta)
+
+    # layout
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._relayout()
+
+    def scrollContentsBy(self, dx, dy):
+        self._relayout()
+
+    def _relayout(self):
+        # setRange() puede mover la barra y volver a llamar a scrollContentsBy
+        if self._en_relayout:
+            return
+        self._en_relayout = True
+        try:
+            self._ubicar_tarjetas()
+        finally:
+            self._en_relayout = False
+
+    def _ubicar_tarjetas(self):
+        vw = self.viewport().width()
+        vh = self.viewport().height()
+        paso_x = self._ancho + self.espaciado
+        paso_y = self._alto + self.espaciado
+
+        cols = max(1, (vw - 2 * self.margen + self.espaciado) // paso_x)
+        total = len(self._visibles)
+        filas = (total + cols - 1) // cols
+        alto_total = 2 * self.margen + max(0, filas * paso_y - self.espaciado)
+
+        barra = self.verticalScrollBar()
+        barra.setPageStep(vh)
+        barra.setRange(0, max(0, alto_total - vh))
+        y0 = barra.value()
+
+        primera = max(0, (y0 - self.margen) // paso_y)
+        ultima = max(0, (y0 + vh - self.margen) // paso_y)
+        desde = min(total, primera * cols)
+        hasta = min(total, (ultima + 1) * cols)
+
+        # liberar las que salieron de la vista
+        for pos in [p for p in self._asignadas if not desde <= p < hasta]:
+            self._liberar(self._asignadas.pop(pos))
+
+        for pos in range(desde, hasta):
+            tarjeta = self._asignadas.get(pos)
+            if tarjeta is None:
+                tarjeta = self._libres.pop() if self._libres else self._crear_tarjeta(self.viewport())
+                item = self._items[self._visibles[pos]]
+                self._item_de[tarjeta] = item
+                self._enlazar(tarjeta, item)
+                self._asignadas[pos] = tarjeta
+            fila, col = divmod(pos, cols)
+            tarjeta.move(self.margen + col * paso_x, self.margen + fila * paso_y - y0)
+            tarjeta.show()
+
+    def _liberar(self, tarjeta: QWidget):
+        tarjeta.hide()
+        self._item_de.pop(tarjeta, None)
+        self._libres.append(tarjeta)